@@ -2,6 +2,11 @@
 """
 Script de build pour Skylander Editor v3
 Compatible Windows, macOS et Linux
+
+Usage:
+    python build.py            # exécutable unique (--onefile)
+    python build.py --onedir   # dossier dist/SkylanderEditor/ : démarrage plus rapide,
+                               # rien à décompresser à chaque lancement
 """
 
 import os
@@ -10,6 +15,8 @@ import subprocess
 import shutil
 
 def main():
+    onedir = '--onedir' in sys.argv[1:]
+    
     print("=" * 60)
     print("Skylander Editor v3 - Build Script")
     print("=" * 60)
@@ -42,7 +49,7 @@ def main():
     
     cmd = [
         sys.executable, "-m", "PyInstaller",
-        "--onefile",
+        "--onedir" if onedir else "--onefile",
         "--windowed",
         "--name", "SkylanderEditor",
         "--add-data", f"skylander_core.py{os.pathsep}.",
@@ -58,10 +65,11 @@ def main():
     # Vérifier le résultat
     print("\n[4/4] Vérification du build...")
     
+    exe_dir = os.path.join('dist', 'SkylanderEditor') if onedir else 'dist'
     if sys.platform == 'win32':
-        exe_path = os.path.join('dist', 'SkylanderEditor.exe')
+        exe_path = os.path.join(exe_dir, 'SkylanderEditor.exe')
     else:
-        exe_path = os.path.join('dist', 'SkylanderEditor')
+        exe_path = os.path.join(exe_dir, 'SkylanderEditor')
     
     if os.path.exists(exe_path):
         size = os.path.getsize(exe_path) / (1024 * 1024)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Skylanders Pack Archive
+=======================
+Format d'archive compact pour de grandes collections de .sky :
+
+    en-tête  : b'SKYPACK' + version (1 octet)
+    entrée   : longueur du nom (uint16 LE) + nom UTF-8 + 1024 octets
+
+L'archive se lit et s'écrit en flux, sans index ni compression.
+"""
+
+import struct
+from typing import Dict, Iterator, Tuple
+
+from skylander_core import SKYLANDER_SIZE
+
+
+MAGIC = b'SKYPACK'
+VERSION = 1
+_NAME_LEN = struct.Struct('<H')
+
+
+class ArchiveWriter:
+    """Écriture séquentielle d'une archive (utilisable comme context manager)."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC + bytes([VERSION]))
+        self.count = 0
+
+    def add(self, name: str, data: bytes) -> None:
+        if len(data) != SKYLANDER_SIZE:
+            raise ValueError(f"Taille invalide: {len(data)} octets (attendu: {SKYLANDER_SIZE})")
+        encoded = name.encode('utf-8')
+        self._file.write(_NAME_LEN.pack(len(encoded)) + encoded + bytes(data))
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def iter_archive(path: str) -> Iterator[Tuple[str, bytes]]:
+    """Parcourt les entrées (nom, contenu) d'une archive."""
+    with open(path, 'rb') as f:
+        header = f.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Archive invalide: {path}")
+        if header[len(MAGIC)] != VERSION:
+            raise ValueError(f"Version d'archive non supportée: {header[len(MAGIC)]}")
+        while True:
+            raw = f.read(_NAME_LEN.size)
+            if not raw:
+                return
+            if len(raw) < _NAME_LEN.size:
+                raise ValueError("Archive tronquée")
+            (length,) = _NAME_LEN.unpack(raw)
+            name = f.read(length).decode('utf-8')
+            data = f.read(SKYLANDER_SIZE)
+            if len(data) != SKYLANDER_SIZE:
+                raise ValueError(f"Archive tronquée (entrée {name})")
+            yield name, data
+
+
+def read_archive(path: str) -> Dict[str, bytes]:
+    return dict(iter_archive(path))
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Skylanders Crypto Backends
+==========================
+Implémentations interchangeables de l'AES-128-ECB et du MD5 utilisés par
+skylander_core :
+
+- pycryptodome  (Crypto.Cipher.AES)
+- cryptography  (OpenSSL)
+
+Au premier usage, chaque backend est vérifié sur des vecteurs de test AES-128
+publiés, puis un court micro-benchmark choisit le backend valide
+le plus rapide ; le choix est mis en cache sur disque. La variable
+d'environnement SKYLANDER_CRYPTO_BACKEND force un backend précis.
+
+Usage:
+    python skylander_backends.py            # backends disponibles, choix courant
+    python skylander_backends.py --check    # vérification d'équivalence
+    python skylander_backends.py --rebench  # refaire le micro-benchmark
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+from typing import Dict, List, Optional
+
+from skylander_core import user_cache_dir
+
+
+BACKEND_ENV = 'SKYLANDER_CRYPTO_BACKEND'
+CACHE_FILE = 'crypto_backend.json'
+
+# Vecteurs de test AES-128 (FIPS-197 annexe C.1, NIST SP 800-38A F.1.1) : clé, clair, chiffré
+_AES_KNOWN_ANSWERS = (
+    ('000102030405060708090a0b0c0d0e0f', '00112233445566778899aabbccddeeff',
+     '69c4e0d86a7b0430d8cdb78070b4c55a'),
+    ('2b7e151628aed2a6abf7158809cf4f3c', '6bc1bee22e409f96e93d7e117393172a',
+     '3ad77bb40d7a3660a89ecaf32466ef97'),
+)
+_MD5_KNOWN_ANSWER = (b'abc', '900150983cd24fb0d6963f7d28e17f72')  # RFC 1321
+
+# Taille du micro-benchmark : ~ une figurine complète (52 blocs chiffrés) x 40
+_BENCH_BLOCKS = 2080
+
+
+class CryptoBackend:
+    """Interface : AES-128-ECB sur des blocs de 16 octets et MD5."""
+
+    name = 'abstract'
+
+    @staticmethod
+    def version() -> str:
+        return ''
+
+    def md5(self, data: bytes) -> bytes:
+        # hashlib (OpenSSL) est la MD5 la plus rapide disponible partout
+        return hashlib.md5(data).digest()
+
+    def aes_ecb_decrypt(self, key: bytes, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def aes_ecb_encrypt(self, key: bytes, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class PyCryptodomeBackend(CryptoBackend):
+    name = 'pycryptodome'
+
+    def __init__(self):
+        from Crypto.Cipher import AES
+        self._new = AES.new
+        self._mode = AES.MODE_ECB
+
+    @staticmethod
+    def version() -> str:
+        import Crypto
+        return Crypto.__version__
+
+    def aes_ecb_decrypt(self, key: bytes, data: bytes) -> bytes:
+        return self._new(key, self._mode).decrypt(data)
+
+    def aes_ecb_encrypt(self, key: bytes, data: bytes) -> bytes:
+        return self._new(key, self._mode).encrypt(data)
+
+
+class CryptographyBackend(CryptoBackend):
+    name = 'cryptography'
+
+    def __init__(self):
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        self._cipher = Cipher
+        self._aes = algorithms.AES
+        self._ecb = modes.ECB()
+
+    @staticmethod
+    def version() -> str:
+        import cryptography
+        return cryptography.__version__
+
+    def aes_ecb_decrypt(self, key: bytes, data: bytes) -> bytes:
+        decryptor = self._cipher(self._aes(key), self._ecb).decryptor()
+        return decryptor.update(data) + decryptor.finalize()
+
+    def aes_ecb_encrypt(self, key: bytes, data: bytes) -> bytes:
+        encryptor = self._cipher(self._aes(key), self._ecb).encryptor()
+        return encryptor.update(data) + encryptor.finalize()
+
+
+BACKENDS = {
+    PyCryptodomeBackend.name: PyCryptodomeBackend,
+    CryptographyBackend.name: CryptographyBackend,
+}
+
+
+def available_backends() -> Dict[str, CryptoBackend]:
+    """Instancie les backends dont la bibliothèque est installée."""
+    result = {}
+    for name, cls in BACKENDS.items():
+        try:
+            result[name] = cls()
+        except ImportError:
+            continue
+    return result
+
+
+def check_equivalence(backends: Optional[Dict[str, CryptoBackend]] = None,
+                      samples: int = 64, seed: int = 0) -> List[str]:
+    """Compare les backends deux à deux ; retourne la liste des écarts trouvés."""
+    import random
+    backends = backends if backends is not None else available_backends()
+    rng = random.Random(seed)
+    errors = []
+    names = sorted(backends)
+    for _ in range(samples):
+        key = bytes(rng.randrange(256) for _ in range(16))
+        block = bytes(rng.randrange(256) for _ in range(16))
+        material = bytes(rng.randrange(256) for _ in range(86))
+        outputs = {}
+        for name in names:
+            backend = backends[name]
+            encrypted = backend.aes_ecb_encrypt(key, block)
+            outputs[name] = (encrypted, backend.aes_ecb_decrypt(key, encrypted), backend.md5(material))
+            if outputs[name][1] != block:
+                errors.append(f"{name}: decrypt(encrypt(x)) != x")
+        reference = outputs[names[0]] if names else None
+        for name in names[1:]:
+            if outputs[name] != reference:
+                errors.append(f"{name} diffère de {names[0]} (clé {key.hex()})")
+    return errors
+
+
+def known_answer_test(backend: CryptoBackend) -> List[str]:
+    """Vérifie un backend sur des vecteurs de test publiés ; retourne les écarts trouvés."""
+    errors = []
+    for key, plain, cipher in _AES_KNOWN_ANSWERS:
+        key, plain, cipher = bytes.fromhex(key), bytes.fromhex(plain), bytes.fromhex(cipher)
+        try:
+            if backend.aes_ecb_encrypt(key, plain) != cipher:
+                errors.append(f"{backend.name}: chiffrement AES incorrect (clé {key.hex()})")
+            if backend.aes_ecb_decrypt(key, cipher) != plain:
+                errors.append(f"{backend.name}: déchiffrement AES incorrect (clé {key.hex()})")
+        except Exception as e:
+            errors.append(f"{backend.name}: {e}")
+    data, digest = _MD5_KNOWN_ANSWER
+    if backend.md5(data).hex() != digest:
+        errors.append(f"{backend.name}: MD5 incorrect")
+    return errors
+
+
+def benchmark_backend(backend: CryptoBackend, blocks: int = _BENCH_BLOCKS) -> float:
+    """Blocs déchiffrés+chiffrés par seconde (clé différente à chaque bloc, comme en réel)."""
+    keys = [hashlib.md5(i.to_bytes(4, 'little')).digest() for i in range(52)]
+    block = bytes(16)
+    started = time.perf_counter()
+    for i in range(blocks):
+        key = keys[i % 52]
+        backend.aes_ecb_encrypt(key, backend.aes_ecb_decrypt(key, block))
+    elapsed = time.perf_counter() - started
+    return blocks / elapsed if elapsed else float('inf')
+
+
+def _cache_path() -> str:
+    return os.path.join(user_cache_dir(), CACHE_FILE)
+
+
+def _environment_key(backends: Dict[str, CryptoBackend]) -> dict:
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'backends': {name: b.version() for name, b in sorted(backends.items())},
+    }
+
+
+def _read_cache() -> Optional[dict]:
+    try:
+        with open(_cache_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(content: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(_cache_path()), exist_ok=True)
+        tmp = _cache_path() + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(content, f, indent=2)
+        os.replace(tmp, _cache_path())
+    except OSError:
+        pass  # Le cache n'est qu'une optimisation
+
+
+def _warn(message: str) -> None:
+    print(f"skylander_backends: {message}", file=sys.stderr)
+
+
+def select_backend(rebench: bool = False) -> CryptoBackend:
+    """Choisit le backend : variable d'environnement, puis cache disque, puis benchmark.
+
+    Seuls les backends qui passent les vecteurs de test AES/MD5 sont candidats ;
+    les autres sont écartés avec un avertissement sur stderr.
+    """
+    backends = available_backends()
+    if not backends:
+        raise ImportError("Aucun backend AES disponible : installez pycryptodome ou cryptography")
+
+    rejected = {name: known_answer_test(b) for name, b in backends.items()}
+    rejected = {name: errors for name, errors in rejected.items() if errors}
+    for errors in rejected.values():
+        for error in errors:
+            _warn(f"backend écarté, {error}")
+
+    forced = os.environ.get(BACKEND_ENV, '').strip().lower()
+    if forced:
+        if forced not in backends:
+            raise ImportError(f"Backend crypto '{forced}' demandé par {BACKEND_ENV} mais indisponible "
+                              f"(disponibles: {', '.join(sorted(backends))})")
+        if forced in rejected:
+            raise ImportError(f"Backend crypto '{forced}' demandé par {BACKEND_ENV} mais invalide")
+        return backends[forced]
+
+    valid = {name: b for name, b in backends.items() if name not in rejected}
+    if not valid:
+        raise ImportError("Aucun backend AES valide (vecteurs de test en échec)")
+    if len(valid) == 1:
+        return next(iter(valid.values()))
+
+    env_key = _environment_key(backends)
+    cached = None if rebench else _read_cache()
+    if cached and cached.get('environment') == env_key and cached.get('selected') in valid:
+        if cached.get('mismatch'):
+            _warn(f"backends non équivalents, {cached['selected']} retenu (voir {_cache_path()})")
+        return valid[cached['selected']]
+
+    # Backends valides mais en désaccord : le premier dans l'ordre de préférence, sans benchmark
+    mismatch = check_equivalence(valid, samples=16)
+    if mismatch:
+        selected = next(name for name in BACKENDS if name in valid)
+        _warn(f"backends non équivalents ({len(mismatch)} écart(s), ex: {mismatch[0]}), {selected} retenu")
+        _write_cache({'environment': env_key, 'selected': selected, 'mismatch': mismatch,
+                      'time': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        return valid[selected]
+    scores = {name: benchmark_backend(b) for name, b in valid.items()}
+    selected = max(scores, key=scores.get)
+    _write_cache({'environment': env_key, 'selected': selected, 'blocks_per_s': scores,
+                  'time': time.strftime('%Y-%m-%dT%H:%M:%S')})
+    return valid[selected]
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Backends crypto de skylander_core")
+    parser.add_argument('--check', action='store_true', help="vérifier l'équivalence des backends")
+    parser.add_argument('--rebench', action='store_true', help="refaire le micro-benchmark de sélection")
+    args = parser.parse_args()
+
+    backends = available_backends()
+    for name, backend in sorted(backends.items()):
+        print(f"{name:<14} {backend.version():<10} {benchmark_backend(backend):>12,.0f} blocs/s")
+
+    if args.check:
+        errors = [e for b in backends.values() for e in known_answer_test(b)]
+        errors += check_equivalence(backends, samples=1000)
+        for error in errors:
+            print(f"✗ {error}")
+        print("✓ Backends équivalents" if not errors else f"{len(errors)} écart(s)")
+        if errors:
+            return 1
+
+    selected = select_backend(rebench=args.rebench)
+    print(f"Backend sélectionné: {selected.name} (cache: {_cache_path()})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Skylanders Shared-Memory Batch
+==============================
+Moteur de traitement en masse : les figurines sont placées dans un bloc
+`multiprocessing.shared_memory`, chaque worker déchiffre, modifie, recalcule
+les checksums et rechiffre sa tranche sur place (vues mémoire, sans copie),
+et seuls de petits enregistrements de résultat traversent les processus.
+
+Usage:
+    python skylander_batch.py max figurines/*.sky --write
+    python skylander_batch.py verify figurines/ --workers 4
+    python skylander_batch.py max figurines/ --write --journal max.journal   # reprenable
+    python skylander_batch.py --rollback max.journal
+    python skylander_batch.py --compare -n 20000    # mémoire partagée vs pickle
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from skylander_core import (
+    Skylander, SKYLANDER_SIZE, DURABILITY_LEVELS, AtomicWriter, BatchJournal, JournaledWriter, list_sky_files,
+)
+
+
+OPERATIONS = ('info', 'verify', 'edit', 'max', 'reset')
+MUTATING_OPERATIONS = ('edit', 'max', 'reset')
+
+# Figurines par tâche : assez pour amortir l'envoi, assez peu pour répartir la charge
+MAX_SLICE = 256
+# Fichiers par lot en ligne de commande : borne la mémoire partagée, et un arrêt
+# en cours de route ne perd qu'un lot (voir --journal)
+CHUNK_SIZE = 4096
+
+
+def apply_edit(skylander: Skylander, params: dict) -> None:
+    """Applique les champs level/xp/money/hero_points présents dans `params`."""
+    if 'level' in params:
+        skylander.set_level(int(params['level']))
+    if 'xp' in params:
+        skylander.set_xp(int(params['xp']))
+    if 'money' in params:
+        skylander.set_money(int(params['money']))
+    if 'hero_points' in params:
+        skylander.set_hero_points(int(params['hero_points']))
+
+
+# Opération personnalisée : fonction de module (sérialisable) appelée sur le Skylander
+# déchiffré, qui retourne son résultat ; `result['modified']` faux = rien à réécrire.
+FigureHandler = Callable[[Skylander, dict], dict]
+
+
+def is_mutating(op) -> bool:
+    return callable(op) or op in MUTATING_OPERATIONS
+
+
+def job_description(op, params: dict) -> dict:
+    """Identité d'un traitement, enregistrée dans l'en-tête de son journal."""
+    name = op if isinstance(op, str) else f'{op.__module__}.{op.__qualname__}'
+    return {'op': name, 'params': params}
+
+
+def process_figure(skylander: Skylander, op, params: dict) -> dict:
+    """Applique `op` à un Skylander chiffré ; les opérations de modification le rechiffrent sur place."""
+    skylander.decrypt()
+    if callable(op):
+        result = op(skylander, params)
+        if result.get('modified', True):
+            skylander.update_checksums()
+            skylander.encrypt_in_place()
+        return result
+
+    if op == 'verify':
+        checks = skylander.verify_checksums()
+        return {'uid': skylander.get_uid(), 'valid': all(checks.values()), 'checks': checks}
+
+    if op == 'edit':
+        apply_edit(skylander, params)
+    elif op == 'max':
+        skylander.max_out()
+    elif op == 'reset':
+        skylander.reset_stats()
+
+    result = skylander.get_summary()
+    if op == 'info':
+        result['checksums_valid'] = skylander.checksums_valid()
+        return result
+    skylander.update_checksums()
+    skylander.encrypt_in_place()
+    return result
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Ouvre un bloc existant ; c'est le créateur qui le libère (unlink)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 : les workers partagent le resource tracker du parent, où le
+        # bloc est déjà enregistré ; le désenregistrer ici casserait l'unlink du parent.
+        return shared_memory.SharedMemory(name=name)
+
+
+def _verify_range(buf, start: int, stop: int) -> List[dict]:
+    """Vérification d'une tranche : déchiffrement sur place, puis CRC de toute la tranche d'un coup."""
+    from skylander_crc import batch_verify
+    uids = []
+    for index in range(start, stop):
+        view = buf[index * SKYLANDER_SIZE:(index + 1) * SKYLANDER_SIZE]
+        skylander = Skylander.from_buffer(view)
+        try:
+            skylander.decrypt()
+            uids.append(skylander.get_uid())
+        finally:
+            skylander.data.release()
+            view.release()
+    region = buf[start * SKYLANDER_SIZE:stop * SKYLANDER_SIZE]
+    try:
+        checks = batch_verify(region)
+    finally:
+        region.release()
+    return [{'uid': uid, 'valid': all(c.values()), 'checks': c} for uid, c in zip(uids, checks)]
+
+
+def _process_range(buf, start: int, stop: int, op, params: dict) -> List[dict]:
+    if op == 'verify':
+        return _verify_range(buf, start, stop)
+    results = []
+    for index in range(start, stop):
+        view = buf[index * SKYLANDER_SIZE:(index + 1) * SKYLANDER_SIZE]
+        skylander = Skylander.from_buffer(view)
+        try:
+            results.append(process_figure(skylander, op, params))
+        except (ValueError, TypeError, KeyError) as e:
+            results.append({'error': str(e)})
+        finally:
+            # Les vues doivent être libérées avant la fermeture du bloc
+            skylander.data.release()
+            view.release()
+    return results
+
+
+def _process_slice(name: str, start: int, stop: int, op, params: dict) -> List[dict]:
+    shm = _attach(name)
+    try:
+        return _process_range(shm.buf, start, stop, op, params)
+    finally:
+        shm.close()
+
+
+class SharedMemoryBatch:
+    """Pool de workers traitant des lots de figurines en mémoire partagée.
+
+    `op` est un nom de OPERATIONS ou un FigureHandler.
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def _slices(self, count: int) -> List[Tuple[int, int]]:
+        size = max(1, min(MAX_SLICE, -(-count // (self.workers * 4))))
+        return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+    def _run(self, count: int, fill: Callable[[memoryview], Dict[int, str]], op, params: dict,
+             drain: Optional[Callable[[memoryview, List[dict]], None]]) -> List[dict]:
+        if not callable(op) and op not in OPERATIONS:
+            raise ValueError(f"Opération inconnue: {op}")
+        if count == 0:
+            return []
+        shm = shared_memory.SharedMemory(create=True, size=count * SKYLANDER_SIZE)
+        try:
+            buf = shm.buf
+            try:
+                failed = fill(buf)
+                if self._pool is None:
+                    results = _process_range(buf, 0, count, op, params)
+                else:
+                    futures = [self._pool.submit(_process_slice, shm.name, start, stop, op, params)
+                               for start, stop in self._slices(count)]
+                    results = []
+                    for future in futures:
+                        results.extend(future.result())
+                for index, message in failed.items():
+                    results[index] = {'error': message}
+                if drain is not None and is_mutating(op):
+                    drain(buf, results)
+            finally:
+                buf.release()
+        finally:
+            shm.close()
+            shm.unlink()
+        return results
+
+    def run(self, figures: Sequence[bytes], op,
+            params: Optional[dict] = None) -> Tuple[List[dict], List[bytes]]:
+        """Traite des figurines chiffrées ; retourne (résultats, figurines rechiffrées si modifiées)."""
+        for i, data in enumerate(figures):
+            if len(data) != SKYLANDER_SIZE:
+                raise ValueError(f"Figurine {i}: taille invalide ({len(data)} octets)")
+        outputs: List[bytes] = []
+
+        def fill(buf: memoryview) -> Dict[int, str]:
+            for i, data in enumerate(figures):
+                buf[i * SKYLANDER_SIZE:(i + 1) * SKYLANDER_SIZE] = data
+            return {}
+
+        def drain(buf: memoryview, _results: List[dict]) -> None:
+            outputs.extend(bytes(buf[i * SKYLANDER_SIZE:(i + 1) * SKYLANDER_SIZE])
+                           for i in range(len(figures)))
+
+        results = self._run(len(figures), fill, op, params or {}, drain)
+        return results, outputs
+
+    def run_files(self, paths: Sequence[str], op, params: Optional[dict] = None,
+                  write: bool = False, durability: str = 'batch',
+                  journal: Optional[BatchJournal] = None) -> List[dict]:
+        """Traite des fichiers .sky, lus directement dans la mémoire partagée (et réécrits
+        atomiquement si `write`, avec le niveau de durabilité donné).
+
+        Avec un `journal`, les fichiers qu'il donne pour terminés sont ignorés (résultat
+        `{'skipped': True}`) et chaque réécriture y est consignée (voir BatchJournal).
+        """
+        journaled = journal is not None and write and is_mutating(op)
+        selected = [i for i, path in enumerate(paths) if not (journaled and journal.completed(path))]
+        todo = [paths[i] for i in selected]
+        originals: List[Optional[bytes]] = [None] * len(todo)
+
+        def fill(buf: memoryview) -> Dict[int, str]:
+            # Un fichier illisible n'interrompt pas le lot : son emplacement reste à zéro
+            failed = {}
+            for i, path in enumerate(todo):
+                slot = buf[i * SKYLANDER_SIZE:(i + 1) * SKYLANDER_SIZE]
+                try:
+                    with open(path, 'rb') as f:
+                        read = f.readinto(slot)
+                        if read != SKYLANDER_SIZE or f.read(1):
+                            failed[i] = f"Taille invalide (attendu: {SKYLANDER_SIZE} octets)"
+                        elif journaled:
+                            originals[i] = bytes(slot)  # Gardé pour le journal (rollback)
+                except OSError as e:
+                    failed[i] = str(e)
+                finally:
+                    slot.release()
+            return failed
+
+        def drain(buf: memoryview, results: List[dict]) -> None:
+            writer = (JournaledWriter(journal, durability, window=len(todo)) if journaled
+                      else AtomicWriter(durability, window=len(todo)))
+            with writer:
+                for i, path in enumerate(todo):
+                    if 'error' in results[i]:
+                        continue
+                    if not results[i].get('modified', True):
+                        if journaled:
+                            journal.unchanged(path, originals[i])
+                    elif journaled:
+                        writer.write(path, buf[i * SKYLANDER_SIZE:(i + 1) * SKYLANDER_SIZE], originals[i])
+                    else:
+                        writer.write(path, buf[i * SKYLANDER_SIZE:(i + 1) * SKYLANDER_SIZE])
+
+        results = self._run(len(todo), fill, op, params or {}, drain if write else None)
+        for path, result in zip(todo, results):
+            result['path'] = path
+        if len(todo) == len(paths):
+            return results
+        merged = [{'path': path, 'skipped': True} for path in paths]
+        for i, result in zip(selected, results):
+            merged[i] = result
+        return merged
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> 'SharedMemoryBatch':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ============================================================================
+# COMPARAISON AVEC LE PASSAGE PAR PICKLE
+# ============================================================================
+
+def _pickled_chunk(figures: List[bytes], op: str, params: dict) -> Tuple[List[dict], List[bytes]]:
+    results, outputs = [], []
+    for data in figures:
+        skylander = Skylander(data)
+        results.append(process_figure(skylander, op, params))
+        outputs.append(bytes(skylander.data))
+    return results, outputs
+
+
+def compare_transports(count: int, workers: int, op: str = 'max') -> dict:
+    """Débit (figurines/s) en mémoire partagée et en envoyant les figurines par pickle."""
+    from skylander_generator import generate_figures
+    figures = generate_figures(count, seed=7)
+    rates = {}
+
+    with SharedMemoryBatch(workers) as engine:
+        engine.run(figures[:workers], op)  # Démarrage des workers hors mesure
+        started = time.perf_counter()
+        engine.run(figures, op)
+        rates['shared_memory'] = count / (time.perf_counter() - started)
+
+    size = max(1, min(MAX_SLICE, -(-count // (workers * 4))))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(_pickled_chunk, [figures[:1]] * workers, [op] * workers, [{}] * workers))
+        started = time.perf_counter()
+        chunks = [figures[i:i + size] for i in range(0, count, size)]
+        for _ in pool.map(_pickled_chunk, chunks, [op] * len(chunks), [{}] * len(chunks)):
+            pass
+        rates['pickle'] = count / (time.perf_counter() - started)
+    return rates
+
+
+def rollback(path: str, durability: str = 'batch', force: bool = False) -> int:
+    """Restaure les originaux consignés dans un journal ; code de retour du CLI."""
+    if not os.path.exists(path):
+        print(f"✗ Journal introuvable: {path}")
+        return 1
+    try:
+        with BatchJournal(path) as journal:
+            report = journal.rollback(durability, force)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+    for conflict in report['conflicts']:
+        print(f"✗ {conflict}: modifié depuis le traitement (ignoré, voir --force)")
+    print(f"{report['restored']} fichier(s) restauré(s), {report['unchanged']} déjà d'origine, "
+          f"{len(report['conflicts'])} conflit(s)")
+    return 1 if report['conflicts'] else 0
+
+
+def _collect_paths(inputs: List[str]) -> List[str]:
+    paths = []
+    for item in inputs:
+        paths.extend(list_sky_files(item) if os.path.isdir(item) else [item])
+    return paths
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Traitement en masse de .sky en mémoire partagée")
+    parser.add_argument('op', nargs='?', choices=OPERATIONS)
+    parser.add_argument('inputs', nargs='*', help="fichiers .sky ou dossiers")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--write', action='store_true', help="réécrire les fichiers modifiés")
+    parser.add_argument('--durability', choices=DURABILITY_LEVELS, default='batch',
+                        help="synchronisation disque des fichiers réécrits (défaut: batch)")
+    parser.add_argument('--journal', metavar='FICHIER',
+                        help="journal de reprise : les fichiers déjà traités sont ignorés (avec --write)")
+    parser.add_argument('--rollback', metavar='JOURNAL',
+                        help="remettre les fichiers d'origine consignés dans un journal")
+    parser.add_argument('--force', action='store_true',
+                        help="avec --rollback : restaurer aussi les fichiers modifiés depuis")
+    parser.add_argument('--level', type=int)
+    parser.add_argument('--xp', type=int)
+    parser.add_argument('--money', type=int)
+    parser.add_argument('--hero-points', type=int)
+    parser.add_argument('--compare', action='store_true',
+                        help="comparer mémoire partagée et pickle sur des figurines synthétiques")
+    parser.add_argument('-n', '--count', type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.compare:
+        rates = compare_transports(args.count, max(2, args.workers), args.op or 'max')
+        for name, rate in rates.items():
+            print(f"{name:<14} {rate:>10,.0f} figurines/s")
+        return 0
+    if args.rollback:
+        return rollback(args.rollback, args.durability, args.force)
+    if not args.op or not args.inputs:
+        parser.error("opération et fichiers requis (ou --compare, --rollback)")
+    if args.journal and not args.write:
+        parser.error("--journal n'a de sens qu'avec --write")
+
+    params = {k: v for k, v in (('level', args.level), ('xp', args.xp), ('money', args.money),
+                                ('hero_points', args.hero_points)) if v is not None}
+    paths = _collect_paths(args.inputs)
+    journal = None
+    if args.journal:
+        try:
+            journal = BatchJournal(args.journal, job_description(args.op, params))
+        except (OSError, ValueError) as e:
+            print(f"✗ {e}")
+            return 1
+    started = time.perf_counter()
+    try:
+        with SharedMemoryBatch(args.workers) as engine:
+            results = []
+            for start in range(0, len(paths), CHUNK_SIZE):
+                results.extend(engine.run_files(paths[start:start + CHUNK_SIZE], args.op, params,
+                                                write=args.write, durability=args.durability,
+                                                journal=journal))
+    finally:
+        if journal is not None:
+            journal.close()
+    elapsed = time.perf_counter() - started
+
+    errors = skipped = 0
+    for result in results:
+        if result.get('skipped'):
+            skipped += 1
+        elif 'error' in result:
+            errors += 1
+            print(f"✗ {os.path.basename(result['path'])}: {result['error']}")
+        elif args.op == 'verify' and not result['valid']:
+            errors += 1
+            print(f"✗ {os.path.basename(result['path'])}: checksums invalides")
+    processed = len(results) - skipped
+    rate = processed / elapsed if elapsed else 0.0
+    print(f"{processed} figurines ({args.op}) en {elapsed:.2f}s ({rate:,.0f}/s), {errors} erreur(s)")
+    if skipped:
+        print(f"{skipped} figurine(s) ignorée(s) : déjà traitées d'après le journal")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
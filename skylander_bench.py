@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Skylanders Benchmarks
+=====================
+Benchmarks hors-ligne des chemins critiques de skylander_core :
+dérivation de clé MD5, AES par bloc, CRC16, déchiffrement/chiffrement
+complet, recalcul des checksums, aller-retour complet sur des lots de
+figurines synthétiques (1, 1k et 100k par défaut) et démarrage à froid.
+
+Usage:
+    python skylander_bench.py run -o resultats.json [--sizes 1,1000] [--only crc]
+    python skylander_bench.py compare baseline.json resultats.json [--threshold 0.10]
+    python skylander_bench.py run --baseline baseline.json
+    python skylander_bench.py stress --readers 8 --writers 2   # SharedSkylander sous contention
+"""
+
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from skylander_core import (
+    Skylander, SharedSkylander, CRC16, SKYLANDER_SIZE, DURABILITY_LEVELS, AtomicWriter, BatchJournal,
+    JournaledWriter, compute_key, decrypt_block, encrypt_block
+)
+from skylander_generator import generate_figures
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SIZES = (1, 1000, 100000)
+DEFAULT_MIN_TIME = 0.5
+
+# Scénario : fonction(taille) -> (étape(i), nombre d'éléments par passe)
+Scenario = Callable[[int], Tuple[Callable[[int], object], int]]
+
+MICRO_SCENARIOS: Dict[str, Scenario] = {}
+BATCH_SCENARIOS: Dict[str, Scenario] = {}
+
+
+def micro(name: str):
+    """Enregistre un micro-benchmark (une opération, répétée pendant min_time)."""
+    def register(fn: Scenario) -> Scenario:
+        MICRO_SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+def batch(name: str):
+    """Enregistre un benchmark de lot, exécuté pour chaque taille demandée."""
+    def register(fn: Scenario) -> Scenario:
+        BATCH_SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+_figure_cache: Dict[int, List[bytes]] = {}
+
+
+def figures(count: int) -> List[bytes]:
+    """Figurines synthétiques déterministes (mises en cache entre scénarios)."""
+    largest = max(_figure_cache, default=0)
+    if largest >= count:
+        return _figure_cache[largest][:count]
+    _figure_cache.clear()
+    _figure_cache[count] = generate_figures(count, seed=1234)
+    return _figure_cache[count]
+
+
+def decrypted_figures(count: int) -> List[Skylander]:
+    result = []
+    for data in figures(count):
+        skylander = Skylander(data)
+        skylander.decrypt()
+        result.append(skylander)
+    return result
+
+
+# ============================================================================
+# SCÉNARIOS
+# ============================================================================
+
+@micro('compute_key')
+def _bench_compute_key(_size: int):
+    sector0 = figures(1)[0][:0x20]
+    return (lambda i: compute_key(sector0, 0x08 + (i & 0x1F))), 1
+
+
+@micro('decrypt_block')
+def _bench_decrypt_block(_size: int):
+    data = figures(1)[0]
+    sector0, block = data[:0x20], data[0x80:0x90]
+    return (lambda i: decrypt_block(block, sector0, 0x08)), 1
+
+
+@micro('encrypt_block')
+def _bench_encrypt_block(_size: int):
+    data = figures(1)[0]
+    sector0, block = data[:0x20], data[0x80:0x90]
+    return (lambda i: encrypt_block(block, sector0, 0x08)), 1
+
+
+@micro('crc16.calculate[272B]')
+def _bench_crc16(_size: int):
+    payload = bytes(range(48)) + b'\x00' * 224  # Taille d'un CRC type 3
+    return (lambda i: CRC16.calculate(payload)), 1
+
+
+def _register_backend_scenarios() -> None:
+    """Un micro-benchmark AES par backend crypto installé."""
+    from skylander_backends import available_backends
+    for name, backend in available_backends().items():
+        def scenario(_size: int, backend=backend):
+            key = compute_key(figures(1)[0][:0x20], 0x08)
+            block = figures(1)[0][0x80:0x90]
+            return (lambda i: backend.aes_ecb_decrypt(key, block)), 1
+        micro(f'aes[{name}]')(scenario)
+
+
+_register_backend_scenarios()
+
+
+@micro('skylander.decrypt')
+def _bench_decrypt(_size: int):
+    data = figures(1)[0]
+    return (lambda i: Skylander(data).decrypt()), 1
+
+
+@micro('skylander.encrypt')
+def _bench_encrypt(_size: int):
+    skylander = decrypted_figures(1)[0]
+    return (lambda i: skylander.encrypt()), 1
+
+
+@micro('skylander.update_checksums')
+def _bench_update_checksums(_size: int):
+    skylander = decrypted_figures(1)[0]
+    return (lambda i: skylander.update_checksums()), 1
+
+
+@micro('skylander.update_checksums[force]')
+def _bench_update_checksums_force(_size: int):
+    skylander = decrypted_figures(1)[0]
+    return (lambda i: skylander.update_checksums(force=True)), 1
+
+
+def _register_save_scenarios() -> None:
+    """Débit des sauvegardes atomiques pour chaque niveau de durabilité (1000 fichiers tournants)."""
+    import atexit
+    import shutil
+    import tempfile
+    for durability in DURABILITY_LEVELS:
+        def scenario(_size: int, durability=durability):
+            directory = tempfile.mkdtemp(prefix='skylander_bench_')
+            atexit.register(shutil.rmtree, directory, True)
+            data = figures(1)[0]
+            paths = [os.path.join(directory, f'{i:04d}.sky') for i in range(1000)]
+            writer = AtomicWriter(durability, window=256)
+            atexit.register(writer.abort)
+            counter = itertools.count()
+            return (lambda i: writer.write(paths[next(counter) % 1000], data)), 1
+        micro(f'save[{durability}]')(scenario)
+
+    def journaled(_size: int):
+        # Même écriture que save[batch], consignée dans un BatchJournal (coût du journal)
+        directory = tempfile.mkdtemp(prefix='skylander_bench_')
+        atexit.register(shutil.rmtree, directory, True)
+        data = figures(1)[0]
+        paths = [os.path.join(directory, f'{i:04d}.sky') for i in range(1000)]
+        journal = BatchJournal(os.path.join(directory, 'journal'), {'op': 'bench'})
+        writer = JournaledWriter(journal, 'batch', window=256)
+        atexit.register(journal.close)
+        atexit.register(writer.abort)
+        counter = itertools.count()
+        return (lambda i: writer.write(paths[next(counter) % 1000], data, data)), 1
+    micro('save[batch+journal]')(journaled)
+
+
+_register_save_scenarios()
+
+
+@micro('shared.snapshot.summary')
+def _bench_shared_read(_size: int):
+    shared = SharedSkylander(Skylander(figures(1)[0]))
+    return (lambda i: shared.snapshot().summary), 1
+
+
+@micro('shared.edit')
+def _bench_shared_edit(_size: int):
+    shared = SharedSkylander(Skylander(figures(1)[0]))
+
+    def step(i: int) -> None:
+        with shared.edit() as skylander:
+            skylander.set_money(i & 0xFFFF)
+    return step, 1
+
+
+@batch('roundtrip')
+def _bench_roundtrip(size: int):
+    """Déchiffrement + édition + checksums + chiffrement de chaque figurine."""
+    batch_data = figures(size)
+
+    def step(i: int) -> bytes:
+        skylander = Skylander(batch_data[i])
+        skylander.decrypt()
+        skylander.set_xp(skylander.get_xp() + 1)
+        skylander.update_checksums()
+        return skylander.encrypt()
+    return step, size
+
+
+@batch('verify')
+def _bench_verify(size: int):
+    """Déchiffrement + vérification des checksums de chaque figurine."""
+    batch_data = figures(size)
+
+    def step(i: int) -> bool:
+        skylander = Skylander(batch_data[i])
+        skylander.decrypt()
+        return skylander.checksums_valid()
+    return step, size
+
+
+def import_timings(module: str, top: int = 10) -> dict:
+    """Démarrage à froid : importe `module` dans un nouvel interpréteur (python -X importtime)."""
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=HERE, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - started
+    # Lignes "import time: <propre µs> | <cumulé µs> | <indentation><module>"
+    # Les sous-imports sont listés avant le module qui les importe
+    pending, children = [], []
+    total = 0.0
+    for line in proc.stderr.splitlines():
+        fields = line[len('import time:'):].split('|')
+        if not line.startswith('import time:') or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2][1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        cumulative = int(fields[1]) / 1e6
+        if depth == 1:
+            pending.append((name.strip(), cumulative))
+        elif depth == 0:
+            if name == module:
+                total, children = cumulative, pending
+            pending = []
+    children.sort(key=lambda c: c[1], reverse=True)
+    return {'wall_s': wall, 'import_s': total, 'imports': children[:top]}
+
+
+def _register_cold_start_scenarios() -> None:
+    """Temps de lancement d'un interpréteur qui importe le module (GUI comprise, sans fenêtre)."""
+    for module in ('skylander_core', 'skylander_editor_gui'):
+        def scenario(_size: int, module=module):
+            command = [sys.executable, '-c', f'import {module}']
+            return (lambda i: subprocess.run(command, cwd=HERE, check=True)), 1
+        micro(f'cold_start[{module}]')(scenario)
+
+
+_register_cold_start_scenarios()
+
+
+# ============================================================================
+# CONTENTION (SharedSkylander)
+# ============================================================================
+
+def _stress_values(k: int) -> Tuple[int, int, int]:
+    # Trois champs liés : un état déchiré (écriture à moitié faite) casse la relation
+    return k * 100, k * 100, k
+
+
+def _check_snapshot(data: bytes, summary: Optional[dict]) -> Optional[str]:
+    """Retourne la description de l'incohérence trouvée, ou None."""
+    skylander = Skylander.from_decrypted(data)
+    for area in (0, 1):
+        offset = skylander._header_offset(area)
+        if data[offset:offset + 6] != data[0x80:0x86]:
+            return "zones 0 et 1 différentes"
+    xp, money, hero = skylander.get_xp(), skylander.get_money(), skylander.get_hero_points()
+    if (xp, money, hero) != _stress_values(hero):
+        return f"stats incohérentes (xp={xp}, money={money}, hero={hero})"
+    if not skylander.checksums_valid():
+        return "checksums invalides"
+    if summary is not None and summary != skylander.get_summary():
+        return "stats en cache différentes du contenu"
+    return None
+
+
+def stress_shared(readers: int = 8, writers: int = 2, duration: float = 2.0,
+                  unsafe: bool = False) -> dict:
+    """Lecteurs et écrivains concurrents sur une même figurine ; compte les états incohérents.
+
+    Avec `unsafe`, les threads partagent un Skylander nu (sans verrou ni
+    instantané) : sert à vérifier que le test détecte bien les états déchirés.
+    """
+    import threading
+    base = Skylander(figures(1)[0])
+    base.decrypt()
+    values = _stress_values(0)
+    base.set_xp(values[0])
+    base.set_money(values[1])
+    base.set_hero_points(values[2])
+    base.update_checksums()
+    shared = SharedSkylander(base)
+    bare = base.copy()
+
+    stop = threading.Event()
+    counts = {'reads': 0, 'writes': 0, 'inconsistent': 0, 'version_regressions': 0}
+    examples: List[str] = []
+    lock = threading.Lock()  # Agrégation des compteurs uniquement
+
+    def writer(seed: int) -> None:
+        k, writes = seed, 0
+        while not stop.is_set():
+            k = (k + 7) % 100
+            xp, money, hero = _stress_values(k)
+            if unsafe:
+                bare.set_xp(xp)
+                bare.set_money(money)
+                bare.set_hero_points(hero)
+                bare.update_checksums()
+            else:
+                with shared.edit() as skylander:
+                    skylander.set_xp(xp)
+                    skylander.set_money(money)
+                    skylander.set_hero_points(hero)
+            writes += 1
+        with lock:
+            counts['writes'] += writes
+
+    def reader() -> None:
+        reads = inconsistent = regressions = 0
+        last_version = -1
+        while not stop.is_set():
+            if unsafe:
+                problem = _check_snapshot(bytes(bare.data), None)
+            else:
+                snapshot = shared.snapshot()
+                if snapshot.version < last_version:
+                    regressions += 1
+                last_version = snapshot.version
+                problem = _check_snapshot(snapshot.data, snapshot.summary)
+            reads += 1
+            if problem:
+                inconsistent += 1
+                if len(examples) < 5:
+                    examples.append(problem)
+        with lock:
+            counts['reads'] += reads
+            counts['inconsistent'] += inconsistent
+            counts['version_regressions'] += regressions
+
+    # Changements de thread très fréquents pour multiplier les entrelacements
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        sys.setswitchinterval(interval)
+    elapsed = time.perf_counter() - started
+    return dict(counts, mode='unsafe' if unsafe else 'shared', readers=readers, writers=writers,
+                reads_per_s=counts['reads'] / elapsed, writes_per_s=counts['writes'] / elapsed,
+                examples=examples)
+
+
+# ============================================================================
+# EXÉCUTION
+# ============================================================================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentile (plus proche rang) d'une liste déjà triée."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def measure(step: Callable[[int], object], count: int, min_time: float) -> dict:
+    """Exécute `step` sur `count` éléments, en boucle jusqu'à `min_time` secondes."""
+    latencies: List[float] = []
+    clock = time.perf_counter
+    started = clock()
+    while True:
+        for i in range(count):
+            t0 = clock()
+            step(i)
+            latencies.append(clock() - t0)
+        if clock() - started >= min_time:
+            break
+    elapsed = clock() - started
+    latencies.sort()
+    return {
+        'iterations': len(latencies),
+        'ops_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_us': percentile(latencies, 50) * 1e6,
+        'p95_us': percentile(latencies, 95) * 1e6,
+        'p99_us': percentile(latencies, 99) * 1e6,
+        'max_us': latencies[-1] * 1e6,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, only: Optional[str] = None,
+                   min_time: float = DEFAULT_MIN_TIME, log=print) -> dict:
+    """Exécute les scénarios et retourne les résultats (sérialisables en JSON)."""
+    plan = [(name, fn, 1) for name, fn in MICRO_SCENARIOS.items()]
+    for name, fn in BATCH_SCENARIOS.items():
+        plan.extend((f'{name}[{size}]', fn, size) for size in sizes)
+    if only:
+        plan = [p for p in plan if fnmatch.fnmatch(p[0], f'*{only}*')]
+
+    results = {}
+    for name, fn, size in plan:
+        step, count = fn(size)
+        # Les lots sont parcourus une fois ; un lot de 1 se répète comme un micro-benchmark
+        results[name] = measure(step, count, min_time if count <= 1 else 0.0)
+        if log:
+            r = results[name]
+            log(f"{name:<32} {r['ops_per_s']:>12,.0f} ops/s   p50 {r['p50_us']:>9.1f} µs   "
+                f"p99 {r['p99_us']:>9.1f} µs")
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'figure_size': SKYLANDER_SIZE,
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.10) -> List[dict]:
+    """Compare deux résultats ; une régression = débit inférieur de plus de `threshold`."""
+    rows = []
+    for name, base in baseline['results'].items():
+        cur = current['results'].get(name)
+        if cur is None or not base['ops_per_s']:
+            continue
+        ratio = cur['ops_per_s'] / base['ops_per_s']
+        rows.append({
+            'name': name,
+            'baseline_ops_per_s': base['ops_per_s'],
+            'current_ops_per_s': cur['ops_per_s'],
+            'ratio': ratio,
+            'regression': ratio < 1.0 - threshold,
+        })
+    return rows
+
+
+def print_comparison(rows: List[dict]) -> int:
+    regressions = 0
+    for row in rows:
+        flag = 'RÉGRESSION' if row['regression'] else ''
+        regressions += row['regression']
+        print(f"{row['name']:<32} {row['baseline_ops_per_s']:>12,.0f} → {row['current_ops_per_s']:>12,.0f} "
+              f"ops/s ({(row['ratio'] - 1) * 100:+6.1f}%) {flag}")
+    print(f"\n{regressions} régression(s) sur {len(rows)} scénarios")
+    return regressions
+
+
+def _load_json(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Benchmarks de skylander_core")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_p = sub.add_parser('run', help="exécuter les benchmarks")
+    run_p.add_argument('-o', '--output', help="fichier de résultats JSON")
+    run_p.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                       help="tailles des lots (défaut: 1,1000,100000)")
+    run_p.add_argument('--only', help="ne lancer que les scénarios contenant ce motif")
+    run_p.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                       help="durée minimale des micro-benchmarks (s)")
+    run_p.add_argument('--baseline', help="comparer au fichier de référence donné")
+    run_p.add_argument('--threshold', type=float, default=0.10)
+
+    cmp_p = sub.add_parser('compare', help="comparer deux fichiers de résultats")
+    cmp_p.add_argument('baseline')
+    cmp_p.add_argument('current')
+    cmp_p.add_argument('--threshold', type=float, default=0.10,
+                       help="baisse de débit tolérée (défaut: 0.10 = 10%%)")
+
+    stress_p = sub.add_parser('stress', help="test de contention de SharedSkylander")
+    stress_p.add_argument('--readers', type=int, default=8)
+    stress_p.add_argument('--writers', type=int, default=2)
+    stress_p.add_argument('--duration', type=float, default=2.0, help="durée (s)")
+    stress_p.add_argument('--unsafe', action='store_true',
+                          help="Skylander nu sans verrou (doit produire des incohérences)")
+
+    args = parser.parse_args()
+
+    if args.command == 'stress':
+        report = stress_shared(args.readers, args.writers, args.duration, args.unsafe)
+        print(f"{report['mode']}: {report['readers']} lecteurs, {report['writers']} écrivains  "
+              f"{report['reads_per_s']:,.0f} lectures/s, {report['writes_per_s']:,.0f} écritures/s")
+        for example in report['examples']:
+            print(f"  ✗ {example}")
+        print(f"{report['inconsistent']} état(s) incohérent(s) sur {report['reads']} lectures, "
+              f"{report['version_regressions']} retour(s) de version")
+        failed = report['inconsistent'] or report['version_regressions']
+        return (0 if failed else 1) if args.unsafe else (1 if failed else 0)
+
+    if args.command == 'compare':
+        rows = compare_results(_load_json(args.baseline), _load_json(args.current), args.threshold)
+        return 1 if print_comparison(rows) else 0
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    results = run_benchmarks(sizes, args.only, args.min_time)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nRésultats écrits dans {args.output}")
+    if args.baseline:
+        print()
+        rows = compare_results(_load_json(args.baseline), results, args.threshold)
+        return 1 if print_comparison(rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Skylanders Decrypt Cache
+========================
+Cache disque (optionnel) des figurines déchiffrées, indexé par un hash des
+1024 octets chiffrés : une figurine inchangée n'est plus déchiffrée (52 MD5
++ 52 AES) ni ses CRC type 2/3 recalculés d'une exécution à l'autre.
+
+Activé par la variable d'environnement SKYLANDER_DECRYPT_CACHE (`1` pour
+l'emplacement par défaut, ou chemin du fichier), il est consulté par
+`Skylander.decrypt()` : chargement, vérification, exports, traitements en
+masse.
+
+- taille bornée (SKYLANDER_DECRYPT_CACHE_MB, 256 Mo par défaut), éviction
+  des entrées les moins récemment utilisées ;
+- partageable entre processus : base SQLite (verrous de fichier), écritures
+  regroupées dans des transactions IMMEDIATE ;
+- chaque lecture est vérifiée (empreinte du contenu, blocs non chiffrés
+  identiques à la figurine) ; une entrée corrompue est ignorée et supprimée.
+
+Usage:
+    python skylander_cache.py stats
+    python skylander_cache.py clear
+    python skylander_cache.py bench figurines/      # vérification sans cache, à froid, à chaud
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import struct
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from skylander_core import (
+    SKYLANDER_SIZE, DECRYPT_CACHE_ENV, is_encrypted_block, user_cache_dir
+)
+
+
+CACHE_FILE = 'decrypted.sqlite3'
+SIZE_ENV = 'SKYLANDER_DECRYPT_CACHE_MB'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Écritures (nouvelles entrées, dates d'accès) regroupées par transaction
+FLUSH_EVERY = 256
+FLUSH_INTERVAL = 2.0
+
+# CRC type 3 (zones 0, 1) puis type 2 (zones 0, 1)
+_CRCS = struct.Struct('<4H')
+# Place occupée par une entrée en plus du contenu (clé, empreinte, CRC, index)
+_ENTRY_OVERHEAD = 64
+
+# Blocs stockés en clair dans le fichier .sky : identiques dans le contenu déchiffré
+_PLAIN_BLOCKS = tuple(b for b in range(SKYLANDER_SIZE // 16) if not is_encrypted_block(b))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    plain BLOB NOT NULL,
+    crcs BLOB NOT NULL,
+    digest BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used);
+CREATE TABLE IF NOT EXISTS meta (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+    BEGIN UPDATE meta SET total = total + new.size; END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+    BEGIN UPDATE meta SET total = total - old.size; END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries
+    BEGIN UPDATE meta SET total = total - old.size + new.size; END;
+"""
+
+
+def default_cache_path() -> str:
+    return os.path.join(user_cache_dir(), CACHE_FILE)
+
+
+def _digest(key: bytes, plain: bytes, crcs: bytes) -> bytes:
+    return hashlib.blake2b(key + plain + crcs, digest_size=16).digest()
+
+
+class DecryptCache:
+    """Contenus déchiffrés et CRC, indexés par blake2b(contenu chiffré)."""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or default_cache_path()
+        if max_bytes is None:
+            size_mb = os.environ.get(SIZE_ENV, '').strip()
+            max_bytes = int(float(size_mb) * 1024 * 1024) if size_mb else DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.corrupt = 0
+        self._puts: List[tuple] = []
+        self._touched: List[Tuple[float, bytes]] = []
+        self._removed: List[bytes] = []
+        self._last_flush = time.monotonic()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')  # Un cache peut perdre ses dernières écritures
+        self._conn.executescript(_SCHEMA)
+
+        # Écritures en attente vidées à la sortie, y compris dans les workers multiprocessing
+        from multiprocessing import util
+        util.Finalize(self, DecryptCache.close, args=(self,), exitpriority=10)
+
+    def for_process(self) -> 'DecryptCache':
+        """Même cache pour un processus fils (une connexion SQLite ne survit pas à un fork)."""
+        return DecryptCache(self.path, self.max_bytes)
+
+    @staticmethod
+    def key(encrypted: bytes) -> bytes:
+        return hashlib.blake2b(encrypted, digest_size=16).digest()
+
+    def lookup(self, encrypted: bytes) -> Optional[Tuple[bytes, Tuple[int, int, int, int]]]:
+        """(contenu déchiffré, CRC type 3 et type 2 des deux zones), ou None."""
+        key = self.key(encrypted)
+        row = self._conn.execute('SELECT plain, crcs, digest FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        plain, crcs, digest = row
+        if (len(plain) != SKYLANDER_SIZE or len(crcs) != _CRCS.size or _digest(key, plain, crcs) != digest
+                or any(plain[b*16:(b+1)*16] != encrypted[b*16:(b+1)*16] for b in _PLAIN_BLOCKS)):
+            self.corrupt += 1
+            self.misses += 1
+            self._removed.append(key)
+            self._maybe_flush()
+            return None
+        self.hits += 1
+        self._touched.append((time.time(), key))
+        self._maybe_flush()
+        return plain, _CRCS.unpack(crcs)
+
+    def store(self, encrypted: bytes, plain: bytes, crcs: Tuple[int, int, int, int]) -> None:
+        key = self.key(encrypted)
+        packed = _CRCS.pack(*crcs)
+        self._puts.append((key, bytes(plain), packed, _digest(key, bytes(plain), packed),
+                           len(plain) + _ENTRY_OVERHEAD, time.time()))
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        pending = len(self._puts) + len(self._touched) + len(self._removed)
+        if pending >= FLUSH_EVERY or (pending and time.monotonic() - self._last_flush > FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self) -> None:
+        """Écrit les entrées et dates d'accès en attente, puis évince au-delà de la taille maximale."""
+        self._last_flush = time.monotonic()
+        if not (self._puts or self._touched or self._removed):
+            return
+        puts, touched, removed = self._puts, self._touched, self._removed
+        self._puts, self._touched, self._removed = [], [], []
+        conn = self._conn
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(
+                    'INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET '
+                    'plain = excluded.plain, crcs = excluded.crcs, digest = excluded.digest, '
+                    'size = excluded.size, last_used = excluded.last_used', puts)
+                conn.executemany('UPDATE entries SET last_used = ? WHERE key = ?', touched)
+                conn.executemany('DELETE FROM entries WHERE key = ?', [(k,) for k in removed])
+                self._evict()
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error:
+            pass  # Cache indisponible (verrou, disque plein...) : on continue sans lui
+
+    def _evict(self) -> None:
+        total, = self._conn.execute('SELECT total FROM meta').fetchone()
+        if total <= self.max_bytes:
+            return
+        # Marge de 10 % pour ne pas évincer à chaque écriture
+        excess = total - int(self.max_bytes * 0.9)
+        count = -(-excess // (SKYLANDER_SIZE + _ENTRY_OVERHEAD))
+        self._conn.execute('DELETE FROM entries WHERE key IN '
+                           '(SELECT key FROM entries ORDER BY last_used LIMIT ?)', (count,))
+
+    def clear(self) -> None:
+        self._puts, self._touched, self._removed = [], [], []
+        self._conn.execute('DELETE FROM entries')
+
+    def stats(self) -> dict:
+        self.flush()
+        entries, = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()
+        total, = self._conn.execute('SELECT total FROM meta').fetchone()
+        return {'path': self.path, 'entries': entries, 'bytes': total, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'corrupt': self.corrupt}
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._conn.close()
+            self._conn = None
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _verify_all(paths: List[str]) -> float:
+    from skylander_core import Skylander, read_sky_file
+    started = time.perf_counter()
+    for path in paths:
+        skylander = Skylander(read_sky_file(path))
+        skylander.decrypt()
+        skylander.checksums_valid()
+    return time.perf_counter() - started
+
+
+def bench(directory: str, path: str) -> dict:
+    """Vérification d'un dossier sans cache, avec cache vide (froid), puis plein (chaud)."""
+    from skylander_core import list_sky_files, set_decrypt_cache
+    paths = list_sky_files(directory)
+    if os.path.exists(path):
+        raise ValueError(f"{path} existe déjà (utilisez un chemin neuf)")
+    result = {'figures': len(paths)}
+    try:
+        set_decrypt_cache(None)
+        # Passe non mesurée : choix du backend crypto, imports et cache de pages
+        # sont payés ici plutôt que par la première mesure
+        _verify_all(paths)
+        result['uncached_s'] = _verify_all(paths)
+        cache = DecryptCache(path)
+        set_decrypt_cache(cache)
+        result['cold_s'] = _verify_all(paths)
+        cache.flush()
+        result['warm_s'] = _verify_all(paths)
+        result['cache'] = cache.stats()
+        cache.close()
+    finally:
+        set_decrypt_cache(None)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    return result
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Cache disque des figurines déchiffrées")
+    parser.add_argument('--path', help=f"fichier du cache (défaut: {default_cache_path()})")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help="taille et nombre d'entrées")
+    sub.add_parser('clear', help="vider le cache")
+    bench_p = sub.add_parser('bench', help="mesurer le gain sur la vérification d'un dossier")
+    bench_p.add_argument('directory')
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        import tempfile
+        path = os.path.join(tempfile.mkdtemp(prefix='skylander_cache_'), CACHE_FILE)
+        result = bench(args.directory, path)
+        os.rmdir(os.path.dirname(path))
+        count = result['figures'] or 1
+        for label, name in (("sans cache", 'uncached_s'), ("cache froid", 'cold_s'), ("cache chaud", 'warm_s')):
+            print(f"{label:<12} {result[name]:>8.2f}s  {count / result[name]:>10,.0f} figurines/s")
+        print(f"{result['cache']['entries']} entrées, {result['cache']['bytes'] / 1e6:.1f} Mo")
+        return 0
+
+    cache = DecryptCache(args.path)
+    if args.command == 'clear':
+        cache.clear()
+        print(f"✓ Cache vidé ({cache.path})")
+    else:
+        stats = cache.stats()
+        print(f"{stats['path']}: {stats['entries']} entrées, {stats['bytes'] / 1e6:.1f} Mo "
+              f"/ {stats['max_bytes'] / 1e6:.0f} Mo")
+    if not os.environ.get(DECRYPT_CACHE_ENV):
+        print(f"(inactif : définir {DECRYPT_CACHE_ENV}=1 pour l'utiliser)")
+    cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,10 +5,13 @@ Skylanders Core Library v3.0
 Bibliothèque sans GUI pour la manipulation des fichiers .sky.
 """
 
-import hashlib
-from Crypto.Cipher import AES
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from enum import Enum
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List
 
 
 # ============================================================================
@@ -42,224 +45,119 @@ HASH_CONST = bytes([
 SECTOR_TRAILERS = [0x03, 0x07, 0x0B, 0x0F, 0x13, 0x17, 0x1B, 0x1F, 
                    0x23, 0x27, 0x2B, 0x2F, 0x33, 0x37, 0x3B, 0x3F]
 
+# Blocs couverts par les checksums, par zone de données (0 et 1)
+AREA_HEADER_BLOCKS = (0x08, 0x24)
+AREA_TYPE2_BLOCKS = ([0x09, 0x0A, 0x0C], [0x25, 0x26, 0x28])
+AREA_TYPE3_BLOCKS = ([0x0D, 0x0E, 0x10], [0x29, 0x2A, 0x2C])
+
 MAX_MONEY = 65000
 MAX_HERO_POINTS = 255  # Byte max (8-bit), représente probablement les Heroic Challenges complétés
 
-# Tables XP par niveau (index = niveau, valeur = XP minimum pour ce niveau)
-# SSA: Niveau 10 max = 33,000 XP
-# Index 1 = niveau 1, Index 10 = niveau 10
-XP_TABLE_LEVEL_10 = {
-    1: 0, 2: 100, 3: 400, 4: 1000, 5: 2000,
-    6: 4000, 7: 7500, 8: 13000, 9: 20000, 10: 28000
-}
-XP_MAX_LEVEL_10 = 33000
-
-# Giants: Niveau 15 max ≈ 96,500 XP
-XP_TABLE_LEVEL_15 = {
-    1: 0, 2: 100, 3: 400, 4: 1000, 5: 2000,
-    6: 4000, 7: 7500, 8: 13000, 9: 20000, 10: 28000,
-    11: 33000, 12: 45000, 13: 58000, 14: 73000, 15: 88000
-}
-XP_MAX_LEVEL_15 = 96500
-
-# Swap Force/Trap Team/SuperChargers/Imaginators: Niveau 20 max ≈ 197,000 XP
-XP_TABLE_LEVEL_20 = {
-    1: 0, 2: 100, 3: 400, 4: 1000, 5: 2000,
-    6: 4000, 7: 7500, 8: 13000, 9: 20000, 10: 28000,
-    11: 33000, 12: 45000, 13: 58000, 14: 73000, 15: 88000,
-    16: 105000, 17: 125000, 18: 148000, 19: 175000, 20: 190000
-}
-XP_MAX_LEVEL_20 = 197000
+# Tables XP et base de données des personnages : définies dans skylander_db,
+# importé au premier accès (PEP 562) pour accélérer le démarrage.
+_DB_NAMES = frozenset({
+    'SKYLANDERS_DB',
+    'XP_TABLE_LEVEL_10', 'XP_TABLE_LEVEL_15', 'XP_TABLE_LEVEL_20',
+    'XP_MAX_LEVEL_10', 'XP_MAX_LEVEL_15', 'XP_MAX_LEVEL_20',
+})
 
+_db_module = None
+_lazy_timings = {}
+
+
+def _db():
+    global _db_module
+    if _db_module is None:
+        started = time.perf_counter()
+        import skylander_db
+        _db_module = skylander_db
+        _lazy_timings['skylander_db'] = time.perf_counter() - started
+    return _db_module
+
+
+def __getattr__(name: str):
+    if name in _DB_NAMES:
+        return getattr(_db(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | _DB_NAMES)
 
-# ============================================================================
-# BASE DE DONNÉES SKYLANDERS
-# ============================================================================
 
-SKYLANDERS_DB = {
-    # Spyro's Adventure (0-32)
-    0: ("Whirlwind", SkylandersGame.SPYROS_ADVENTURE),
-    1: ("Sonic Boom", SkylandersGame.SPYROS_ADVENTURE),
-    2: ("Warnado", SkylandersGame.SPYROS_ADVENTURE),
-    3: ("Lightning Rod", SkylandersGame.SPYROS_ADVENTURE),
-    4: ("Bash", SkylandersGame.SPYROS_ADVENTURE),
-    5: ("Terrafin", SkylandersGame.SPYROS_ADVENTURE),
-    6: ("Dino-Rang", SkylandersGame.SPYROS_ADVENTURE),
-    7: ("Prism Break", SkylandersGame.SPYROS_ADVENTURE),
-    8: ("Sunburn", SkylandersGame.SPYROS_ADVENTURE),
-    9: ("Eruptor", SkylandersGame.SPYROS_ADVENTURE),
-    10: ("Ignitor", SkylandersGame.SPYROS_ADVENTURE),
-    11: ("Flameslinger", SkylandersGame.SPYROS_ADVENTURE),
-    12: ("Zap", SkylandersGame.SPYROS_ADVENTURE),
-    13: ("Wham-Shell", SkylandersGame.SPYROS_ADVENTURE),
-    14: ("Gill Grunt", SkylandersGame.SPYROS_ADVENTURE),
-    15: ("Slam Bam", SkylandersGame.SPYROS_ADVENTURE),
-    16: ("Spyro", SkylandersGame.SPYROS_ADVENTURE),
-    17: ("Voodood", SkylandersGame.SPYROS_ADVENTURE),
-    18: ("Double Trouble", SkylandersGame.SPYROS_ADVENTURE),
-    19: ("Trigger Happy", SkylandersGame.SPYROS_ADVENTURE),
-    20: ("Drobot", SkylandersGame.SPYROS_ADVENTURE),
-    21: ("Drill Sergeant", SkylandersGame.SPYROS_ADVENTURE),
-    22: ("Boomer", SkylandersGame.SPYROS_ADVENTURE),
-    23: ("Wrecking Ball", SkylandersGame.SPYROS_ADVENTURE),
-    24: ("Camo", SkylandersGame.SPYROS_ADVENTURE),
-    25: ("Zook", SkylandersGame.SPYROS_ADVENTURE),
-    26: ("Stealth Elf", SkylandersGame.SPYROS_ADVENTURE),
-    27: ("Stump Smash", SkylandersGame.SPYROS_ADVENTURE),
-    28: ("Dark Spyro", SkylandersGame.SPYROS_ADVENTURE),
-    29: ("Hex", SkylandersGame.SPYROS_ADVENTURE),
-    30: ("Chop Chop", SkylandersGame.SPYROS_ADVENTURE),
-    31: ("Ghost Roaster", SkylandersGame.SPYROS_ADVENTURE),
-    32: ("Cynder", SkylandersGame.SPYROS_ADVENTURE),
-    
-    # Giants (100-115)
-    100: ("Jet-Vac", SkylandersGame.GIANTS),
-    101: ("Swarm", SkylandersGame.GIANTS),
-    102: ("Crusher", SkylandersGame.GIANTS),
-    103: ("Flashwing", SkylandersGame.GIANTS),
-    104: ("Hot Head", SkylandersGame.GIANTS),
-    105: ("Hot Dog", SkylandersGame.GIANTS),
-    106: ("Chill", SkylandersGame.GIANTS),
-    107: ("Thumpback", SkylandersGame.GIANTS),
-    108: ("Pop Fizz", SkylandersGame.GIANTS),
-    109: ("Ninjini", SkylandersGame.GIANTS),
-    110: ("Bouncer", SkylandersGame.GIANTS),
-    111: ("Sprocket", SkylandersGame.GIANTS),
-    112: ("Tree Rex", SkylandersGame.GIANTS),
-    113: ("Shroomboom", SkylandersGame.GIANTS),
-    114: ("Eye-Brawl", SkylandersGame.GIANTS),
-    115: ("Fright Rider", SkylandersGame.GIANTS),
-    
-    # Trap Team (450-485)
-    450: ("Gusto", SkylandersGame.TRAP_TEAM),
-    451: ("Thunderbolt", SkylandersGame.TRAP_TEAM),
-    452: ("Fling Kong", SkylandersGame.TRAP_TEAM),
-    453: ("Blades", SkylandersGame.TRAP_TEAM),
-    454: ("Wallop", SkylandersGame.TRAP_TEAM),
-    455: ("Head Rush", SkylandersGame.TRAP_TEAM),
-    456: ("Fist Bump", SkylandersGame.TRAP_TEAM),
-    457: ("Rocky Roll", SkylandersGame.TRAP_TEAM),
-    458: ("Wildfire", SkylandersGame.TRAP_TEAM),
-    459: ("Ka-Boom", SkylandersGame.TRAP_TEAM),
-    460: ("Trail Blazer", SkylandersGame.TRAP_TEAM),
-    461: ("Torch", SkylandersGame.TRAP_TEAM),
-    462: ("Snap Shot", SkylandersGame.TRAP_TEAM),
-    463: ("Lob-Star", SkylandersGame.TRAP_TEAM),
-    464: ("Flip Wreck", SkylandersGame.TRAP_TEAM),
-    465: ("Echo", SkylandersGame.TRAP_TEAM),
-    466: ("Blastermind", SkylandersGame.TRAP_TEAM),
-    467: ("Enigma", SkylandersGame.TRAP_TEAM),
-    468: ("Déjà Vu", SkylandersGame.TRAP_TEAM),
-    469: ("Cobra Cadabra", SkylandersGame.TRAP_TEAM),
-    470: ("Jawbreaker", SkylandersGame.TRAP_TEAM),
-    471: ("Gearshift", SkylandersGame.TRAP_TEAM),
-    472: ("Chopper", SkylandersGame.TRAP_TEAM),
-    473: ("Tread Head", SkylandersGame.TRAP_TEAM),
-    474: ("Bushwhack", SkylandersGame.TRAP_TEAM),
-    475: ("Tuff Luck", SkylandersGame.TRAP_TEAM),
-    476: ("Food Fight", SkylandersGame.TRAP_TEAM),
-    477: ("High Five", SkylandersGame.TRAP_TEAM),
-    478: ("Krypt King", SkylandersGame.TRAP_TEAM),
-    479: ("Short Cut", SkylandersGame.TRAP_TEAM),
-    480: ("Bat Spin", SkylandersGame.TRAP_TEAM),
-    481: ("Funny Bone", SkylandersGame.TRAP_TEAM),
-    482: ("Knight Light", SkylandersGame.TRAP_TEAM),
-    483: ("Spotlight", SkylandersGame.TRAP_TEAM),
-    484: ("Knight Mare", SkylandersGame.TRAP_TEAM),
-    485: ("Blackout", SkylandersGame.TRAP_TEAM),
-    
-    # Imaginators Senseis (601-631)
-    601: ("King Pen", SkylandersGame.IMAGINATORS),
-    602: ("Tri-Tip", SkylandersGame.IMAGINATORS),
-    603: ("Chopscotch", SkylandersGame.IMAGINATORS),
-    604: ("Boom Bloom", SkylandersGame.IMAGINATORS),
-    605: ("Pit Boss", SkylandersGame.IMAGINATORS),
-    606: ("Barbella", SkylandersGame.IMAGINATORS),
-    607: ("Air Strike", SkylandersGame.IMAGINATORS),
-    608: ("Ember", SkylandersGame.IMAGINATORS),
-    609: ("Ambush", SkylandersGame.IMAGINATORS),
-    610: ("Dr. Krankcase", SkylandersGame.IMAGINATORS),
-    611: ("Hood Sickle", SkylandersGame.IMAGINATORS),
-    612: ("Tae Kwon Crow", SkylandersGame.IMAGINATORS),
-    613: ("Golden Queen", SkylandersGame.IMAGINATORS),
-    614: ("Wolfgang", SkylandersGame.IMAGINATORS),
-    615: ("Pain-Yatta", SkylandersGame.IMAGINATORS),
-    616: ("Mysticat", SkylandersGame.IMAGINATORS),
-    617: ("Starcast", SkylandersGame.IMAGINATORS),
-    618: ("Buckshot", SkylandersGame.IMAGINATORS),
-    619: ("Aurora", SkylandersGame.IMAGINATORS),
-    620: ("Flare Wolf", SkylandersGame.IMAGINATORS),
-    621: ("Chompy Mage", SkylandersGame.IMAGINATORS),
-    622: ("Bad Juju", SkylandersGame.IMAGINATORS),
-    623: ("Grave Clobber", SkylandersGame.IMAGINATORS),
-    624: ("Blaster-Tron", SkylandersGame.IMAGINATORS),
-    625: ("Ro-Bow", SkylandersGame.IMAGINATORS),
-    626: ("Chain Reaction", SkylandersGame.IMAGINATORS),
-    627: ("Kaos", SkylandersGame.IMAGINATORS),
-    628: ("Wild Storm", SkylandersGame.IMAGINATORS),
-    629: ("Tidepool", SkylandersGame.IMAGINATORS),
-    630: ("Crash Bandicoot", SkylandersGame.IMAGINATORS),
-    631: ("Dr. Neo Cortex", SkylandersGame.IMAGINATORS),
-    
-    # SWAP Force - Tops (2000-2015)
-    2000: ("Boom (Top)", SkylandersGame.SWAP_FORCE),
-    2001: ("Free (Top)", SkylandersGame.SWAP_FORCE),
-    2002: ("Rubble (Top)", SkylandersGame.SWAP_FORCE),
-    2003: ("Doom (Top)", SkylandersGame.SWAP_FORCE),
-    2004: ("Blast (Top)", SkylandersGame.SWAP_FORCE),
-    2005: ("Fire (Top)", SkylandersGame.SWAP_FORCE),
-    2006: ("Stink (Top)", SkylandersGame.SWAP_FORCE),
-    2007: ("Grilla (Top)", SkylandersGame.SWAP_FORCE),
-    2008: ("Hoot (Top)", SkylandersGame.SWAP_FORCE),
-    2009: ("Trap (Top)", SkylandersGame.SWAP_FORCE),
-    2010: ("Magna (Top)", SkylandersGame.SWAP_FORCE),
-    2011: ("Spy (Top)", SkylandersGame.SWAP_FORCE),
-    2012: ("Night (Top)", SkylandersGame.SWAP_FORCE),
-    2013: ("Rattle (Top)", SkylandersGame.SWAP_FORCE),
-    2014: ("Freeze (Top)", SkylandersGame.SWAP_FORCE),
-    2015: ("Wash (Top)", SkylandersGame.SWAP_FORCE),
-    
-    # SuperChargers (3400-3428)
-    3400: ("Fiesta", SkylandersGame.SUPERCHARGERS),
-    3401: ("High Volt", SkylandersGame.SUPERCHARGERS),
-    3402: ("Splat", SkylandersGame.SUPERCHARGERS),
-    3406: ("Stormblade", SkylandersGame.SUPERCHARGERS),
-    3411: ("Smash Hit", SkylandersGame.SUPERCHARGERS),
-    3412: ("Spitfire", SkylandersGame.SUPERCHARGERS),
-    3413: ("Hurricane Jet-Vac", SkylandersGame.SUPERCHARGERS),
-    3414: ("Double Dare Trigger Happy", SkylandersGame.SUPERCHARGERS),
-    3415: ("Super Shot Stealth Elf", SkylandersGame.SUPERCHARGERS),
-    3416: ("Shark Shooter Terrafin", SkylandersGame.SUPERCHARGERS),
-    3417: ("Bone Bash Roller Brawl", SkylandersGame.SUPERCHARGERS),
-    3420: ("Big Bubble Pop Fizz", SkylandersGame.SUPERCHARGERS),
-    3421: ("Lava Lance Eruptor", SkylandersGame.SUPERCHARGERS),
-    3422: ("Deep Dive Gill Grunt", SkylandersGame.SUPERCHARGERS),
-    3423: ("Turbo Charge Donkey Kong", SkylandersGame.SUPERCHARGERS),
-    3424: ("Hammer Slam Bowser", SkylandersGame.SUPERCHARGERS),
-    3425: ("Dive-Clops", SkylandersGame.SUPERCHARGERS),
-    3426: ("Astroblast", SkylandersGame.SUPERCHARGERS),
-    3427: ("Nightfall", SkylandersGame.SUPERCHARGERS),
-    3428: ("Thrillipede", SkylandersGame.SUPERCHARGERS),
-}
+def lazy_load_timings() -> dict:
+    """Durée (s) des chargements différés déjà effectués (base de données, backend crypto)."""
+    return dict(_lazy_timings)
 
 
 # ============================================================================
 # CRYPTO FUNCTIONS
 # ============================================================================
 
+_crypto_backend = None
+
+
+def get_crypto_backend():
+    """Backend AES/MD5 actif (choisi au premier usage, voir skylander_backends)."""
+    global _crypto_backend
+    if _crypto_backend is None:
+        started = time.perf_counter()
+        from skylander_backends import select_backend
+        _crypto_backend = select_backend()
+        _lazy_timings['crypto_backend'] = time.perf_counter() - started
+    return _crypto_backend
+
+
+def set_crypto_backend(backend) -> None:
+    """Force un backend (instance de skylander_backends.CryptoBackend, ou None pour re-sélectionner)."""
+    global _crypto_backend
+    _crypto_backend = backend
+
+
 def compute_key(sector0: bytes, block_index: int) -> bytes:
     key_material = bytearray(sector0[:0x20])
     key_material.append(block_index & 0xFF)
     key_material.extend(HASH_CONST)
-    return hashlib.md5(bytes(key_material)).digest()
+    return (_crypto_backend or get_crypto_backend()).md5(bytes(key_material))
+
+
+def _aes_decrypt(key: bytes, data: bytes) -> bytes:
+    return (_crypto_backend or get_crypto_backend()).aes_ecb_decrypt(key, data)
+
+
+def _aes_encrypt(key: bytes, data: bytes) -> bytes:
+    return (_crypto_backend or get_crypto_backend()).aes_ecb_encrypt(key, data)
 
 
 def decrypt_block(encrypted: bytes, sector0: bytes, block_index: int) -> bytes:
-    return AES.new(compute_key(sector0, block_index), AES.MODE_ECB).decrypt(encrypted)
+    return _aes_decrypt(compute_key(sector0, block_index), encrypted)
 
 
 def encrypt_block(plain: bytes, sector0: bytes, block_index: int) -> bytes:
-    return AES.new(compute_key(sector0, block_index), AES.MODE_ECB).encrypt(plain)
+    return _aes_encrypt(compute_key(sector0, block_index), plain)
+
+
+def is_encrypted_block(block_index: int) -> bool:
+    """Vrai si le bloc est chiffré (hors secteur 0 et hors trailers)."""
+    return 0x08 <= block_index < 0x40 and block_index not in SECTOR_TRAILERS
+
+
+def changed_blocks(old: bytes, new: bytes) -> List[int]:
+    """Indices des blocs de 16 octets qui diffèrent entre deux dumps."""
+    return [b for b in range(SKYLANDER_SIZE // 16)
+            if old[b*16:(b+1)*16] != new[b*16:(b+1)*16]]
+
+
+def _translate_block(data, index: int, decrypted: bool, encrypted: bool) -> bytes:
+    """Bloc `index` de `data` (déchiffré ou non), rendu chiffré ou en clair."""
+    if not 0 <= index < SKYLANDER_SIZE // 16:
+        raise IndexError(f"Bloc hors limites: {index}")
+    block = bytes(data[index*16:(index+1)*16])
+    if is_encrypted_block(index) and encrypted == decrypted:
+        sector0 = bytes(data[:0x20])
+        convert = encrypt_block if encrypted else decrypt_block
+        block = convert(block, sector0, index)
+    return block
 
 
 # ============================================================================
@@ -299,10 +197,50 @@ class Skylander:
             raise ValueError(f"Taille invalide: {len(data)} octets (attendu: {SKYLANDER_SIZE})")
         self.data = bytearray(data)
         self._decrypted = False
+        self._crc_memo = {}
+    
+    @property
+    def decrypted(self) -> bool:
+        return self._decrypted
+    
+    @classmethod
+    def from_decrypted(cls, data: bytes) -> 'Skylander':
+        """Construit un Skylander à partir d'un contenu déjà déchiffré."""
+        skylander = cls(data)
+        skylander._decrypted = True
+        return skylander
+    
+    @classmethod
+    def from_buffer(cls, buffer) -> 'Skylander':
+        """Skylander travaillant directement dans un tampon inscriptible (mémoire partagée, mmap), sans copie."""
+        view = memoryview(buffer).cast('B')
+        if len(view) != SKYLANDER_SIZE:
+            raise ValueError(f"Taille invalide: {len(view)} octets (attendu: {SKYLANDER_SIZE})")
+        skylander = cls.__new__(cls)
+        skylander.data = view
+        skylander._decrypted = False
+        skylander._crc_memo = {}
+        return skylander
+    
+    def copy(self) -> 'Skylander':
+        """Retourne une copie indépendante (données et état de déchiffrement)."""
+        clone = Skylander(bytes(self.data))
+        clone._decrypted = self._decrypted
+        clone._crc_memo = dict(self._crc_memo)
+        return clone
     
     def decrypt(self) -> None:
         if self._decrypted:
             return
+        cache = get_decrypt_cache()
+        if cache is not None:
+            encrypted = bytes(self.data)
+            cached = cache.lookup(encrypted)
+            if cached is not None:
+                self.data[:] = cached[0]
+                self._decrypted = True
+                self._seed_crc_memo(cached[1])
+                return
         sector0 = bytes(self.data[:0x20])
         for block in range(0x08, 0x40):
             if block in SECTOR_TRAILERS:
@@ -311,6 +249,9 @@ class Skylander:
             decrypted = decrypt_block(bytes(self.data[offset:offset+16]), sector0, block)
             self.data[offset:offset+16] = decrypted
         self._decrypted = True
+        if cache is not None:
+            crcs = (self._crc_type3(0), self._crc_type3(1), self._crc_type2(0), self._crc_type2(1))
+            cache.store(encrypted, bytes(self.data), crcs)
     
     def encrypt(self) -> bytes:
         sector0 = bytes(self.data[:0x20])
@@ -323,6 +264,41 @@ class Skylander:
             result[offset:offset+16] = encrypted
         return bytes(result)
     
+    def encrypt_in_place(self) -> None:
+        """Rechiffre `data` sur place (utile avec from_buffer)."""
+        if not self._decrypted:
+            return
+        sector0 = bytes(self.data[:0x20])
+        for block in range(0x08, 0x40):
+            if block in SECTOR_TRAILERS:
+                continue
+            offset = block * 16
+            self.data[offset:offset+16] = encrypt_block(bytes(self.data[offset:offset+16]), sector0, block)
+        self._decrypted = False
+    
+    def read_block(self, index: int, encrypted: bool = False) -> bytes:
+        """Bloc `index` (16 octets) en clair, ou chiffré tel que sur la figurine si `encrypted`.
+
+        Seul ce bloc est (dé)chiffré, quel que soit l'état du reste de la figurine.
+        """
+        return _translate_block(self.data, index, self._decrypted, encrypted)
+    
+    def write_block(self, index: int, block: bytes, encrypted: bool = False) -> None:
+        """Écrit un bloc donné en clair (ou chiffré si `encrypted`), converti dans l'état courant."""
+        if len(block) != 16:
+            raise ValueError(f"Taille de bloc invalide: {len(block)} octets (attendu: 16)")
+        if not 0 <= index < SKYLANDER_SIZE // 16:
+            raise IndexError(f"Bloc hors limites: {index}")
+        if is_encrypted_block(index) and encrypted == self._decrypted:
+            sector0 = bytes(self.data[:0x20])
+            convert = decrypt_block if encrypted else encrypt_block
+            block = convert(bytes(block), sector0, index)
+        self.data[index*16:(index+1)*16] = block
+    
+    def get_uid(self) -> str:
+        """UID de la figurine (4 premiers octets du secteur 0, non chiffré)."""
+        return self.data[0:4].hex().upper()
+    
     def get_character_id(self) -> int:
         return self.data[0x10] | (self.data[0x11] << 8)
     
@@ -331,8 +307,9 @@ class Skylander:
     
     def get_character_info(self) -> Tuple[str, SkylandersGame]:
         cid = self.get_character_id()
-        if cid in SKYLANDERS_DB:
-            return SKYLANDERS_DB[cid]
+        info = _db().SKYLANDERS_DB.get(cid)
+        if info is not None:
+            return info
         return (f"Inconnu (ID: {cid})", self._detect_game_from_id(cid))
     
     def _detect_game_from_id(self, cid: int) -> SkylandersGame:
@@ -361,19 +338,19 @@ class Skylander:
         """Retourne la table XP appropriée pour ce jeu."""
         max_level = self.get_max_level()
         if max_level == 10:
-            return XP_TABLE_LEVEL_10
+            return _db().XP_TABLE_LEVEL_10
         elif max_level == 15:
-            return XP_TABLE_LEVEL_15
-        return XP_TABLE_LEVEL_20
+            return _db().XP_TABLE_LEVEL_15
+        return _db().XP_TABLE_LEVEL_20
     
     def get_max_xp(self) -> int:
         """Retourne l'XP maximum pour ce jeu."""
         max_level = self.get_max_level()
         if max_level == 10:
-            return XP_MAX_LEVEL_10
+            return _db().XP_MAX_LEVEL_10
         elif max_level == 15:
-            return XP_MAX_LEVEL_15
-        return XP_MAX_LEVEL_20
+            return _db().XP_MAX_LEVEL_15
+        return _db().XP_MAX_LEVEL_20
     
     def get_active_area(self) -> int:
         seq0 = self.data[0x80 + 0x09]
@@ -437,42 +414,99 @@ class Skylander:
             off = self._header_offset(area)
             self.data[off+5] = points
     
-    def update_checksums(self) -> None:
+    def _block_bytes(self, blocks: List[int]) -> bytes:
+        return b''.join(bytes(self.data[b*16:(b+1)*16]) for b in blocks)
+    
+    def _memoized_crc(self, key: tuple, covered: bytes, compute, force: bool = False) -> int:
+        """CRC de `covered`, réutilisé tant que les blocs couverts n'ont pas changé."""
+        memo = self._crc_memo.get(key)
+        if memo is not None and not force and memo[0] == covered:
+            return memo[1]
+        crc = compute(covered)
+        self._crc_memo[key] = (covered, crc)
+        return crc
+    
+    def _crc_type3(self, area: int, force: bool = False) -> int:
+        return self._memoized_crc(('type3', area), self._block_bytes(AREA_TYPE3_BLOCKS[area]),
+                                  lambda covered: CRC16.calculate(covered + b'\x00' * (0x0E * 16)), force)
+    
+    def _crc_type2(self, area: int, force: bool = False) -> int:
+        return self._memoized_crc(('type2', area), self._block_bytes(AREA_TYPE2_BLOCKS[area]),
+                                  CRC16.calculate, force)
+    
+    def _seed_crc_memo(self, crcs: Tuple[int, int, int, int]) -> None:
+        """Reprend des CRC type 3/2 déjà calculés pour le contenu actuel (cache disque)."""
         for area in [0, 1]:
-            hdr_block = 0x08 if area == 0 else 0x24
-            hb = hdr_block * 16
-            
-            if area == 0:
-                type2_blocks = [0x09, 0x0A, 0x0C]
-                type3_blocks = [0x0D, 0x0E, 0x10]
-            else:
-                type2_blocks = [0x25, 0x26, 0x28]
-                type3_blocks = [0x29, 0x2A, 0x2C]
+            self._crc_memo[('type3', area)] = (self._block_bytes(AREA_TYPE3_BLOCKS[area]), crcs[area])
+            self._crc_memo[('type2', area)] = (self._block_bytes(AREA_TYPE2_BLOCKS[area]), crcs[2 + area])
+    
+    def _crc_header(self, area: int) -> int:
+        hb = AREA_HEADER_BLOCKS[area] * 16
+        header_copy = bytearray(self.data[hb:hb+16])
+        header_copy[0x0E] = 0x05
+        header_copy[0x0F] = 0x00
+        return CRC16.calculate(bytes(header_copy))
+    
+    def _crc_sector0(self) -> int:
+        return CRC16.calculate(bytes(self.data[:0x1E]))
+    
+    def update_checksums(self, force: bool = False) -> None:
+        """Recalcule les checksums ; les CRC type 2/3 dont les blocs n'ont pas changé sont réutilisés
+        (sauf si `force`)."""
+        for area in [0, 1]:
+            hb = AREA_HEADER_BLOCKS[area] * 16
             
-            type3_data = b''.join(bytes(self.data[b*16:(b+1)*16]) for b in type3_blocks)
-            type3_data += b'\x00' * (0x0E * 16)
-            crc3 = CRC16.calculate(type3_data)
+            crc3 = self._crc_type3(area, force)
             self.data[hb + 0x0A] = crc3 & 0xFF
             self.data[hb + 0x0B] = (crc3 >> 8) & 0xFF
             
-            type2_data = b''.join(bytes(self.data[b*16:(b+1)*16]) for b in type2_blocks)
-            crc2 = CRC16.calculate(type2_data)
+            crc2 = self._crc_type2(area, force)
             self.data[hb + 0x0C] = crc2 & 0xFF
             self.data[hb + 0x0D] = (crc2 >> 8) & 0xFF
             
             self.data[hb + 0x09] = (self.data[hb + 0x09] + 1) & 0xFF
             
-            header_copy = bytearray(self.data[hb:hb+16])
-            header_copy[0x0E] = 0x05
-            header_copy[0x0F] = 0x00
-            crc1 = CRC16.calculate(bytes(header_copy))
+            crc1 = self._crc_header(area)
             self.data[hb + 0x0E] = crc1 & 0xFF
             self.data[hb + 0x0F] = (crc1 >> 8) & 0xFF
         
-        crc0 = CRC16.calculate(bytes(self.data[:0x1E]))
+        crc0 = self._crc_sector0()
         self.data[0x1E] = crc0 & 0xFF
         self.data[0x1F] = (crc0 >> 8) & 0xFF
     
+    def _stored_crc(self, offset: int) -> int:
+        return self.data[offset] | (self.data[offset + 1] << 8)
+    
+    def verify_checksums(self) -> dict:
+        """Vérifie les checksums stockés sans modifier les données (Skylander déchiffré)."""
+        result = {'sector0': self._stored_crc(0x1E) == self._crc_sector0()}
+        for area in [0, 1]:
+            hb = AREA_HEADER_BLOCKS[area] * 16
+            result[f'area{area}_type3'] = self._stored_crc(hb + 0x0A) == self._crc_type3(area)
+            result[f'area{area}_type2'] = self._stored_crc(hb + 0x0C) == self._crc_type2(area)
+            result[f'area{area}_header'] = self._stored_crc(hb + 0x0E) == self._crc_header(area)
+        return result
+    
+    def checksums_valid(self) -> bool:
+        return all(self.verify_checksums().values())
+    
+    def get_summary(self) -> dict:
+        """Résumé des informations et stats de la figurine."""
+        name, game = self.get_character_info()
+        return {
+            'uid': self.get_uid(),
+            'character_id': self.get_character_id(),
+            'variant_id': self.get_variant_id(),
+            'name': name,
+            'game': game.display_name,
+            'max_level': game.max_level,
+            'level': self.get_level(),
+            'xp': self.get_xp(),
+            'money': self.get_money(),
+            'hero_points': self.get_hero_points(),
+            'active_area': self.get_active_area(),
+        }
+    
     def max_out(self) -> None:
         self.set_xp(self.get_max_xp())
         self.set_money(MAX_MONEY)
@@ -482,3 +516,1097 @@ class Skylander:
         self.set_xp(0)
         self.set_money(0)
         self.set_hero_points(0)
+
+
+# ============================================================================
+# FICHIERS
+# ============================================================================
+
+SKY_EXTENSION = '.sky'
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+DURABILITY_LEVELS = ('none', 'batch', 'per-file')
+TEMP_SUFFIX = '.tmp'
+
+
+def _temp_path(path: str) -> str:
+    # Unique par processus et par thread : deux sauvegardes simultanées ne se marchent pas dessus
+    return f'{path}.{os.getpid()}-{threading.get_ident()}{TEMP_SUFFIX}'
+
+
+def _write_file(path: str, data: bytes, fsync: bool = False) -> str:
+    """Écrit `data` dans un fichier temporaire à côté de `path` ; retourne son chemin."""
+    tmp = _temp_path(path)
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)  # Conserver les droits du fichier remplacé
+        except OSError:
+            pass
+    except BaseException:
+        _discard(tmp)
+        raise
+    return tmp
+
+
+def _discard(tmp: str) -> None:
+    try:
+        os.remove(tmp)
+    except OSError:
+        pass
+
+
+def _fsync_directory(directory: str) -> None:
+    """Rend durables les renommages d'un dossier (sans effet sous Windows)."""
+    if sys.platform == 'win32':
+        return
+    fd = os.open(directory or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _sync_files(paths: List[str]) -> None:
+    """Vide sur disque les fichiers donnés, un fdatasync (ou fsync) par fichier."""
+    sync = getattr(os, 'fdatasync', os.fsync)
+    for path in paths:
+        fd = os.open(path, os.O_RDWR)
+        try:
+            sync(fd)
+        finally:
+            os.close(fd)
+
+
+def user_cache_dir() -> str:
+    """Dossier de cache de l'utilisateur (SKYLANDER_CACHE_DIR, sinon dossier standard du système)."""
+    override = os.environ.get('SKYLANDER_CACHE_DIR')
+    if override:
+        return override
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'skylander')
+
+
+DECRYPT_CACHE_ENV = 'SKYLANDER_DECRYPT_CACHE'
+
+_decrypt_cache = None
+_decrypt_cache_pid = None
+
+
+def get_decrypt_cache():
+    """Cache disque des figurines déchiffrées (voir skylander_cache), ou None s'il est inactif."""
+    global _decrypt_cache, _decrypt_cache_pid
+    pid = os.getpid()
+    if _decrypt_cache_pid != pid:
+        if _decrypt_cache is not None:
+            # Processus fils : nouvelle connexion au même cache
+            _decrypt_cache = _decrypt_cache.for_process()
+        elif _decrypt_cache_pid is None:
+            setting = os.environ.get(DECRYPT_CACHE_ENV, '').strip()
+            if setting and setting != '0':
+                from skylander_cache import DecryptCache
+                _decrypt_cache = DecryptCache(None if setting == '1' else setting)
+        _decrypt_cache_pid = pid
+    return _decrypt_cache
+
+
+def set_decrypt_cache(cache) -> None:
+    """Active un cache (skylander_cache.DecryptCache), ou le désactive avec None."""
+    global _decrypt_cache, _decrypt_cache_pid
+    _decrypt_cache = cache
+    _decrypt_cache_pid = os.getpid()
+
+
+def read_sky_file(path: str) -> bytes:
+    """Lit le contenu brut (chiffré) d'un fichier .sky."""
+    return _read_file(path)
+
+
+def write_sky_file(path: str, data: bytes, durability: str = 'per-file') -> None:
+    """Écrit le contenu (chiffré) d'un fichier .sky de façon atomique (fichier temporaire + rename).
+
+    durability 'per-file' : fichier et dossier synchronisés sur disque avant de rendre la main ;
+    'none' : atomique mais sans fsync. Pour de nombreux fichiers, voir AtomicWriter.
+    """
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError(f"Durabilité inconnue: {durability}")
+    fsync = durability != 'none'
+    tmp = _write_file(path, data, fsync)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        _discard(tmp)
+        raise
+    if fsync:
+        _fsync_directory(os.path.dirname(path))
+
+
+class AtomicWriter:
+    """Sauvegardes atomiques en masse avec validation groupée (group commit).
+    
+    En durabilité 'batch', les fichiers sont écrits dans des temporaires puis, tous les
+    `window` fichiers (et à commit()/close()), synchronisés un par un, renommés, et
+    chaque dossier concerné est synchronisé une seule fois. Jusqu'au commit, les
+    fichiers cibles gardent leur ancien contenu.
+    """
+    
+    def __init__(self, durability: str = 'batch', window: int = 256):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Durabilité inconnue: {durability}")
+        self.durability = durability
+        self.window = max(1, window)
+        self.written = 0
+        self.commits = 0
+        self._pending: dict = {}  # cible -> fichier temporaire (une écriture en attente par cible)
+    
+    def write(self, path: str, data: bytes) -> None:
+        if self.durability != 'batch':
+            write_sky_file(path, data, self.durability)
+            self.written += 1
+            return
+        self._pending[path] = _write_file(path, data)
+        if len(self._pending) >= self.window:
+            self.commit()
+    
+    def commit(self) -> None:
+        """Synchronise et renomme les fichiers en attente."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            _sync_files(list(pending.values()))
+            directories = set()
+            for path, tmp in pending.items():
+                os.replace(tmp, path)
+                directories.add(os.path.dirname(path))
+            for directory in directories:
+                _fsync_directory(directory)
+        except BaseException:
+            for tmp in pending.values():
+                if os.path.exists(tmp):
+                    _discard(tmp)
+            raise
+        self.written += len(pending)
+        self.commits += 1
+    
+    def abort(self) -> None:
+        """Abandonne les écritures non validées (les fichiers cibles restent intacts)."""
+        pending, self._pending = self._pending, {}
+        for tmp in pending.values():
+            _discard(tmp)
+    
+    def close(self) -> None:
+        self.commit()
+    
+    def __enter__(self) -> 'AtomicWriter':
+        return self
+    
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+def load_skylander(path: str) -> Skylander:
+    """Lit un fichier .sky et retourne le Skylander déchiffré."""
+    skylander = Skylander(read_sky_file(path))
+    skylander.decrypt()
+    return skylander
+
+
+def list_sky_files(directory: str) -> List[str]:
+    """Liste triée (par nom) des fichiers .sky d'un dossier, sans récursion."""
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return []
+    with entries:
+        paths = [e.path for e in entries
+                 if e.name.lower().endswith(SKY_EXTENSION) and e.is_file()]
+    paths.sort(key=lambda p: os.path.basename(p).casefold())
+    return paths
+
+
+# ============================================================================
+# JOURNAL DES TRAITEMENTS EN MASSE
+# ============================================================================
+#
+# Journal d'écriture anticipée (write-ahead) : avant le remplacement d'un fichier, un
+# enregistrement BEGIN (chemin, empreintes de l'ancien et du nouveau contenu chiffré,
+# ancien contenu) est synchronisé sur disque ; COMMIT suit le renommage. Une reprise
+# ignore les fichiers terminés, un rollback remet les originaux.
+#
+# Format : JOURNAL_MAGIC, puis des enregistrements <type:1><taille:4><crc32:4><données>.
+# Un enregistrement incomplet ou invalide en fin de fichier (arrêt brutal) est ignoré.
+
+JOURNAL_MAGIC = b'SKYJRNL1'
+JOURNAL_HASH_SIZE = 16
+_J_HEADER, _J_BEGIN, _J_COMMIT, _J_UNCHANGED, _J_ROLLBACK = range(5)
+_J_RECORD_SIZE = 9
+
+# États d'une entrée
+JOURNAL_PENDING = 'pending'
+JOURNAL_DONE = 'done'
+JOURNAL_ROLLED_BACK = 'rolled_back'
+
+
+def journal_hash(data) -> bytes:
+    """Empreinte (BLAKE2b, 16 octets) d'un contenu chiffré, telle que journalisée."""
+    from hashlib import blake2b
+    return blake2b(data, digest_size=JOURNAL_HASH_SIZE).digest()
+
+
+def _normalized_job(job: Optional[dict]) -> dict:
+    import json
+    return json.loads(json.dumps(job or {}, sort_keys=True, default=str))
+
+
+class BatchJournal:
+    """Journal d'un traitement en masse, ouvert en ajout (créé s'il n'existe pas).
+
+    `job` décrit le traitement (opération, paramètres) : rouvrir le journal d'un autre
+    traitement lève ValueError ; None accepte n'importe quel journal (rollback).
+    """
+
+    def __init__(self, path: str, job: Optional[dict] = None):
+        self.path = path
+        self.job = _normalized_job(job)
+        # Entrées : [chemin, ancienne empreinte, nouvelle empreinte, offset de l'original, état]
+        self._entries: List[list] = []
+        self._by_path: dict = {}  # chemin absolu -> index de sa dernière entrée
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, 'r+b' if exists else 'w+b')
+        try:
+            if exists:
+                stored = self._load()
+                if job is not None and stored != self.job:
+                    raise ValueError(f"{path}: journal d'un autre traitement ({stored})")
+                self.job = stored
+                self._recover()
+            else:
+                import json
+                self._file.write(JOURNAL_MAGIC)
+                self._end = len(JOURNAL_MAGIC)
+                self._append(_J_HEADER, json.dumps(self.job, sort_keys=True).encode())
+                self.sync(True)
+        except BaseException:
+            self._file.close()
+            raise
+
+    def _load(self) -> dict:
+        from zlib import crc32
+        f = self._file
+        if f.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+            raise ValueError(f"{self.path}: pas un journal de traitement")
+        stored = None
+        offset = len(JOURNAL_MAGIC)
+        while True:
+            head = f.read(_J_RECORD_SIZE)
+            if len(head) < _J_RECORD_SIZE:
+                break
+            kind, size, crc = head[0], int.from_bytes(head[1:5], 'little'), int.from_bytes(head[5:], 'little')
+            payload = f.read(size)
+            if len(payload) < size or crc32(payload) != crc:
+                break
+            offset += _J_RECORD_SIZE
+            if kind == _J_HEADER:
+                import json
+                stored = json.loads(payload)
+            else:
+                self._replay(kind, payload, offset)
+            offset += size
+        if stored is None:
+            raise ValueError(f"{self.path}: en-tête de journal manquant")
+        # Tronque un éventuel enregistrement incomplet : les ajouts repartent d'un état sain
+        f.seek(offset)
+        f.truncate()
+        self._end = offset
+        return stored
+
+    def _replay(self, kind: int, payload: bytes, offset: int) -> None:
+        h = JOURNAL_HASH_SIZE
+        if kind == _J_BEGIN:
+            size = int.from_bytes(payload[2 * h:2 * h + 2], 'little')
+            start = 2 * h + 2
+            path = payload[start + size:].decode('utf-8')
+            self._add(path, payload[:h], payload[h:2 * h], (offset + start, size), JOURNAL_PENDING)
+        elif kind == _J_UNCHANGED:
+            self._add(payload[h:].decode('utf-8'), payload[:h], payload[:h], None, JOURNAL_DONE)
+        elif kind in (_J_COMMIT, _J_ROLLBACK):
+            index = int.from_bytes(payload, 'little')
+            if index < len(self._entries):
+                self._entries[index][4] = JOURNAL_DONE if kind == _J_COMMIT else JOURNAL_ROLLED_BACK
+
+    def _add(self, path: str, old: bytes, new: bytes, original, state: str) -> int:
+        index = len(self._entries)
+        self._entries.append([path, old, new, original, state])
+        self._by_path[path] = index
+        return index
+
+    def _append(self, kind: int, payload: bytes) -> int:
+        """Ajoute un enregistrement ; retourne l'offset de ses données."""
+        from zlib import crc32
+        self._file.write(bytes((kind,)) + len(payload).to_bytes(4, 'little')
+                         + crc32(payload).to_bytes(4, 'little'))
+        self._file.write(payload)
+        offset = self._end + _J_RECORD_SIZE
+        self._end = offset + len(payload)
+        return offset
+
+    def _recover(self) -> None:
+        """Entrées interrompues entre BEGIN et COMMIT : terminées si le fichier porte déjà le nouveau contenu."""
+        for path, index in self._by_path.items():
+            entry = self._entries[index]
+            if entry[4] != JOURNAL_PENDING:
+                continue
+            try:
+                current = journal_hash(_read_file(path))
+            except OSError:
+                continue
+            if current == entry[2]:
+                self._mark(_J_COMMIT, index)
+        self.sync(True)
+
+    def _mark(self, kind: int, index: int) -> None:
+        self._append(kind, index.to_bytes(4, 'little'))
+        self._entries[index][4] = JOURNAL_DONE if kind == _J_COMMIT else JOURNAL_ROLLED_BACK
+
+    def completed(self, path: str) -> bool:
+        """Vrai si `path` a déjà été traité (et pas annulé depuis)."""
+        index = self._by_path.get(os.path.abspath(path))
+        return index is not None and self._entries[index][4] == JOURNAL_DONE
+
+    def begin(self, path: str, original: bytes, new: bytes) -> int:
+        """Consigne le remplacement à venir de `path` ; retourne l'index de l'entrée."""
+        path = os.path.abspath(path)
+        encoded = path.encode('utf-8')
+        old_hash, new_hash = journal_hash(original), journal_hash(new)
+        offset = self._append(_J_BEGIN, old_hash + new_hash + len(original).to_bytes(2, 'little')
+                              + bytes(original) + encoded)
+        start = 2 * JOURNAL_HASH_SIZE + 2
+        return self._add(path, old_hash, new_hash, (offset + start, len(original)), JOURNAL_PENDING)
+
+    def commit(self, indices) -> None:
+        """Marque des remplacements comme effectués (après le renommage)."""
+        for index in indices:
+            self._mark(_J_COMMIT, index)
+
+    def unchanged(self, path: str, data: bytes) -> None:
+        """Consigne un fichier traité sans modification (rien à réécrire ni à annuler)."""
+        path = os.path.abspath(path)
+        digest = journal_hash(data)
+        self._append(_J_UNCHANGED, digest + path.encode('utf-8'))
+        self._add(path, digest, digest, None, JOURNAL_DONE)
+
+    def sync(self, fsync: bool = True) -> None:
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+    def stats(self) -> dict:
+        counts = {JOURNAL_PENDING: 0, JOURNAL_DONE: 0, JOURNAL_ROLLED_BACK: 0}
+        rewritten = 0
+        for index in self._by_path.values():
+            entry = self._entries[index]
+            counts[entry[4]] += 1
+            rewritten += entry[3] is not None and entry[4] == JOURNAL_DONE
+        return {'files': len(self._by_path), 'rewritten': rewritten, **counts,
+                'records': len(self._entries), 'bytes': self._end}
+
+    def rollback(self, durability: str = 'batch', force: bool = False, window: int = 256) -> dict:
+        """Remet le contenu d'origine des fichiers réécrits.
+
+        Un fichier modifié depuis (ni l'ancien ni le nouveau contenu) est un conflit,
+        laissé intact sauf avec `force`.
+        """
+        report = {'restored': 0, 'unchanged': 0, 'conflicts': []}
+        self.sync(False)
+        targets = [index for index in self._by_path.values()
+                   if self._entries[index][3] is not None
+                   and self._entries[index][4] != JOURNAL_ROLLED_BACK]
+        with open(self.path, 'rb') as source:
+            for start in range(0, len(targets), window):
+                restored = []
+                with AtomicWriter(durability, window=window + 1) as writer:
+                    for index in targets[start:start + window]:
+                        path, old_hash, new_hash, (offset, size), _state = self._entries[index]
+                        try:
+                            current = journal_hash(_read_file(path))
+                        except FileNotFoundError:
+                            current = None
+                        if current == old_hash:
+                            report['unchanged'] += 1
+                            self._mark(_J_ROLLBACK, index)
+                            continue
+                        if current != new_hash and not force:
+                            report['conflicts'].append(path)
+                            continue
+                        source.seek(offset)
+                        writer.write(path, source.read(size))
+                        restored.append(index)
+                for index in restored:
+                    self._mark(_J_ROLLBACK, index)
+                report['restored'] += len(restored)
+                self.sync(durability != 'none')
+        return report
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.sync(False)
+            self._file.close()
+
+    def __enter__(self) -> 'BatchJournal':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class JournaledWriter(AtomicWriter):
+    """AtomicWriter qui consigne chaque remplacement dans un BatchJournal : BEGIN
+    synchronisé avant le renommage (une fois par validation groupée), COMMIT après."""
+
+    def __init__(self, journal: BatchJournal, durability: str = 'batch', window: int = 256):
+        super().__init__(durability, window)
+        self.journal = journal
+        self._begun: dict = {}  # cible -> index de son entrée dans le journal
+
+    def write(self, path: str, data: bytes, original: bytes) -> None:
+        self._begun[path] = self.journal.begin(path, original, data)
+        if self.durability != 'batch':
+            self.journal.sync(self.durability != 'none')
+            super().write(path, data)
+            self.journal.commit([self._begun.pop(path)])
+            return
+        super().write(path, data)
+
+    def commit(self) -> None:
+        if not self._pending:
+            return
+        self.journal.sync(True)
+        paths = list(self._pending)
+        super().commit()
+        self.journal.commit([self._begun.pop(path) for path in paths])
+
+    def abort(self) -> None:
+        # Les entrées restent en attente : à la reprise, le fichier (intact) sera retraité
+        super().abort()
+        self._begun.clear()
+
+
+# ============================================================================
+# ACCÈS CONCURRENT
+# ============================================================================
+
+class FigureSnapshot:
+    """État figé (déchiffré) d'une figurine partagée : lisible sans verrou."""
+
+    __slots__ = ('data', 'version', '_summary')
+
+    def __init__(self, data: bytes, version: int):
+        self.data = data
+        self.version = version
+        self._summary = None
+
+    @property
+    def summary(self) -> dict:
+        """Stats de l'instantané, calculées au premier accès puis réutilisées."""
+        # Deux lecteurs peuvent la calculer en même temps : même résultat, sans verrou
+        summary = self._summary
+        if summary is None:
+            summary = self._summary = Skylander.from_decrypted(self.data).get_summary()
+        return dict(summary)
+
+    def skylander(self) -> Skylander:
+        """Copie modifiable (déchiffrée) de l'instantané."""
+        return Skylander.from_decrypted(self.data)
+
+    def read_block(self, index: int, encrypted: bool = False) -> bytes:
+        """Voir Skylander.read_block (seul le bloc demandé est chiffré)."""
+        return _translate_block(self.data, index, True, encrypted)
+
+    def encrypt(self) -> bytes:
+        return self.skylander().encrypt()
+
+
+class SharedSkylander:
+    """Skylander partagé entre threads.
+
+    Les modifications passent par `edit()`, sous un verrou d'écriture ; à la
+    sortie du bloc, les checksums sont recalculés et un nouvel instantané
+    immuable est publié. Les lecteurs (`snapshot()`) ne prennent aucun verrou
+    et ne voient jamais d'état intermédiaire (zone 0 écrite mais pas la zone
+    1, compteur de séquence incrémenté avant les CRC...).
+    """
+
+    def __init__(self, skylander: Skylander):
+        skylander = skylander.copy()
+        skylander.decrypt()
+        self._skylander = skylander
+        self._lock = threading.Lock()
+        self._snapshot = FigureSnapshot(bytes(skylander.data), 0)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SharedSkylander':
+        return cls(Skylander(read_sky_file(path)))
+
+    def snapshot(self) -> FigureSnapshot:
+        """Dernier état publié (une simple lecture de référence)."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @contextmanager
+    def edit(self, update_checksums: bool = True):
+        """Bloc de modification exclusif ; en cas d'exception, l'état publié est restauré."""
+        with self._lock:
+            try:
+                yield self._skylander
+            except BaseException:
+                self._skylander = self._snapshot.skylander()
+                raise
+            if update_checksums:
+                self._skylander.update_checksums()
+            self._snapshot = FigureSnapshot(bytes(self._skylander.data), self._snapshot.version + 1)
+
+    def update(self, fn):
+        """Applique `fn(skylander)` dans un bloc `edit()` et retourne son résultat."""
+        with self.edit() as skylander:
+            return fn(skylander)
+
+    def encrypt(self) -> bytes:
+        """Contenu chiffré du dernier état publié."""
+        return self._snapshot.encrypt()
+
+
+# ============================================================================
+# SNAPSHOTS (stockage dédupliqué par bloc)
+# ============================================================================
+
+BLOCK_SIZE = 16
+BLOCKS_PER_FIGURE = SKYLANDER_SIZE // BLOCK_SIZE
+
+
+class SnapshotStore:
+    """Historique des figurines, dédupliqué par bloc de 16 octets.
+
+    Chaque bloc unique est stocké une seule fois dans `blocks.bin` et indexé
+    par son hash ; une version est un manifeste (JSON) de 64 références de
+    blocs. Sur disque, un manifeste ne note que les références qui diffèrent
+    de la version précédente de la même UID : le stockage ne croît donc
+    qu'avec les blocs réellement modifiés.
+    
+    `gc()` écrit les blocs compactés dans un nouveau fichier (génération
+    suivante) ; la première ligne de `manifests.jsonl` désigne le fichier de
+    blocs en vigueur, et le renommage du nouveau fichier de manifestes est
+    l'unique point de bascule entre les deux générations.
+    """
+    
+    BLOCKS_FILE = 'blocks.bin'
+    MANIFESTS_FILE = 'manifests.jsonl'
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._generation = 0
+        self._blocks_path = self._blocks_file(0)
+        self._manifests_path = os.path.join(directory, self.MANIFESTS_FILE)
+        self._index: dict = {}
+        self._manifests: List[dict] = []
+        self._load()
+    
+    @staticmethod
+    def _hash(block: bytes) -> bytes:
+        from hashlib import blake2b  # Import différé : hashlib charge OpenSSL
+        return blake2b(block, digest_size=16).digest()
+    
+    def _blocks_file(self, generation: int) -> str:
+        name = self.BLOCKS_FILE if generation == 0 else f'blocks.{generation}.bin'
+        return os.path.join(self.directory, name)
+    
+    def _load(self) -> None:
+        import json
+        records = []
+        self._generation = 0
+        if os.path.exists(self._manifests_path):
+            with open(self._manifests_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Ligne tronquée par une écriture interrompue
+                    if 'generation' in record:
+                        self._generation = record['generation']
+                    else:
+                        records.append(record)
+        self._blocks_path = self._blocks_file(self._generation)
+        self._remove_stale_blocks()
+        
+        self._index.clear()
+        if os.path.exists(self._blocks_path):
+            with open(self._blocks_path, 'rb') as f:
+                content = f.read()
+            usable = len(content) - len(content) % BLOCK_SIZE
+            if usable != len(content):
+                # Fin de bloc tronquée : l'écarter, sinon les ajouts suivants seraient décalés
+                with open(self._blocks_path, 'r+b') as f:
+                    f.truncate(usable)
+            for ref in range(usable // BLOCK_SIZE):
+                block = content[ref * BLOCK_SIZE:(ref + 1) * BLOCK_SIZE]
+                self._index.setdefault(self._hash(block), ref)
+            self._block_count = usable // BLOCK_SIZE
+        else:
+            self._block_count = 0
+        
+        self._manifests = []
+        by_id = {}
+        for record in records:
+            manifest = self._decode(record, by_id)
+            if manifest is None or any(ref >= self._block_count for ref in manifest['blocks']):
+                continue
+            by_id[manifest['id']] = manifest
+            self._manifests.append(manifest)
+    
+    def _remove_stale_blocks(self) -> None:
+        """Supprime les fichiers de blocs d'une autre génération (gc interrompu ou terminé)."""
+        current = os.path.basename(self._blocks_path)
+        for name in os.listdir(self.directory):
+            if name.startswith('blocks.') and name.endswith(('.bin', '.tmp')) and name != current:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+    
+    @staticmethod
+    def _encode(manifest: dict, parent: Optional[dict]) -> str:
+        """Sérialise un manifeste, en delta par rapport à `parent` si fourni."""
+        record = {k: manifest[k] for k in ('id', 'uid', 'time', 'source')}
+        if parent is None:
+            record['blocks'] = manifest['blocks']
+        else:
+            record['parent'] = parent['id']
+            record['delta'] = [[pos, ref] for pos, (ref, old) in
+                               enumerate(zip(manifest['blocks'], parent['blocks'])) if ref != old]
+        import json
+        return json.dumps(record, separators=(',', ':'))
+    
+    @staticmethod
+    def _decode(record: dict, by_id: dict) -> Optional[dict]:
+        if 'blocks' in record:
+            return record
+        parent = by_id.get(record.get('parent'))
+        if parent is None:
+            return None
+        blocks = list(parent['blocks'])
+        for pos, ref in record['delta']:
+            blocks[pos] = ref
+        manifest = {k: record[k] for k in ('id', 'uid', 'time', 'source')}
+        manifest['blocks'] = blocks
+        return manifest
+    
+    def _read_blocks(self, refs: List[int]) -> bytes:
+        with open(self._blocks_path, 'rb') as f:
+            parts = []
+            for ref in refs:
+                f.seek(ref * BLOCK_SIZE)
+                parts.append(f.read(BLOCK_SIZE))
+        return b''.join(parts)
+    
+    # ------------------------------------------------------------------
+    # Ajout
+    # ------------------------------------------------------------------
+    
+    def add(self, data: bytes, source: str = '', timestamp: Optional[float] = None) -> dict:
+        """Enregistre une version (dump chiffré) et retourne son manifeste.
+        
+        Si le contenu est identique à la dernière version de cette UID, la
+        version existante est retournée sans rien écrire.
+        """
+        if len(data) != SKYLANDER_SIZE:
+            raise ValueError(f"Taille invalide: {len(data)} octets (attendu: {SKYLANDER_SIZE})")
+        refs = []
+        new_blocks = []
+        new_keys: dict = {}  # Fusionnés dans l'index une fois les blocs écrits
+        for b in range(BLOCKS_PER_FIGURE):
+            block = bytes(data[b * BLOCK_SIZE:(b + 1) * BLOCK_SIZE])
+            key = self._hash(block)
+            ref = self._index.get(key)
+            if ref is None:
+                ref = new_keys.get(key)
+            if ref is None:
+                ref = self._block_count + len(new_blocks)
+                new_keys[key] = ref
+                new_blocks.append(block)
+            refs.append(ref)
+        
+        uid = Skylander(bytes(data)).get_uid()
+        history = self.history(uid)
+        if history and history[-1]['blocks'] == refs:
+            return history[-1]
+        
+        if new_blocks:
+            try:
+                with open(self._blocks_path, 'ab') as f:
+                    f.write(b''.join(new_blocks))
+            except OSError:
+                # Écriture partielle possible : ne garder que des blocs entiers
+                if os.path.exists(self._blocks_path):
+                    with open(self._blocks_path, 'r+b') as f:
+                        f.truncate(self._block_count * BLOCK_SIZE)
+                raise
+            self._block_count += len(new_blocks)
+            self._index.update(new_keys)
+        
+        manifest = {
+            'id': (self._manifests[-1]['id'] + 1) if self._manifests else 1,
+            'uid': uid,
+            'time': time.time() if timestamp is None else timestamp,
+            'source': source,
+            'blocks': refs,
+        }
+        with open(self._manifests_path, 'a', encoding='utf-8') as f:
+            f.write(self._encode(manifest, history[-1] if history else None) + '\n')
+        self._manifests.append(manifest)
+        return manifest
+    
+    def add_file(self, path: str, timestamp: Optional[float] = None) -> dict:
+        with open(path, 'rb') as f:
+            data = f.read()
+        return self.add(data, source=os.path.basename(path), timestamp=timestamp)
+    
+    def add_directory(self, directory: str, timestamp: Optional[float] = None) -> List[dict]:
+        """Enregistre une version de chaque .sky du dossier."""
+        return [self.add_file(path, timestamp) for path in list_sky_files(directory)]
+    
+    # ------------------------------------------------------------------
+    # Consultation et restauration
+    # ------------------------------------------------------------------
+    
+    def uids(self) -> List[str]:
+        return sorted({m['uid'] for m in self._manifests})
+    
+    def history(self, uid: str) -> List[dict]:
+        """Versions d'une UID, de la plus ancienne à la plus récente."""
+        uid = uid.upper()
+        return [m for m in self._manifests if m['uid'] == uid]
+    
+    def get(self, manifest_id: int) -> bytes:
+        """Contenu (chiffré) d'une version."""
+        for manifest in self._manifests:
+            if manifest['id'] == manifest_id:
+                return self._read_blocks(manifest['blocks'])
+        raise KeyError(f"Version inconnue: {manifest_id}")
+    
+    def restore(self, uid: str, at: Optional[float] = None,
+                path: Optional[str] = None) -> Optional[bytes]:
+        """Dernière version d'une UID à l'instant `at` (ou la plus récente).
+        
+        Si `path` est donné, le contenu y est également écrit.
+        """
+        candidates = [m for m in self.history(uid) if at is None or m['time'] <= at]
+        if not candidates:
+            return None
+        data = self._read_blocks(candidates[-1]['blocks'])
+        if path is not None:
+            write_sky_file(path, data)
+        return data
+    
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    
+    def prune(self, keep_last: Optional[int] = None, before: Optional[float] = None) -> int:
+        """Oublie des versions (les blocs sont libérés par `gc()`).
+        
+        `keep_last` conserve les N dernières versions par UID ; `before` supprime
+        les versions plus anciennes que ce timestamp (sauf la dernière de chaque UID).
+        """
+        latest = {}
+        counts: dict = {}
+        for manifest in reversed(self._manifests):
+            latest.setdefault(manifest['uid'], manifest['id'])
+        kept = []
+        for manifest in reversed(self._manifests):
+            uid = manifest['uid']
+            counts[uid] = counts.get(uid, 0) + 1
+            drop = False
+            if keep_last is not None and counts[uid] > keep_last:
+                drop = True
+            if before is not None and manifest['time'] < before and manifest['id'] != latest[uid]:
+                drop = True
+            if not drop:
+                kept.append(manifest)
+        removed = len(self._manifests) - len(kept)
+        if removed:
+            self._manifests = list(reversed(kept))
+            self._rewrite(self._manifests)
+        return removed
+    
+    def gc(self) -> dict:
+        """Supprime les blocs qui ne sont plus référencés par aucune version."""
+        used = sorted({ref for m in self._manifests for ref in m['blocks']})
+        if len(used) == self._block_count:
+            return {'blocks_removed': 0, 'bytes_freed': 0}
+        remap = {old: new for new, old in enumerate(used)}
+        blocks = self._read_blocks(used)
+        manifests = [dict(m, blocks=[remap[ref] for ref in m['blocks']]) for m in self._manifests]
+        removed = self._block_count - len(used)
+        generation = self._generation + 1
+        with open(self._blocks_file(generation), 'wb') as f:
+            f.write(blocks)
+            f.flush()
+            os.fsync(f.fileno())
+        self._rewrite(manifests, generation)
+        self._load()
+        return {'blocks_removed': removed, 'bytes_freed': removed * BLOCK_SIZE}
+    
+    def _rewrite(self, manifests: List[dict], generation: Optional[int] = None) -> None:
+        """Remplace atomiquement les manifestes (fichier temporaire + rename).
+        
+        Avec `generation`, le nouveau fichier désigne ce fichier de blocs : le
+        rename bascule manifestes et blocs ensemble.
+        """
+        import json
+        generation = self._generation if generation is None else generation
+        tmp = self._manifests_path + '.tmp'
+        last_by_uid: dict = {}
+        with open(tmp, 'w', encoding='utf-8') as f:
+            if generation:
+                f.write(json.dumps({'generation': generation}) + '\n')
+            for manifest in manifests:
+                f.write(self._encode(manifest, last_by_uid.get(manifest['uid'])) + '\n')
+                last_by_uid[manifest['uid']] = manifest
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._manifests_path)
+        _fsync_directory(self.directory)
+    
+    def stats(self) -> dict:
+        versions = len(self._manifests)
+        stored = self._block_count * BLOCK_SIZE
+        try:
+            stored_manifests = os.path.getsize(self._manifests_path)
+        except OSError:
+            stored_manifests = 0
+        logical = versions * SKYLANDER_SIZE
+        return {
+            'uids': len(self.uids()),
+            'versions': versions,
+            'unique_blocks': self._block_count,
+            'logical_bytes': logical,
+            'stored_bytes': stored + stored_manifests,
+            'dedup_ratio': (logical / (stored + stored_manifests)) if versions else 0.0,
+        }
+
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+#
+# Désactivée par défaut : les fonctions instrumentées ne sont remplacées par
+# des versions chronométrées qu'à l'appel de enable_profiling(), le coût est
+# donc nul tant que le profilage est inactif.
+#
+# Activation globale : variable d'environnement SKYLANDER_PROFILE=1
+# (ou SKYLANDER_PROFILE=<fichier.json|fichier.prom> pour un export à la sortie).
+
+PROFILE_ENV = 'SKYLANDER_PROFILE'
+
+
+class Profiler:
+    """Compteurs et temps cumulés par opération instrumentée."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict = {}
+    
+    def record(self, name: str, elapsed_ns: int, nbytes: int = 0) -> None:
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = [0, 0, 0]
+            stat[0] += 1
+            stat[1] += elapsed_ns
+            stat[2] += nbytes
+    
+    def snapshot(self) -> dict:
+        """Copie des compteurs : {op: {'calls', 'seconds', 'bytes'}}."""
+        with self._lock:
+            return {name: {'calls': calls, 'seconds': ns / 1e9, 'bytes': nbytes}
+                    for name, (calls, ns, nbytes) in sorted(self._stats.items())}
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+    
+    def drain(self) -> dict:
+        """Retourne les compteurs bruts et les remet à zéro (agrégation inter-processus)."""
+        with self._lock:
+            stats, self._stats = self._stats, {}
+        return stats
+    
+    def merge(self, raw: dict) -> None:
+        """Ajoute des compteurs bruts obtenus par `drain()` dans un autre processus."""
+        with self._lock:
+            for name, (calls, ns, nbytes) in raw.items():
+                stat = self._stats.setdefault(name, [0, 0, 0])
+                stat[0] += calls
+                stat[1] += ns
+                stat[2] += nbytes
+    
+    def to_json(self, allocations: int = 10) -> str:
+        report = {'enabled': profiling_enabled(), 'operations': self.snapshot()}
+        if tracemalloc_active():
+            report['allocations'] = allocation_snapshot(allocations)
+        import json
+        return json.dumps(report, indent=2)
+    
+    def to_prometheus(self) -> str:
+        """Export au format texte Prometheus."""
+        stats = self.snapshot()
+        lines = [
+            '# HELP skylander_calls_total Nombre d\'appels par opération instrumentée',
+            '# TYPE skylander_calls_total counter',
+        ]
+        lines += [f'skylander_calls_total{{op="{op}"}} {s["calls"]}' for op, s in stats.items()]
+        lines += [
+            '# HELP skylander_seconds_total Temps cumulé par opération instrumentée',
+            '# TYPE skylander_seconds_total counter',
+        ]
+        lines += [f'skylander_seconds_total{{op="{op}"}} {s["seconds"]:.9f}' for op, s in stats.items()]
+        lines += [
+            '# HELP skylander_bytes_total Octets lus ou écrits',
+            '# TYPE skylander_bytes_total counter',
+        ]
+        lines += [f'skylander_bytes_total{{op="{op}"}} {s["bytes"]}' for op, s in stats.items() if s['bytes']]
+        return '\n'.join(lines) + '\n'
+
+
+PROFILER = Profiler()
+_INSTRUMENTED: dict = {}
+
+
+def _timed(name: str, fn, count_bytes=None):
+    perf = time.perf_counter_ns
+    record = PROFILER.record
+    
+    def wrapper(*args, **kwargs):
+        start = perf()
+        result = fn(*args, **kwargs)
+        record(name, perf() - start, count_bytes(args, result) if count_bytes else 0)
+        return result
+    wrapper.__wrapped__ = fn
+    wrapper.__name__ = getattr(fn, '__name__', name)
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+def _instrumentation_targets():
+    """(nom, objet porteur, attribut, comptage d'octets) des points instrumentés."""
+    module = globals()
+    return [
+        ('compute_key', module, 'compute_key', None),
+        ('aes_decrypt', module, '_aes_decrypt', None),
+        ('aes_encrypt', module, '_aes_encrypt', None),
+        ('crc16', CRC16, 'calculate', None),
+        ('update_checksums', Skylander, 'update_checksums', None),
+        ('file_read', module, '_read_file', lambda args, result: len(result)),
+        ('file_write', module, '_write_file', lambda args, result: len(args[1])),
+    ]
+
+
+def enable_profiling(trace_allocations: bool = False) -> None:
+    """Active l'instrumentation des chemins critiques (idempotent)."""
+    if trace_allocations:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    if _INSTRUMENTED:
+        return
+    for name, owner, attr, count_bytes in _instrumentation_targets():
+        if isinstance(owner, dict):
+            original = owner[attr]
+            _INSTRUMENTED[(name, 'module')] = original
+            owner[attr] = _timed(name, original, count_bytes)
+        else:
+            original = owner.__dict__[attr]
+            _INSTRUMENTED[(name, owner)] = original
+            if isinstance(original, classmethod):
+                setattr(owner, attr, classmethod(_timed(name, original.__func__, count_bytes)))
+            else:
+                setattr(owner, attr, _timed(name, original, count_bytes))
+
+
+def disable_profiling() -> None:
+    """Restaure les fonctions d'origine (les compteurs sont conservés)."""
+    module = globals()
+    for name, owner, attr, _ in _instrumentation_targets():
+        original = _INSTRUMENTED.pop((name, 'module' if isinstance(owner, dict) else owner), None)
+        if original is None:
+            continue
+        if isinstance(owner, dict):
+            module[attr] = original
+        else:
+            setattr(owner, attr, original)
+    if tracemalloc_active():
+        import tracemalloc
+        tracemalloc.stop()
+
+
+def profiling_enabled() -> bool:
+    return bool(_INSTRUMENTED)
+
+
+def tracemalloc_active() -> bool:
+    tracemalloc = sys.modules.get('tracemalloc')
+    return tracemalloc is not None and tracemalloc.is_tracing()
+
+
+def allocation_snapshot(limit: int = 10) -> List[dict]:
+    """Principales allocations (par ligne) depuis l'activation de tracemalloc."""
+    if not tracemalloc_active():
+        return []
+    import tracemalloc
+    stats = tracemalloc.take_snapshot().statistics('lineno')[:limit]
+    return [{'location': str(stat.traceback), 'size': stat.size, 'count': stat.count}
+            for stat in stats]
+
+
+def dump_profile(path: str) -> None:
+    """Écrit le rapport de profilage (JSON, ou Prometheus si le fichier finit par .prom)."""
+    text = PROFILER.to_prometheus() if path.endswith('.prom') else PROFILER.to_json()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _profile_from_environment() -> None:
+    setting = os.environ.get(PROFILE_ENV, '').strip()
+    if not setting or setting == '0':
+        return
+    enable_profiling(trace_allocations=os.environ.get(PROFILE_ENV + '_ALLOC') == '1')
+    if setting.endswith(('.json', '.prom')):
+        import atexit
+        atexit.register(dump_profile, setting)
+
+
+_profile_from_environment()
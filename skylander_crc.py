@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Skylanders Batch CRC
+====================
+CRC16-CCITT de nombreuses figurines déchiffrées à la fois : secteur 0,
+en-têtes, type 2 et type 3 des deux zones, résultats identiques bit à bit
+à `CRC16.calculate`.
+
+Deux implémentations :
+
+- NumPy (si installé) : une seule passe sur un tableau (N, 1024), chaque
+  octet du message est traité pour les N figurines à la fois (recherche
+  dans la table sur l'axe des figurines) ;
+- Python pur : table de 65 536 entrées traitant 2 octets par itération.
+
+Dans les deux cas, les 224 octets nuls qui complètent le CRC type 3 sont
+sautés en une seule opération : sur des zéros, le registre évolue
+linéairement et ce saut se précalcule en deux tables de 256 entrées.
+
+Usage:
+    python skylander_crc.py --check              # comparaison avec CRC16.calculate
+    python skylander_crc.py --sizes 1000,100000,1000000
+"""
+
+import argparse
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from skylander_core import (
+    CRC16, SKYLANDER_SIZE, AREA_HEADER_BLOCKS, AREA_TYPE2_BLOCKS, AREA_TYPE3_BLOCKS
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _block_offsets(blocks: Sequence[int]) -> List[int]:
+    return [b * 16 + i for b in blocks for i in range(16)]
+
+
+def _header_region(area: int) -> Tuple[List[int], int, Dict[int, int]]:
+    return _block_offsets([AREA_HEADER_BLOCKS[area]]), 0, {0x0E: 0x05, 0x0F: 0x00}
+
+
+# Nom -> (octets couverts, octets nuls ajoutés, octets remplacés {décalage: valeur})
+# Même ordre et mêmes noms que Skylander.verify_checksums()
+REGIONS: Dict[str, Tuple[List[int], int, Dict[int, int]]] = {
+    'sector0': (list(range(0x1E)), 0, {}),
+    'area0_type3': (_block_offsets(AREA_TYPE3_BLOCKS[0]), 0x0E * 16, {}),
+    'area0_type2': (_block_offsets(AREA_TYPE2_BLOCKS[0]), 0, {}),
+    'area0_header': _header_region(0),
+    'area1_type3': (_block_offsets(AREA_TYPE3_BLOCKS[1]), 0x0E * 16, {}),
+    'area1_type2': (_block_offsets(AREA_TYPE2_BLOCKS[1]), 0, {}),
+    'area1_header': _header_region(1),
+}
+
+# Emplacement du CRC stocké de chaque région
+STORED_OFFSETS = {
+    'sector0': 0x1E,
+    'area0_type3': AREA_HEADER_BLOCKS[0] * 16 + 0x0A, 'area1_type3': AREA_HEADER_BLOCKS[1] * 16 + 0x0A,
+    'area0_type2': AREA_HEADER_BLOCKS[0] * 16 + 0x0C, 'area1_type2': AREA_HEADER_BLOCKS[1] * 16 + 0x0C,
+    'area0_header': AREA_HEADER_BLOCKS[0] * 16 + 0x0E, 'area1_header': AREA_HEADER_BLOCKS[1] * 16 + 0x0E,
+}
+
+
+# ============================================================================
+# TABLES
+# ============================================================================
+
+_tables = None
+
+
+def _step(crc: int, byte: int) -> int:
+    return ((crc << 8) ^ CRC16._table[((crc >> 8) ^ byte) & 0xFF]) & 0xFFFF
+
+
+def _zero_advance(crc: int, count: int) -> int:
+    for _ in range(count):
+        crc = _step(crc, 0)
+    return crc
+
+
+def _build_tables():
+    """(table 2 octets, {nb d'octets nuls: (table octet haut, table octet bas)})."""
+    global _tables
+    if _tables is None:
+        CRC16._init_table()
+        # Deux octets (b0, b1) depuis l'état c : résultat = table16[c ^ (b0 << 8 | b1)]
+        table16 = [_step(_step(x, 0), 0) for x in range(0x10000)]
+        zeros = {}
+        for _, count, _ in REGIONS.values():
+            if count and count not in zeros:
+                zeros[count] = ([_zero_advance(i << 8, count) for i in range(256)],
+                                [_zero_advance(i, count) for i in range(256)])
+        _tables = (table16, zeros)
+    return _tables
+
+
+# ============================================================================
+# PYTHON PUR
+# ============================================================================
+
+def _crc_words(data: bytes, table16: list) -> int:
+    words = array('H', data[:len(data) & ~1])
+    if sys.byteorder == 'little':
+        words.byteswap()
+    crc = 0xFFFF
+    for word in words:
+        crc = table16[crc ^ word]
+    if len(data) & 1:
+        crc = _step(crc, data[-1])
+    return crc
+
+
+def _region_bytes(figure, offsets: List[int], patches: Dict[int, int]) -> bytes:
+    # Les régions sont formées de blocs de 16 octets (ou d'un préfixe contigu)
+    data = bytearray()
+    start = offsets[0]
+    previous = start - 1
+    for offset in offsets:
+        if offset != previous + 1:
+            data += figure[start:previous + 1]
+            start = offset
+        previous = offset
+    data += figure[start:previous + 1]
+    for position, value in patches.items():
+        data[position] = value
+    return bytes(data)
+
+
+def _crcs_python(figures: Sequence, names: Sequence[str]) -> Dict[str, List[int]]:
+    table16, zeros = _build_tables()
+    result = {}
+    for name in names:
+        offsets, zero_count, patches = REGIONS[name]
+        column = []
+        for figure in figures:
+            crc = _crc_words(_region_bytes(figure, offsets, patches), table16)
+            if zero_count:
+                high, low = zeros[zero_count]
+                crc = high[crc >> 8] ^ low[crc & 0xFF]
+            column.append(crc)
+        result[name] = column
+    return result
+
+
+# ============================================================================
+# NUMPY
+# ============================================================================
+
+_np_tables = None
+
+
+def _crcs_numpy(matrix, names: Sequence[str]) -> Dict[str, object]:
+    global _np_tables
+    table16, zeros = _build_tables()
+    if _np_tables is None:
+        _np_tables = (np.array(table16, dtype=np.uint16),
+                      {count: (np.array(h, dtype=np.uint16), np.array(l, dtype=np.uint16))
+                       for count, (h, l) in zeros.items()})
+    np_table16, np_zeros = _np_tables
+    result = {}
+    for name in names:
+        offsets, zero_count, patches = REGIONS[name]
+        region = matrix[:, offsets]
+        if patches:
+            region = region.copy()
+            for position, value in patches.items():
+                region[:, position] = value
+        # Mots de 16 bits (big-endian), une colonne par paire d'octets
+        words = (region[:, 0::2].astype(np.uint16) << 8) | region[:, 1::2]
+        crc = np.full(matrix.shape[0], 0xFFFF, dtype=np.uint16)
+        for k in range(words.shape[1]):
+            crc = np_table16[crc ^ words[:, k]]
+        if zero_count:
+            high, low = np_zeros[zero_count]
+            crc = high[crc >> 8] ^ low[crc & 0xFF]
+        result[name] = crc
+    return result
+
+
+def as_matrix(figures):
+    """Tableau NumPy (N, 1024) uint8, sans copie si possible."""
+    if isinstance(figures, np.ndarray):
+        matrix = figures
+    elif isinstance(figures, (bytes, bytearray, memoryview)):
+        matrix = np.frombuffer(figures, dtype=np.uint8)
+    else:
+        matrix = np.frombuffer(b''.join(bytes(f) for f in figures), dtype=np.uint8)
+    return matrix.reshape(-1, SKYLANDER_SIZE)
+
+
+def _split(figures) -> Sequence:
+    """Figurines individuelles (vues) à partir d'un tampon contigu ou d'une séquence."""
+    if isinstance(figures, (bytes, bytearray, memoryview)):
+        view = memoryview(figures).cast('B')
+        return [view[i:i + SKYLANDER_SIZE] for i in range(0, len(view), SKYLANDER_SIZE)]
+    return figures
+
+
+# ============================================================================
+# API
+# ============================================================================
+
+def batch_crcs(figures, names: Optional[Sequence[str]] = None, use_numpy: Optional[bool] = None) -> Dict[str, list]:
+    """CRC de chaque région (REGIONS) pour chaque figurine déchiffrée.
+
+    `figures` : séquence de contenus de 1024 octets, tampon contigu de N x 1024
+    octets, ou tableau NumPy (N, 1024). Retourne {région: liste de CRC}.
+    """
+    names = list(names or REGIONS)
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        return {name: column.tolist() for name, column in _crcs_numpy(as_matrix(figures), names).items()}
+    return _crcs_python(_split(figures), names)
+
+
+def _stored(figures, name: str, use_numpy: bool):
+    offset = STORED_OFFSETS[name]
+    if use_numpy:
+        matrix = as_matrix(figures)
+        return (matrix[:, offset].astype(np.uint16) | (matrix[:, offset + 1].astype(np.uint16) << 8)).tolist()
+    return [figure[offset] | (figure[offset + 1] << 8) for figure in _split(figures)]
+
+
+def batch_verify(figures, use_numpy: Optional[bool] = None) -> List[Dict[str, bool]]:
+    """Équivalent de `Skylander.verify_checksums()` pour chaque figurine déchiffrée."""
+    if use_numpy is None:
+        use_numpy = np is not None
+    crcs = batch_crcs(figures, use_numpy=use_numpy)
+    columns = {name: [stored == crc for stored, crc in zip(_stored(figures, name, use_numpy), crcs[name])]
+               for name in REGIONS}
+    count = len(columns['sector0'])
+    return [{name: columns[name][i] for name in REGIONS} for i in range(count)]
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _random_chunk(count: int, seed: int) -> bytes:
+    import random
+    return random.Random(seed).randbytes(count * SKYLANDER_SIZE)
+
+
+def check(count: int = 2000, seed: int = 47) -> List[str]:
+    """Compare les deux implémentations à CRC16.calculate (via Skylander) ; retourne les écarts."""
+    from skylander_core import Skylander
+    data = _random_chunk(count, seed)
+    implementations = [('python', False)] + ([('numpy', True)] if np is not None else [])
+    results = {label: batch_crcs(data, use_numpy=flag) for label, flag in implementations}
+    errors = []
+    for i, figure in enumerate(_split(data)):
+        skylander = Skylander.from_decrypted(bytes(figure))
+        expected = {'sector0': skylander._crc_sector0()}
+        for area in (0, 1):
+            expected[f'area{area}_type3'] = skylander._crc_type3(area)
+            expected[f'area{area}_type2'] = skylander._crc_type2(area)
+            expected[f'area{area}_header'] = skylander._crc_header(area)
+        for label, crcs in results.items():
+            for name, value in expected.items():
+                if crcs[name][i] != value:
+                    errors.append(f"{label} figurine {i} {name}: {crcs[name][i]:#06x} != {value:#06x}")
+    return errors
+
+
+def bench(sizes: Sequence[int], chunk: int = 65536, reference_sample: int = 1000) -> List[dict]:
+    """Figurines/s (7 CRC chacune) par implémentation ; la référence scalaire est mesurée
+    sur un échantillon et extrapolée."""
+    from skylander_core import Skylander
+
+    sample = _random_chunk(reference_sample, 1)
+    started = time.perf_counter()
+    for figure in _split(sample):
+        skylander = Skylander.from_decrypted(bytes(figure))
+        skylander._crc_sector0()
+        for area in (0, 1):
+            skylander._crc_type3(area, force=True)
+            skylander._crc_type2(area, force=True)
+            skylander._crc_header(area)
+    reference_rate = reference_sample / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    _build_tables()  # Tables précalculées une fois par processus, hors mesure
+    setup_s = time.perf_counter() - started
+
+    rows = []
+    implementations = [('python', False)] + ([('numpy', True)] if np is not None else [])
+    for size in sizes:
+        row = {'figures': size, 'reference_per_s': reference_rate, 'tables_s': setup_s}
+        for label, flag in implementations:
+            elapsed = 0.0
+            for start in range(0, size, chunk):
+                data = _random_chunk(min(chunk, size - start), start)
+                t0 = time.perf_counter()
+                batch_crcs(data, use_numpy=flag)
+                elapsed += time.perf_counter() - t0
+            row[f'{label}_per_s'] = size / elapsed if elapsed else 0.0
+        rows.append(row)
+    return rows
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="CRC16 de nombreuses figurines à la fois")
+    parser.add_argument('--check', action='store_true', help="vérifier l'égalité avec CRC16.calculate")
+    parser.add_argument('--sizes', default='1000,100000,1000000', help="tailles des lots mesurés")
+    parser.add_argument('--no-numpy', action='store_true', help="ne pas mesurer NumPy")
+    args = parser.parse_args()
+
+    global np
+    if args.no_numpy:
+        np = None
+    print(f"NumPy: {np.__version__ if np is not None else 'absent (Python pur uniquement)'}")
+
+    if args.check:
+        errors = check()
+        for error in errors[:20]:
+            print(f"✗ {error}")
+        print("✓ Identique à CRC16.calculate" if not errors else f"{len(errors)} écart(s)")
+        return 1 if errors else 0
+
+    rows = bench([int(s) for s in args.sizes.split(',') if s.strip()])
+    print(f"Tables précalculées en {rows[0]['tables_s'] * 1000:.0f} ms" if rows else '')
+    for row in rows:
+        line = f"{row['figures']:>9,} figurines   référence {row['reference_per_s']:>9,.0f}/s"
+        line += f"   python {row['python_per_s']:>9,.0f}/s ({row['python_per_s'] / row['reference_per_s']:.1f}x)"
+        if 'numpy_per_s' in row:
+            line += f"   numpy {row['numpy_per_s']:>11,.0f}/s ({row['numpy_per_s'] / row['reference_per_s']:.1f}x)"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
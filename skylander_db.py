@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Skylanders Database
+===================
+Base de données des personnages et tables XP. Chargée à la demande par
+skylander_core (les noms restent accessibles via `skylander_core.SKYLANDERS_DB`).
+"""
+
+from skylander_core import SkylandersGame
+
+
+# Tables XP par niveau (index = niveau, valeur = XP minimum pour ce niveau)
+# SSA: Niveau 10 max = 33,000 XP
+# Index 1 = niveau 1, Index 10 = niveau 10
+XP_TABLE_LEVEL_10 = {
+    1: 0, 2: 100, 3: 400, 4: 1000, 5: 2000,
+    6: 4000, 7: 7500, 8: 13000, 9: 20000, 10: 28000
+}
+XP_MAX_LEVEL_10 = 33000
+
+# Giants: Niveau 15 max ≈ 96,500 XP
+XP_TABLE_LEVEL_15 = {
+    1: 0, 2: 100, 3: 400, 4: 1000, 5: 2000,
+    6: 4000, 7: 7500, 8: 13000, 9: 20000, 10: 28000,
+    11: 33000, 12: 45000, 13: 58000, 14: 73000, 15: 88000
+}
+XP_MAX_LEVEL_15 = 96500
+
+# Swap Force/Trap Team/SuperChargers/Imaginators: Niveau 20 max ≈ 197,000 XP
+XP_TABLE_LEVEL_20 = {
+    1: 0, 2: 100, 3: 400, 4: 1000, 5: 2000,
+    6: 4000, 7: 7500, 8: 13000, 9: 20000, 10: 28000,
+    11: 33000, 12: 45000, 13: 58000, 14: 73000, 15: 88000,
+    16: 105000, 17: 125000, 18: 148000, 19: 175000, 20: 190000
+}
+XP_MAX_LEVEL_20 = 197000
+
+
+# ============================================================================
+# BASE DE DONNÉES SKYLANDERS
+# ============================================================================
+
+SKYLANDERS_DB = {
+    # Spyro's Adventure (0-32)
+    0: ("Whirlwind", SkylandersGame.SPYROS_ADVENTURE),
+    1: ("Sonic Boom", SkylandersGame.SPYROS_ADVENTURE),
+    2: ("Warnado", SkylandersGame.SPYROS_ADVENTURE),
+    3: ("Lightning Rod", SkylandersGame.SPYROS_ADVENTURE),
+    4: ("Bash", SkylandersGame.SPYROS_ADVENTURE),
+    5: ("Terrafin", SkylandersGame.SPYROS_ADVENTURE),
+    6: ("Dino-Rang", SkylandersGame.SPYROS_ADVENTURE),
+    7: ("Prism Break", SkylandersGame.SPYROS_ADVENTURE),
+    8: ("Sunburn", SkylandersGame.SPYROS_ADVENTURE),
+    9: ("Eruptor", SkylandersGame.SPYROS_ADVENTURE),
+    10: ("Ignitor", SkylandersGame.SPYROS_ADVENTURE),
+    11: ("Flameslinger", SkylandersGame.SPYROS_ADVENTURE),
+    12: ("Zap", SkylandersGame.SPYROS_ADVENTURE),
+    13: ("Wham-Shell", SkylandersGame.SPYROS_ADVENTURE),
+    14: ("Gill Grunt", SkylandersGame.SPYROS_ADVENTURE),
+    15: ("Slam Bam", SkylandersGame.SPYROS_ADVENTURE),
+    16: ("Spyro", SkylandersGame.SPYROS_ADVENTURE),
+    17: ("Voodood", SkylandersGame.SPYROS_ADVENTURE),
+    18: ("Double Trouble", SkylandersGame.SPYROS_ADVENTURE),
+    19: ("Trigger Happy", SkylandersGame.SPYROS_ADVENTURE),
+    20: ("Drobot", SkylandersGame.SPYROS_ADVENTURE),
+    21: ("Drill Sergeant", SkylandersGame.SPYROS_ADVENTURE),
+    22: ("Boomer", SkylandersGame.SPYROS_ADVENTURE),
+    23: ("Wrecking Ball", SkylandersGame.SPYROS_ADVENTURE),
+    24: ("Camo", SkylandersGame.SPYROS_ADVENTURE),
+    25: ("Zook", SkylandersGame.SPYROS_ADVENTURE),
+    26: ("Stealth Elf", SkylandersGame.SPYROS_ADVENTURE),
+    27: ("Stump Smash", SkylandersGame.SPYROS_ADVENTURE),
+    28: ("Dark Spyro", SkylandersGame.SPYROS_ADVENTURE),
+    29: ("Hex", SkylandersGame.SPYROS_ADVENTURE),
+    30: ("Chop Chop", SkylandersGame.SPYROS_ADVENTURE),
+    31: ("Ghost Roaster", SkylandersGame.SPYROS_ADVENTURE),
+    32: ("Cynder", SkylandersGame.SPYROS_ADVENTURE),
+    
+    # Giants (100-115)
+    100: ("Jet-Vac", SkylandersGame.GIANTS),
+    101: ("Swarm", SkylandersGame.GIANTS),
+    102: ("Crusher", SkylandersGame.GIANTS),
+    103: ("Flashwing", SkylandersGame.GIANTS),
+    104: ("Hot Head", SkylandersGame.GIANTS),
+    105: ("Hot Dog", SkylandersGame.GIANTS),
+    106: ("Chill", SkylandersGame.GIANTS),
+    107: ("Thumpback", SkylandersGame.GIANTS),
+    108: ("Pop Fizz", SkylandersGame.GIANTS),
+    109: ("Ninjini", SkylandersGame.GIANTS),
+    110: ("Bouncer", SkylandersGame.GIANTS),
+    111: ("Sprocket", SkylandersGame.GIANTS),
+    112: ("Tree Rex", SkylandersGame.GIANTS),
+    113: ("Shroomboom", SkylandersGame.GIANTS),
+    114: ("Eye-Brawl", SkylandersGame.GIANTS),
+    115: ("Fright Rider", SkylandersGame.GIANTS),
+    
+    # Trap Team (450-485)
+    450: ("Gusto", SkylandersGame.TRAP_TEAM),
+    451: ("Thunderbolt", SkylandersGame.TRAP_TEAM),
+    452: ("Fling Kong", SkylandersGame.TRAP_TEAM),
+    453: ("Blades", SkylandersGame.TRAP_TEAM),
+    454: ("Wallop", SkylandersGame.TRAP_TEAM),
+    455: ("Head Rush", SkylandersGame.TRAP_TEAM),
+    456: ("Fist Bump", SkylandersGame.TRAP_TEAM),
+    457: ("Rocky Roll", SkylandersGame.TRAP_TEAM),
+    458: ("Wildfire", SkylandersGame.TRAP_TEAM),
+    459: ("Ka-Boom", SkylandersGame.TRAP_TEAM),
+    460: ("Trail Blazer", SkylandersGame.TRAP_TEAM),
+    461: ("Torch", SkylandersGame.TRAP_TEAM),
+    462: ("Snap Shot", SkylandersGame.TRAP_TEAM),
+    463: ("Lob-Star", SkylandersGame.TRAP_TEAM),
+    464: ("Flip Wreck", SkylandersGame.TRAP_TEAM),
+    465: ("Echo", SkylandersGame.TRAP_TEAM),
+    466: ("Blastermind", SkylandersGame.TRAP_TEAM),
+    467: ("Enigma", SkylandersGame.TRAP_TEAM),
+    468: ("Déjà Vu", SkylandersGame.TRAP_TEAM),
+    469: ("Cobra Cadabra", SkylandersGame.TRAP_TEAM),
+    470: ("Jawbreaker", SkylandersGame.TRAP_TEAM),
+    471: ("Gearshift", SkylandersGame.TRAP_TEAM),
+    472: ("Chopper", SkylandersGame.TRAP_TEAM),
+    473: ("Tread Head", SkylandersGame.TRAP_TEAM),
+    474: ("Bushwhack", SkylandersGame.TRAP_TEAM),
+    475: ("Tuff Luck", SkylandersGame.TRAP_TEAM),
+    476: ("Food Fight", SkylandersGame.TRAP_TEAM),
+    477: ("High Five", SkylandersGame.TRAP_TEAM),
+    478: ("Krypt King", SkylandersGame.TRAP_TEAM),
+    479: ("Short Cut", SkylandersGame.TRAP_TEAM),
+    480: ("Bat Spin", SkylandersGame.TRAP_TEAM),
+    481: ("Funny Bone", SkylandersGame.TRAP_TEAM),
+    482: ("Knight Light", SkylandersGame.TRAP_TEAM),
+    483: ("Spotlight", SkylandersGame.TRAP_TEAM),
+    484: ("Knight Mare", SkylandersGame.TRAP_TEAM),
+    485: ("Blackout", SkylandersGame.TRAP_TEAM),
+    
+    # Imaginators Senseis (601-631)
+    601: ("King Pen", SkylandersGame.IMAGINATORS),
+    602: ("Tri-Tip", SkylandersGame.IMAGINATORS),
+    603: ("Chopscotch", SkylandersGame.IMAGINATORS),
+    604: ("Boom Bloom", SkylandersGame.IMAGINATORS),
+    605: ("Pit Boss", SkylandersGame.IMAGINATORS),
+    606: ("Barbella", SkylandersGame.IMAGINATORS),
+    607: ("Air Strike", SkylandersGame.IMAGINATORS),
+    608: ("Ember", SkylandersGame.IMAGINATORS),
+    609: ("Ambush", SkylandersGame.IMAGINATORS),
+    610: ("Dr. Krankcase", SkylandersGame.IMAGINATORS),
+    611: ("Hood Sickle", SkylandersGame.IMAGINATORS),
+    612: ("Tae Kwon Crow", SkylandersGame.IMAGINATORS),
+    613: ("Golden Queen", SkylandersGame.IMAGINATORS),
+    614: ("Wolfgang", SkylandersGame.IMAGINATORS),
+    615: ("Pain-Yatta", SkylandersGame.IMAGINATORS),
+    616: ("Mysticat", SkylandersGame.IMAGINATORS),
+    617: ("Starcast", SkylandersGame.IMAGINATORS),
+    618: ("Buckshot", SkylandersGame.IMAGINATORS),
+    619: ("Aurora", SkylandersGame.IMAGINATORS),
+    620: ("Flare Wolf", SkylandersGame.IMAGINATORS),
+    621: ("Chompy Mage", SkylandersGame.IMAGINATORS),
+    622: ("Bad Juju", SkylandersGame.IMAGINATORS),
+    623: ("Grave Clobber", SkylandersGame.IMAGINATORS),
+    624: ("Blaster-Tron", SkylandersGame.IMAGINATORS),
+    625: ("Ro-Bow", SkylandersGame.IMAGINATORS),
+    626: ("Chain Reaction", SkylandersGame.IMAGINATORS),
+    627: ("Kaos", SkylandersGame.IMAGINATORS),
+    628: ("Wild Storm", SkylandersGame.IMAGINATORS),
+    629: ("Tidepool", SkylandersGame.IMAGINATORS),
+    630: ("Crash Bandicoot", SkylandersGame.IMAGINATORS),
+    631: ("Dr. Neo Cortex", SkylandersGame.IMAGINATORS),
+    
+    # SWAP Force - Tops (2000-2015)
+    2000: ("Boom (Top)", SkylandersGame.SWAP_FORCE),
+    2001: ("Free (Top)", SkylandersGame.SWAP_FORCE),
+    2002: ("Rubble (Top)", SkylandersGame.SWAP_FORCE),
+    2003: ("Doom (Top)", SkylandersGame.SWAP_FORCE),
+    2004: ("Blast (Top)", SkylandersGame.SWAP_FORCE),
+    2005: ("Fire (Top)", SkylandersGame.SWAP_FORCE),
+    2006: ("Stink (Top)", SkylandersGame.SWAP_FORCE),
+    2007: ("Grilla (Top)", SkylandersGame.SWAP_FORCE),
+    2008: ("Hoot (Top)", SkylandersGame.SWAP_FORCE),
+    2009: ("Trap (Top)", SkylandersGame.SWAP_FORCE),
+    2010: ("Magna (Top)", SkylandersGame.SWAP_FORCE),
+    2011: ("Spy (Top)", SkylandersGame.SWAP_FORCE),
+    2012: ("Night (Top)", SkylandersGame.SWAP_FORCE),
+    2013: ("Rattle (Top)", SkylandersGame.SWAP_FORCE),
+    2014: ("Freeze (Top)", SkylandersGame.SWAP_FORCE),
+    2015: ("Wash (Top)", SkylandersGame.SWAP_FORCE),
+    
+    # SuperChargers (3400-3428)
+    3400: ("Fiesta", SkylandersGame.SUPERCHARGERS),
+    3401: ("High Volt", SkylandersGame.SUPERCHARGERS),
+    3402: ("Splat", SkylandersGame.SUPERCHARGERS),
+    3406: ("Stormblade", SkylandersGame.SUPERCHARGERS),
+    3411: ("Smash Hit", SkylandersGame.SUPERCHARGERS),
+    3412: ("Spitfire", SkylandersGame.SUPERCHARGERS),
+    3413: ("Hurricane Jet-Vac", SkylandersGame.SUPERCHARGERS),
+    3414: ("Double Dare Trigger Happy", SkylandersGame.SUPERCHARGERS),
+    3415: ("Super Shot Stealth Elf", SkylandersGame.SUPERCHARGERS),
+    3416: ("Shark Shooter Terrafin", SkylandersGame.SUPERCHARGERS),
+    3417: ("Bone Bash Roller Brawl", SkylandersGame.SUPERCHARGERS),
+    3420: ("Big Bubble Pop Fizz", SkylandersGame.SUPERCHARGERS),
+    3421: ("Lava Lance Eruptor", SkylandersGame.SUPERCHARGERS),
+    3422: ("Deep Dive Gill Grunt", SkylandersGame.SUPERCHARGERS),
+    3423: ("Turbo Charge Donkey Kong", SkylandersGame.SUPERCHARGERS),
+    3424: ("Hammer Slam Bowser", SkylandersGame.SUPERCHARGERS),
+    3425: ("Dive-Clops", SkylandersGame.SUPERCHARGERS),
+    3426: ("Astroblast", SkylandersGame.SUPERCHARGERS),
+    3427: ("Nightfall", SkylandersGame.SUPERCHARGERS),
+    3428: ("Thrillipede", SkylandersGame.SUPERCHARGERS),
+}
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Skylanders Duplicate Scanner
+============================
+Détection des copies d'une même figurine physique (même UID dans le
+secteur 0) dans de grandes bibliothèques de dumps.
+
+Une seule passe en flux : pour chaque fichier, l'UID (non chiffré) et un
+hash du contenu sont répartis dans des fichiers temporaires par UID ; chaque
+partition est ensuite regroupée en mémoire. La mémoire reste bornée par la
+taille d'une partition, pas par celle de la bibliothèque. Seules les copies
+divergentes sont déchiffrées, pour comparer leurs stats.
+
+Usage:
+    python skylander_dedup.py bibliotheque/
+    python skylander_dedup.py bibliotheque/ --keep highest-level --move-to doublons/
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from skylander_core import Skylander, SKYLANDER_SIZE, SKY_EXTENSION
+
+
+KEEP_POLICIES = ('newest', 'highest-level')
+STAT_FIELDS = ('character_id', 'variant_id', 'level', 'xp', 'money', 'hero_points')
+
+# Enregistrement d'une partition : UID, empreinte, mtime_ns, périphérique, inode,
+# longueur du chemin, puis le chemin en octets (os.fsencode : noms non UTF-8 et
+# retours à la ligne compris)
+_RECORD = struct.Struct('<4s16sqQQI')
+
+# Nombre de partitions : ~1 500 entrées par partition pour 100k fichiers
+DEFAULT_PARTITIONS = 64
+
+
+class FigureCopy(NamedTuple):
+    path: str
+    digest: str
+    mtime_ns: int
+    stats: Optional[dict]  # Renseigné pour les copies divergentes uniquement
+
+
+class DuplicateGroup(NamedTuple):
+    uid: str
+    kind: str  # 'exact' (contenus identiques) ou 'diverged'
+    copies: List[FigureCopy]
+    keep: str
+    differences: Dict[str, List[int]]  # Champ -> valeurs distinctes (copies divergentes)
+
+    @property
+    def redundant(self) -> List[str]:
+        return [copy.path for copy in self.copies if copy.path != self.keep]
+
+
+class ScanReport(NamedTuple):
+    files: int
+    unreadable: List[str]
+    groups: List[DuplicateGroup]
+
+
+def iter_sky_paths(roots: Sequence[str], follow_symlinks: bool = False) -> Iterator[str]:
+    """Parcourt récursivement les dossiers (et fichiers) donnés.
+
+    Les liens symboliques vers des dossiers ne sont jamais suivis ; ceux vers des
+    fichiers sont ignorés si `follow_symlinks` est faux.
+    """
+    for root in roots:
+        if not os.path.isdir(root):
+            if follow_symlinks or not os.path.islink(root):
+                yield root
+            continue
+        stack = [root]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif (entry.name.lower().endswith(SKY_EXTENSION)
+                          and entry.is_file(follow_symlinks=follow_symlinks)):
+                        yield entry.path
+
+
+def _stats(data: bytes) -> dict:
+    skylander = Skylander(data)
+    skylander.decrypt()
+    summary = skylander.get_summary()
+    return {field: summary[field] for field in STAT_FIELDS}
+
+
+def _choose(copies: List[FigureCopy], keep: str) -> str:
+    if keep == 'highest-level' and all(copy.stats for copy in copies):
+        best = max(copies, key=lambda c: (c.stats['level'], c.stats['xp'], c.mtime_ns))
+    else:
+        best = max(copies, key=lambda c: c.mtime_ns)
+    return best.path
+
+
+def _group(uid: str, rows: List[Tuple[str, int, str]], keep: str) -> DuplicateGroup:
+    """Construit le groupe d'un UID à partir de ses lignes (digest, mtime_ns, chemin)."""
+    digests = {digest for digest, _, _ in rows}
+    if len(digests) == 1:
+        copies = [FigureCopy(path, digest, mtime, None) for digest, mtime, path in rows]
+        return DuplicateGroup(uid, 'exact', copies, _choose(copies, 'newest'), {})
+
+    # Un seul déchiffrement par contenu distinct
+    stats_by_digest: Dict[str, Optional[dict]] = {}
+    copies = []
+    for digest, mtime, path in rows:
+        if digest not in stats_by_digest:
+            try:
+                with open(path, 'rb') as f:
+                    stats_by_digest[digest] = _stats(f.read())
+            except (OSError, ValueError):
+                stats_by_digest[digest] = None
+        copies.append(FigureCopy(path, digest, mtime, stats_by_digest[digest]))
+
+    differences = {}
+    known = [s for s in stats_by_digest.values() if s]
+    for field in STAT_FIELDS:
+        values = sorted({s[field] for s in known})
+        if len(values) > 1:
+            differences[field] = values
+    return DuplicateGroup(uid, 'diverged', copies, _choose(copies, keep), differences)
+
+
+def scan_duplicates(roots: Sequence[str], keep: str = 'newest',
+                    partitions: int = DEFAULT_PARTITIONS, follow_symlinks: bool = False) -> ScanReport:
+    """Passe unique sur les fichiers, puis regroupement partition par partition.
+
+    Les chemins sont canonisés (realpath) et chaque fichier n'est compté qu'une fois
+    (même périphérique et inode, dédoublonnés dans la passe par partition) : racines
+    qui se recouvrent, liens physiques ou liens symboliques ne font jamais passer un
+    fichier pour son propre doublon. Les liens symboliques vers des fichiers, y
+    compris donnés comme racine, sont ignorés, sauf `follow_symlinks`.
+    """
+    if keep not in KEEP_POLICIES:
+        raise ValueError(f"Politique inconnue: {keep}")
+    files = 0
+    unreadable = []
+    groups = []
+    # Le test de lien se fait avant la canonisation, qui le résoudrait
+    roots = [os.path.realpath(root) for root in roots
+             if follow_symlinks or os.path.isdir(root) or not os.path.islink(root)]
+    with tempfile.TemporaryDirectory(prefix='skylander_dedup_') as tmp:
+        buckets = [open(os.path.join(tmp, f'{i:03d}.bin'), 'wb') for i in range(partitions)]
+        try:
+            for path in iter_sky_paths(roots, follow_symlinks):
+                path = os.path.realpath(path)
+                try:
+                    with open(path, 'rb') as f:
+                        stat = os.fstat(f.fileno())
+                        data = f.read(SKYLANDER_SIZE + 1)
+                except OSError:
+                    unreadable.append(path)
+                    continue
+                if len(data) != SKYLANDER_SIZE:
+                    unreadable.append(path)
+                    continue
+                uid = data[:4]
+                digest = hashlib.blake2b(data, digest_size=16).digest()
+                encoded = os.fsencode(path)
+                bucket = buckets[int.from_bytes(uid, 'little') % partitions]
+                bucket.write(_RECORD.pack(uid, digest, stat.st_mtime_ns, stat.st_dev, stat.st_ino,
+                                          len(encoded)) + encoded)
+        finally:
+            for bucket in buckets:
+                bucket.close()
+
+        for i in range(partitions):
+            by_uid: Dict[str, List[Tuple[str, int, str]]] = {}
+            inodes = set()  # Un même fichier a la même UID, donc la même partition
+            with open(os.path.join(tmp, f'{i:03d}.bin'), 'rb') as f:
+                raw = f.read()
+            offset = 0
+            while offset < len(raw):
+                uid, digest, mtime, dev, ino, length = _RECORD.unpack_from(raw, offset)
+                offset += _RECORD.size
+                path = os.fsdecode(raw[offset:offset + length])
+                offset += length
+                if (dev, ino) in inodes:
+                    continue
+                inodes.add((dev, ino))
+                files += 1
+                by_uid.setdefault(uid.hex().upper(), []).append((digest.hex(), mtime, path))
+            for uid in sorted(by_uid):
+                if len(by_uid[uid]) > 1:
+                    groups.append(_group(uid, by_uid[uid], keep))
+    groups.sort(key=lambda g: g.uid)
+    return ScanReport(files, list(dict.fromkeys(unreadable)), groups)
+
+
+def resolve(groups: Sequence[DuplicateGroup], move_to: Optional[str] = None) -> List[str]:
+    """Supprime (ou déplace dans `move_to`) les copies non conservées ; retourne leurs chemins."""
+    removed = []
+    if move_to:
+        os.makedirs(move_to, exist_ok=True)
+    for group in groups:
+        for path in group.redundant:
+            if move_to:
+                target = os.path.join(move_to, f'{group.uid}_{os.path.basename(path)}')
+                base, n = target, 1
+                while os.path.exists(target):
+                    target = f'{os.path.splitext(base)[0]}_{n}{SKY_EXTENSION}'
+                    n += 1
+                shutil.move(path, target)
+            else:
+                os.remove(path)
+            removed.append(path)
+    return removed
+
+
+def format_report(report: ScanReport) -> str:
+    lines = []
+    for group in report.groups:
+        label = "copies identiques" if group.kind == 'exact' else "copies divergentes"
+        lines.append(f"{group.uid}: {len(group.copies)} {label}")
+        for copy in group.copies:
+            mark = '*' if copy.path == group.keep else ' '
+            stats = ''
+            if copy.stats:
+                stats = '  ' + ' '.join(f"{f}={copy.stats[f]}" for f in STAT_FIELDS if f in group.differences)
+            lines.append(f"  {mark} {copy.path}{stats}")
+    exact = sum(1 for g in report.groups if g.kind == 'exact')
+    redundant = sum(len(g.redundant) for g in report.groups)
+    lines.append(f"{report.files} fichiers, {len(report.groups)} UID en double "
+                 f"({exact} identiques, {len(report.groups) - exact} divergents), "
+                 f"{redundant} copie(s) en trop (* = conservée)")
+    if report.unreadable:
+        lines.append(f"{len(report.unreadable)} fichier(s) illisible(s) ou de taille invalide")
+    return '\n'.join(lines)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Détection des doublons de figurines (même UID)")
+    parser.add_argument('roots', nargs='+', help="dossiers (parcourus récursivement) ou fichiers .sky")
+    parser.add_argument('--keep', choices=KEEP_POLICIES, default='newest',
+                        help="copie conservée pour les copies divergentes")
+    parser.add_argument('--move-to', help="déplacer les copies en trop dans ce dossier")
+    parser.add_argument('--delete', action='store_true', help="supprimer les copies en trop")
+    parser.add_argument('--follow-symlinks', action='store_true',
+                        help="suivre les liens symboliques vers des fichiers (ignorés par défaut)")
+    parser.add_argument('--json', action='store_true', help="rapport au format JSON")
+    args = parser.parse_args()
+
+    report = scan_duplicates(args.roots, args.keep, follow_symlinks=args.follow_symlinks)
+    if args.json:
+        print(json.dumps({
+            'files': report.files,
+            'unreadable': report.unreadable,
+            'groups': [dict(g._asdict(), copies=[c._asdict() for c in g.copies], redundant=g.redundant)
+                       for g in report.groups],
+        }, indent=2))
+    else:
+        print(format_report(report))
+
+    if args.move_to or args.delete:
+        removed = resolve(report.groups, args.move_to)
+        action = f"déplacée(s) vers {args.move_to}" if args.move_to else "supprimée(s)"
+        print(f"{len(removed)} copie(s) {action}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Skylanders Diff
+===============
+Comparaison bloc par bloc de dumps .sky.
+
+Les blocs chiffrés identiques ne sont pas déchiffrés : tant que la clé
+(blocs 0-1 du secteur 0) est la même, un bloc chiffré égal donne le même
+bloc déchiffré. Les différences restantes sont rattachées à des champs
+nommés (XP, argent, heroics, CRC, compteurs de séquence...).
+
+Usage:
+    python skylander_diff.py avant.sky apres.sky [encore_apres.sky ...]
+    python skylander_diff.py --dirs ancien_dossier/ nouveau_dossier/
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from skylander_core import (
+    Skylander, SKYLANDER_SIZE, SECTOR_TRAILERS,
+    AREA_HEADER_BLOCKS, AREA_TYPE2_BLOCKS, AREA_TYPE3_BLOCKS,
+    changed_blocks, decrypt_block, is_encrypted_block, list_sky_files, read_sky_file
+)
+
+
+# ============================================================================
+# CARTE DES CHAMPS
+# ============================================================================
+
+# (nom, offset, taille) — les valeurs sont lues en little-endian
+_SECTOR0_FIELDS = [
+    ('uid', 0x00, 4),
+    ('manufacturer', 0x04, 12),
+    ('character_id', 0x10, 2),
+    ('sector0_data', 0x12, 10),
+    ('variant_id', 0x1C, 2),
+    ('crc_sector0', 0x1E, 2),
+]
+
+# Offsets relatifs au bloc header de chaque zone
+_HEADER_FIELDS = [
+    ('xp', 0x00, 3),
+    ('money', 0x03, 2),
+    ('hero_points', 0x05, 1),
+    ('header_data', 0x06, 3),
+    ('sequence', 0x09, 1),
+    ('crc_type3', 0x0A, 2),
+    ('crc_type2', 0x0C, 2),
+    ('crc_header', 0x0E, 2),
+]
+
+
+def _build_field_map() -> List[Tuple[str, int, int]]:
+    field_map: List[Optional[Tuple[str, int, int]]] = [None] * SKYLANDER_SIZE
+    for name, offset, size in _SECTOR0_FIELDS:
+        for i in range(size):
+            field_map[offset + i] = (name, offset, size)
+    for area in (0, 1):
+        base = AREA_HEADER_BLOCKS[area] * 16
+        for name, offset, size in _HEADER_FIELDS:
+            for i in range(size):
+                field_map[base + offset + i] = (f'area{area}.{name}', base + offset, size)
+        for kind, blocks in (('type2', AREA_TYPE2_BLOCKS[area]), ('type3', AREA_TYPE3_BLOCKS[area])):
+            for block in blocks:
+                for i in range(16):
+                    field_map[block * 16 + i] = (f'area{area}.{kind}[0x{block:02X}]', block * 16, 16)
+    for block in range(SKYLANDER_SIZE // 16):
+        name = f'trailer[0x{block:02X}]' if block in SECTOR_TRAILERS else f'block[0x{block:02X}]'
+        for i in range(16):
+            if field_map[block * 16 + i] is None:
+                field_map[block * 16 + i] = (name, block * 16, 16)
+    return field_map
+
+
+# Champ nommé pour chaque octet du dump : (nom, offset de début, taille)
+FIELD_MAP = _build_field_map()
+
+
+# ============================================================================
+# DIFF
+# ============================================================================
+
+class FieldChange(NamedTuple):
+    """Différence sur un champ nommé (valeurs entières pour les champs <= 4 octets)."""
+    field: str
+    offset: int
+    old: Union[int, str]
+    new: Union[int, str]
+
+
+class FigureDiff(NamedTuple):
+    """Résultat de la comparaison de deux dumps."""
+    blocks_changed: List[int]
+    blocks_decrypted: int
+    changes: List[FieldChange]
+
+    @property
+    def identical(self) -> bool:
+        return not self.blocks_changed
+
+    def to_dict(self) -> dict:
+        return {
+            'blocks_changed': [f'0x{b:02X}' for b in self.blocks_changed],
+            'blocks_decrypted': self.blocks_decrypted,
+            'changes': [c._asdict() for c in self.changes],
+        }
+
+
+def _field_value(data: bytes, offset: int, size: int) -> Union[int, str]:
+    raw = data[offset:offset + size]
+    if size <= 4:
+        return int.from_bytes(raw, 'little')
+    return raw.hex().upper()
+
+
+def _plain_blocks(encrypted: bytes, blocks: List[int]) -> Dict[int, bytes]:
+    """Déchiffre uniquement les blocs demandés d'un dump chiffré."""
+    sector0 = encrypted[:0x20]
+    result = {}
+    for block in blocks:
+        chunk = encrypted[block * 16:(block + 1) * 16]
+        result[block] = decrypt_block(chunk, sector0, block) if is_encrypted_block(block) else chunk
+    return result
+
+
+def _as_buffer(figure: Union[bytes, bytearray, Skylander]) -> Tuple[bytes, bool]:
+    """Retourne (octets, déjà_déchiffré)."""
+    if isinstance(figure, Skylander):
+        return bytes(figure.data), figure.decrypted
+    if len(figure) != SKYLANDER_SIZE:
+        raise ValueError(f"Taille invalide: {len(figure)} octets (attendu: {SKYLANDER_SIZE})")
+    return bytes(figure), False
+
+
+def diff_figures(old: Union[bytes, Skylander], new: Union[bytes, Skylander]) -> FigureDiff:
+    """Compare deux figurines (dumps chiffrés ou objets `Skylander`)."""
+    old_data, old_plain = _as_buffer(old)
+    new_data, new_plain = _as_buffer(new)
+    decrypted = 0
+    if old_plain != new_plain:
+        # États mixtes : ramener les deux dumps à leur forme déchiffrée
+        old_data = old_data if old_plain else _decrypt_all(old_data)
+        new_data = new_data if new_plain else _decrypt_all(new_data)
+        old_plain = new_plain = True
+        decrypted = _ENCRYPTED_BLOCKS
+
+    blocks = changed_blocks(old_data, new_data)
+    if old_plain:
+        old_blocks = {b: old_data[b * 16:(b + 1) * 16] for b in blocks}
+        new_blocks = {b: new_data[b * 16:(b + 1) * 16] for b in blocks}
+    else:
+        if any(b < 2 for b in blocks):
+            # Clé différente : un bloc chiffré identique ne garantit plus rien
+            blocks = [b for b in range(SKYLANDER_SIZE // 16)
+                      if b in blocks or is_encrypted_block(b)]
+        old_blocks = _plain_blocks(old_data, blocks)
+        new_blocks = _plain_blocks(new_data, blocks)
+        decrypted = 2 * sum(1 for b in blocks if is_encrypted_block(b))
+
+    changes: List[FieldChange] = []
+    seen = set()
+    for block in blocks:
+        a, b = old_blocks[block], new_blocks[block]
+        if a == b:
+            continue
+        for i in range(16):
+            if a[i] == b[i]:
+                continue
+            name, offset, size = FIELD_MAP[block * 16 + i]
+            if name in seen:
+                continue
+            seen.add(name)
+            old_field = _read_field(old_blocks, offset, size)
+            new_field = _read_field(new_blocks, offset, size)
+            changes.append(FieldChange(name, offset, old_field, new_field))
+
+    real_blocks = [b for b in blocks if old_blocks[b] != new_blocks[b]]
+    return FigureDiff(real_blocks, decrypted, changes)
+
+
+# Blocs déchiffrés par _decrypt_all (un dump complet)
+_ENCRYPTED_BLOCKS = sum(1 for b in range(SKYLANDER_SIZE // 16) if is_encrypted_block(b))
+
+
+def _decrypt_all(encrypted: bytes) -> bytes:
+    skylander = Skylander(encrypted)
+    skylander.decrypt()
+    return bytes(skylander.data)
+
+
+def _read_field(blocks: Dict[int, bytes], offset: int, size: int) -> Union[int, str]:
+    block = offset // 16
+    start = offset - block * 16
+    return _field_value(blocks[block], start, size)
+
+
+def diff_series(figures: List[Union[bytes, Skylander]]) -> List[FigureDiff]:
+    """Compare une suite de versions, chacune avec la précédente."""
+    return [diff_figures(figures[i], figures[i + 1]) for i in range(len(figures) - 1)]
+
+
+class DirectoryDiff(NamedTuple):
+    added: List[str]
+    removed: List[str]
+    unchanged: int
+    modified: Dict[str, FigureDiff]
+
+    def to_dict(self) -> dict:
+        return {
+            'added': self.added,
+            'removed': self.removed,
+            'unchanged': self.unchanged,
+            'modified': {name: d.to_dict() for name, d in self.modified.items()},
+        }
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        data = read_sky_file(path)
+    except OSError:
+        return None
+    return data if len(data) == SKYLANDER_SIZE else None
+
+
+def diff_directories(old_dir: str, new_dir: str) -> DirectoryDiff:
+    """Compare un dossier à un instantané précédent (fichiers appariés par nom).
+
+    Les fichiers identiques octet par octet ne sont pas déchiffrés.
+    """
+    old_files = {os.path.basename(p): p for p in list_sky_files(old_dir)}
+    new_files = {os.path.basename(p): p for p in list_sky_files(new_dir)}
+    added = sorted(set(new_files) - set(old_files))
+    removed = sorted(set(old_files) - set(new_files))
+    unchanged = 0
+    modified: Dict[str, FigureDiff] = {}
+
+    for name in sorted(set(old_files) & set(new_files)):
+        old_data, new_data = _read(old_files[name]), _read(new_files[name])
+        if old_data is None or new_data is None:
+            continue
+        if old_data == new_data:
+            unchanged += 1
+            continue
+        modified[name] = diff_figures(old_data, new_data)
+    return DirectoryDiff(added, removed, unchanged, modified)
+
+
+# ============================================================================
+# AFFICHAGE
+# ============================================================================
+
+def format_diff(diff: FigureDiff, indent: str = '  ') -> str:
+    if diff.identical:
+        return f"{indent}(identiques)"
+    lines = [f"{indent}blocs modifiés: {', '.join(f'0x{b:02X}' for b in diff.blocks_changed)} "
+             f"({diff.blocks_decrypted} blocs déchiffrés)"]
+    for change in diff.changes:
+        if isinstance(change.old, int):
+            lines.append(f"{indent}{change.field:<24} {change.old} → {change.new} ({change.new - change.old:+d})")
+        else:
+            lines.append(f"{indent}{change.field:<24} {change.old}")
+            lines.append(f"{indent}{'':<24} {change.new}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Compare des dumps .sky bloc par bloc")
+    parser.add_argument('paths', nargs='+', help="fichiers .sky (dans l'ordre chronologique)")
+    parser.add_argument('--dirs', action='store_true',
+                        help="comparer deux dossiers (ancien, nouveau)")
+    parser.add_argument('--json', action='store_true', help="sortie JSON")
+    args = parser.parse_args()
+
+    if args.dirs:
+        if len(args.paths) != 2:
+            parser.error("--dirs attend exactement deux dossiers")
+        result = diff_directories(args.paths[0], args.paths[1])
+        if args.json:
+            print(json.dumps(result.to_dict(), indent=2))
+            return 0
+        print(f"{result.unchanged} inchangés, {len(result.modified)} modifiés, "
+              f"{len(result.added)} ajoutés, {len(result.removed)} supprimés")
+        for name in result.added:
+            print(f"+ {name}")
+        for name in result.removed:
+            print(f"- {name}")
+        for name, diff in result.modified.items():
+            print(f"~ {name}")
+            print(format_diff(diff, '    '))
+        return 0
+
+    if len(args.paths) < 2:
+        parser.error("au moins deux fichiers sont nécessaires")
+    figures = []
+    for path in args.paths:
+        data = _read(path)
+        if data is None:
+            print(f"Fichier illisible ou de taille invalide: {path}", file=sys.stderr)
+            return 1
+        figures.append(data)
+
+    diffs = diff_series(figures)
+    if args.json:
+        print(json.dumps([d.to_dict() for d in diffs], indent=2))
+        return 0
+    for i, diff in enumerate(diffs):
+        print(f"{args.paths[i]} → {args.paths[i + 1]}")
+        print(format_diff(diff))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
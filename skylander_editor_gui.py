@@ -21,23 +21,35 @@ Auteur: Éditeur Skylanders
 Version: 3.0
 """
 
+import time
+_STARTUP_T0 = time.perf_counter()  # Référence de --startup-profile, avant les autres imports
+
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, messagebox
 import os
+import sys
 from typing import Optional
 
-# Import de la bibliothèque core
+# Import de la bibliothèque core (crypto, base de données et tables XP sont chargées au premier usage)
 from skylander_core import (
     Skylander, SkylandersGame, 
     MAX_MONEY, MAX_HERO_POINTS,
-    XP_TABLE_LEVEL_10, XP_TABLE_LEVEL_15, XP_TABLE_LEVEL_20
+    PROFILER, enable_profiling, profiling_enabled, lazy_load_timings, write_sky_file
 )
+from skylander_prefetch import FigurePrefetcher
+from skylander_uimonitor import ResponsivenessMonitor, format_stall
+from skylander_viewmodel import SkylanderViewModel
+
+_STARTUP_IMPORTS = time.perf_counter() - _STARTUP_T0
 
 
 class SkylanderEditorApp:
     """Application GUI pour l'édition de Skylanders."""
     
-    def __init__(self, root: tk.Tk):
+    # Gestionnaires chronométrés par le moniteur de réactivité
+    MONITORED_HANDLERS = ('open_file', 'save_file', 'apply_changes', 'max_stats', '_refresh_display')
+    
+    def __init__(self, root: tk.Tk, log_stalls: bool = False):
         self.root = root
         self.root.title("Skylanders .SKY Editor v3.0")
         self.root.geometry("580x580")
@@ -45,9 +57,21 @@ class SkylanderEditorApp:
         
         self.skylander: Optional[Skylander] = None
         self.current_file: Optional[str] = None
+        self.prefetcher = FigurePrefetcher()
+        
+        self.monitor = ResponsivenessMonitor(self.root.after, on_stall=self._log_stall if log_stalls else None)
+        for name in self.MONITORED_HANDLERS:
+            # Avant _setup_menu : menus et boutons reçoivent les versions chronométrées
+            setattr(self, name, self.monitor.timed(name, getattr(self, name)))
+        # Les widgets sont mis à jour en différé (after_idle) : ce travail est chronométré à part
+        self.view_model = SkylanderViewModel(scheduler=self.monitor.scheduler(self.root.after_idle, 'affichage'))
+        self._monitor_window: Optional[tk.Toplevel] = None
         
         self._setup_menu()
         self._setup_ui()
+        self._bind_view_model()
+        # Démarré à la première inactivité : la construction de la fenêtre n'est pas un blocage
+        self.root.after_idle(self.monitor.start)
     
     def _setup_menu(self) -> None:
         """Configure le menu."""
@@ -59,14 +83,23 @@ class SkylanderEditorApp:
         file_menu.add_command(label="Ouvrir .sky...", command=self.open_file, accelerator="Ctrl+O")
         file_menu.add_command(label="Sauvegarder sous...", command=self.save_file, accelerator="Ctrl+S")
         file_menu.add_separator()
+        file_menu.add_command(label="Fichier précédent", command=self.open_previous, accelerator="Pg.Préc")
+        file_menu.add_command(label="Fichier suivant", command=self.open_next, accelerator="Pg.Suiv")
+        file_menu.add_command(label="Statistiques du préchargement", command=self._show_prefetch_stats)
+        file_menu.add_separator()
         file_menu.add_command(label="Quitter", command=self.root.quit, accelerator="Alt+F4")
         
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Aide", menu=help_menu)
+        if profiling_enabled():
+            help_menu.add_command(label="Profilage...", command=self._show_profile)
+        help_menu.add_command(label="Réactivité de l'interface...", command=self._show_monitor)
         help_menu.add_command(label="À propos", command=self._show_about)
         
         self.root.bind('<Control-o>', lambda e: self.open_file())
         self.root.bind('<Control-s>', lambda e: self.save_file())
+        self.root.bind('<Prior>', lambda e: self.open_previous())
+        self.root.bind('<Next>', lambda e: self.open_next())
     
     def _setup_ui(self) -> None:
         """Configure l'interface utilisateur."""
@@ -191,50 +224,66 @@ class SkylanderEditorApp:
         except ValueError:
             pass
     
-    def _refresh_display(self) -> None:
-        """Rafraîchit l'affichage avec les données du Skylander."""
-        if not self.skylander:
-            return
-        
-        name, game = self.skylander.get_character_info()
-        max_level = self.skylander.get_max_level()
-        max_xp = self.skylander.get_max_xp()
+    def _bind_view_model(self) -> None:
+        """Relie chaque widget au champ du view model qui le concerne."""
+        vm = self.view_model
         
         # Info
-        self.char_label.config(text=f"Personnage: {name}")
-        self.game_label.config(text=game.display_name)
-        self.variant_label.config(text=f"0x{self.skylander.get_variant_id():04X}")
-        self.maxlevel_label.config(text=str(max_level))
+        vm.subscribe('name', lambda name: self.char_label.config(text=f"Personnage: {name}"))
+        vm.subscribe('game', lambda game: self.game_label.config(text=game))
+        vm.subscribe('variant', lambda variant: self.variant_label.config(text=f"0x{variant:04X}"))
+        vm.subscribe('max_level', self._on_max_level_changed)
+        vm.subscribe('max_xp', lambda max_xp: self.xp_max_label.config(text=f"(max: {max_xp:,})"))
         
-        # Mettre à jour les labels de max
-        self.xp_max_label.config(text=f"(max: {max_xp:,})")
+        # Stats
+        vm.subscribe('xp', lambda xp: self.xp_var.set(str(xp)))
+        vm.subscribe('level', lambda level: self.level_var.set(str(level)))
+        vm.subscribe('money', lambda money: self.money_var.set(str(money)))
+        vm.subscribe('hero', lambda hero: self.hero_var.set(str(hero)))
         
-        # Mettre à jour la combobox des niveaux
+        vm.subscribe('loaded', self._on_loaded_changed)
+        vm.subscribe('hex', self._render_hex)
+    
+    def _on_max_level_changed(self, max_level: int) -> None:
+        """Met à jour le label et la combobox des niveaux."""
+        self.maxlevel_label.config(text=str(max_level))
         self.level_combo['values'] = [str(i) for i in range(1, max_level + 1)]
-        
-        # Stats
-        self.xp_var.set(str(self.skylander.get_xp()))
-        self.level_var.set(str(self.skylander.get_level()))
-        self.money_var.set(str(self.skylander.get_money()))
-        self.hero_var.set(str(self.skylander.get_hero_points()))
-        
-        # Activer les boutons
-        self.apply_btn.config(state='normal')
-        self.max_btn.config(state='normal')
-        self.reset_btn.config(state='normal')
-        self.save_btn.config(state='normal')
-        
-        # Hex view (premier 256 octets)
+    
+    def _on_loaded_changed(self, loaded: bool) -> None:
+        """Active ou désactive les boutons d'action."""
+        state = 'normal' if loaded else 'disabled'
+        for btn in (self.apply_btn, self.max_btn, self.reset_btn, self.save_btn):
+            btn.config(state=state)
+    
+    def _render_hex(self, data: bytes) -> None:
+        """Redessine la vue hex (premiers 256 octets)."""
         self.hex_text.configure(state='normal')
         self.hex_text.delete(1.0, tk.END)
-        for i in range(0, 256, 16):
-            hex_part = ' '.join(f'{b:02X}' for b in self.skylander.data[i:i+16])
-            ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in self.skylander.data[i:i+16])
+        for i in range(0, len(data), 16):
+            hex_part = ' '.join(f'{b:02X}' for b in data[i:i+16])
+            ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in data[i:i+16])
             self.hex_text.insert(tk.END, f'{i:04X}  {hex_part:<48}  {ascii_part}\n')
         self.hex_text.configure(state='disabled')
     
+    def _refresh_display(self) -> None:
+        """Demande le rafraîchissement de l'affichage.
+        
+        Les widgets concernés sont mis à jour au prochain cycle idle de Tk,
+        une seule fois même si plusieurs modifications ont eu lieu. Les champs
+        éditables sont toujours republiés : ils ont pu être modifiés à la main
+        (saisie non appliquée, XP recalculée par `_on_level_change`).
+        """
+        if not self.skylander:
+            return
+        
+        if self.view_model.skylander is not self.skylander:
+            self.view_model.set_skylander(self.skylander)
+        else:
+            self.view_model.invalidate('xp', 'level', 'money', 'hero')
+    
     def open_file(self) -> None:
         """Ouvre un fichier .sky."""
+        from tkinter import filedialog
         filename = filedialog.askopenfilename(
             title="Ouvrir fichier Skylander",
             filetypes=[("SKY Files", "*.sky"), ("Tous les fichiers", "*.*")]
@@ -242,12 +291,12 @@ class SkylanderEditorApp:
         if not filename:
             return
         
+        self._load_file(filename)
+    
+    def _load_file(self, filename: str) -> None:
+        """Charge un fichier .sky (depuis le cache de préchargement si possible)."""
         try:
-            with open(filename, 'rb') as f:
-                data = f.read()
-            
-            self.skylander = Skylander(data)
-            self.skylander.decrypt()
+            self.skylander = self.prefetcher.get(filename)
             self.current_file = filename
             
             self.file_label.config(text=os.path.basename(filename), foreground="black")
@@ -258,6 +307,40 @@ class SkylanderEditorApp:
             
         except Exception as e:
             messagebox.showerror("Erreur", f"Impossible d'ouvrir le fichier:\n{e}")
+            return
+        
+        # Précharger les voisins pour la navigation précédent/suivant
+        self.prefetcher.schedule(filename)
+    
+    def _open_neighbor(self, step: int) -> None:
+        """Ouvre le fichier voisin dans le dossier courant."""
+        if not self.current_file:
+            return
+        target = self.prefetcher.neighbor(self.current_file, step)
+        if target is None:
+            self.status_var.set("Début du dossier atteint" if step < 0 else "Fin du dossier atteinte")
+            return
+        self._load_file(target)
+    
+    def open_previous(self) -> None:
+        """Ouvre le fichier .sky précédent du dossier."""
+        self._open_neighbor(-1)
+    
+    def open_next(self) -> None:
+        """Ouvre le fichier .sky suivant du dossier."""
+        self._open_neighbor(1)
+    
+    def _show_prefetch_stats(self) -> None:
+        """Affiche les statistiques du cache de préchargement."""
+        stats = self.prefetcher.stats()
+        messagebox.showinfo("Préchargement", (
+            f"Hits: {stats['hits']}\n"
+            f"Misses: {stats['misses']}\n"
+            f"Hit-rate: {stats['hit_rate']:.0%}\n"
+            f"Préchargés: {stats['prefetched']}\n"
+            f"Évictions: {stats['evictions']}\n"
+            f"Cache: {stats['size']}/{stats['capacity']}"
+        ))
     
     def save_file(self) -> None:
         """Sauvegarde le fichier .sky."""
@@ -265,6 +348,7 @@ class SkylanderEditorApp:
             messagebox.showwarning("Attention", "Aucun Skylander chargé!")
             return
         
+        from tkinter import filedialog
         filename = filedialog.asksaveasfilename(
             title="Sauvegarder",
             filetypes=[("SKY Files", "*.sky")],
@@ -278,8 +362,8 @@ class SkylanderEditorApp:
             self.skylander.update_checksums()
             encrypted = self.skylander.encrypt()
             
-            with open(filename, 'wb') as f:
-                f.write(encrypted)
+            write_sky_file(filename, encrypted)
+            self.prefetcher.invalidate(filename)
             
             self.current_file = filename
             self.file_label.config(text=os.path.basename(filename))
@@ -330,6 +414,50 @@ class SkylanderEditorApp:
             self._refresh_display()
             self.status_var.set("↺ Stats réinitialisées à zéro!")
     
+    def _show_profile(self) -> None:
+        """Affiche les compteurs de profilage de skylander_core."""
+        lines = [f"{op:<18} {s['calls']:>8} appels  {s['seconds'] * 1000:>9.1f} ms"
+                 for op, s in PROFILER.snapshot().items()]
+        messagebox.showinfo("Profilage", '\n'.join(lines) or "Aucune mesure pour l'instant.")
+    
+    def _log_stall(self, stall) -> None:
+        """Journalise un blocage de la boucle d'événements (--stall-log)."""
+        print(f"[réactivité] blocage {format_stall(stall)}", file=sys.stderr, flush=True)
+    
+    def _show_monitor(self) -> None:
+        """Ouvre le panneau de réactivité (actualisé chaque seconde tant qu'il est ouvert)."""
+        if self._monitor_window is not None and self._monitor_window.winfo_exists():
+            self._monitor_window.lift()
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Réactivité de l'interface")
+        window.geometry("640x420")
+        self._monitor_window = window
+        
+        text = tk.Text(window, font=('Consolas', 9), state='disabled', bg='#f5f5f5', wrap='none')
+        text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        buttons = ttk.Frame(window)
+        buttons.pack(fill=tk.X, padx=5, pady=(0, 5))
+        
+        def render() -> None:
+            text.configure(state='normal')
+            text.delete(1.0, tk.END)
+            text.insert(tk.END, self.monitor.format_report())
+            text.configure(state='disabled')
+        
+        def refresh() -> None:
+            if window.winfo_exists():
+                render()
+                window.after(1000, refresh)
+        
+        def reset() -> None:
+            self.monitor.reset()
+            render()
+        
+        ttk.Button(buttons, text="Réinitialiser", command=reset).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Fermer", command=window.destroy).pack(side=tk.RIGHT)
+        refresh()
+    
     def _show_about(self) -> None:
         """Affiche la fenêtre À propos."""
         about_text = """Skylanders .SKY File Editor v3.0
@@ -352,9 +480,37 @@ Compatible avec 300+ Skylanders de tous les jeux.
         messagebox.showinfo("À propos", about_text)
 
 
+def _print_startup_profile(marks: list) -> None:
+    """Affiche les temps de démarrage (--startup-profile) sur la sortie standard."""
+    print("Démarrage (depuis le début des imports):")
+    for label, elapsed in marks:
+        print(f"  {label:<24} {elapsed * 1000:>8.1f} ms")
+    if getattr(sys, 'frozen', False):
+        return
+    # Détail par module, mesuré dans un interpréteur neuf (python -X importtime)
+    from skylander_bench import import_timings
+    timings = import_timings('skylander_editor_gui')
+    print("Imports (cumulés, interpréteur à froid):")
+    for name, seconds in timings['imports']:
+        print(f"  {name:<24} {seconds * 1000:>8.1f} ms")
+
+
+def _print_lazy_loads() -> None:
+    for name, elapsed in lazy_load_timings().items():
+        print(f"Chargement différé: {name:<16} {elapsed * 1000:>8.1f} ms")
+
+
 def main():
     """Point d'entrée principal."""
+    # --profile : instrumentation de skylander_core (équivaut à SKYLANDER_PROFILE=1)
+    if '--profile' in sys.argv[1:]:
+        enable_profiling()
+    startup_profile = '--startup-profile' in sys.argv[1:]
+    # --stall-log : chaque blocage de l'interface est signalé sur la sortie d'erreur
+    log_stalls = '--stall-log' in sys.argv[1:]
+    
     root = tk.Tk()
+    tk_ready = time.perf_counter() - _STARTUP_T0
     
     # Icône (si disponible)
     try:
@@ -362,7 +518,21 @@ def main():
     except:
         pass
     
-    app = SkylanderEditorApp(root)
+    app = SkylanderEditorApp(root, log_stalls=log_stalls)
+    
+    if startup_profile:
+        built = time.perf_counter() - _STARTUP_T0
+        
+        def first_idle():
+            shown = time.perf_counter() - _STARTUP_T0
+            _print_startup_profile([("imports", _STARTUP_IMPORTS), ("tk.Tk()", tk_ready),
+                                    ("interface construite", built), ("fenêtre affichée", shown)])
+        
+        root.after_idle(first_idle)
+        # Les chargements différés (crypto, base de données) ont lieu au premier fichier ouvert
+        import atexit
+        atexit.register(_print_lazy_loads)
+    
     root.mainloop()
 
 
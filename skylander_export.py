@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Skylanders Columnar Export
+==========================
+Export des stats d'une collection en colonnes, pour l'analyse (pandas...) :
+CSV, Parquet ou Arrow IPC (Parquet et Arrow nécessitent pyarrow).
+
+Les figurines sont décodées en parallèle (skylander_batch) par paquets de
+taille fixe : la mémoire reste bornée quelle que soit la taille de la
+collection.
+
+Usage:
+    python skylander_export.py figurines/ -o stats.csv
+    python skylander_export.py figurines.skypack -o stats.parquet --chunk-size 8192
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from skylander_core import list_sky_files
+from skylander_archive import iter_archive
+from skylander_batch import SharedMemoryBatch
+
+
+# (nom, type Arrow) ; l'ordre est celui des colonnes exportées
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('source', 'string'),
+    ('uid', 'string'),
+    ('character_id', 'uint16'),
+    ('variant_id', 'uint16'),
+    ('name', 'string'),
+    ('game', 'string'),
+    ('max_level', 'uint8'),
+    ('level', 'uint8'),
+    ('xp', 'uint32'),
+    ('money', 'uint32'),
+    ('hero_points', 'uint16'),
+    ('checksums_valid', 'bool'),
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+
+FORMATS = ('csv', 'parquet', 'arrow')
+DEFAULT_CHUNK_SIZE = 4096
+
+# Batch de colonnes : nom de colonne -> valeurs
+ColumnBatch = Dict[str, list]
+
+
+def _iter_sources(inputs: Sequence[str]) -> Iterator[Tuple[str, object]]:
+    """('path', chemin) pour les fichiers et dossiers, ('data', (nom, contenu)) pour les archives."""
+    for item in inputs:
+        if os.path.isdir(item):
+            for path in list_sky_files(item):
+                yield 'path', path
+        elif item.endswith('.skypack'):
+            for name, data in iter_archive(item):
+                yield 'data', (f'{item}:{name}', data)
+        else:
+            yield 'path', item
+
+
+def _chunks(inputs: Sequence[str], chunk_size: int) -> Iterator[Tuple[str, list]]:
+    """Regroupe les sources consécutives de même nature par paquets de `chunk_size`."""
+    kind, pending = None, []
+    for source_kind, value in _iter_sources(inputs):
+        if pending and (source_kind != kind or len(pending) >= chunk_size):
+            yield kind, pending
+            pending = []
+        kind = source_kind
+        pending.append(value)
+    if pending:
+        yield kind, pending
+
+
+def iter_column_batches(inputs: Sequence[str], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        workers: int = 1, errors: Optional[List[dict]] = None) -> Iterator[ColumnBatch]:
+    """Décode la collection et produit des batches de colonnes d'au plus `chunk_size` lignes."""
+    with SharedMemoryBatch(workers) as engine:
+        for kind, chunk in _chunks(inputs, chunk_size):
+            if kind == 'path':
+                sources = chunk
+                results = engine.run_files(chunk, 'info')
+            else:
+                sources = [name for name, _ in chunk]
+                results, _ = engine.run([data for _, data in chunk], 'info')
+            batch: ColumnBatch = {name: [] for name in COLUMN_NAMES}
+            for source, result in zip(sources, results):
+                if 'error' in result:
+                    if errors is not None:
+                        errors.append({'source': source, 'error': result['error']})
+                    continue
+                result['source'] = source
+                for name in COLUMN_NAMES:
+                    batch[name].append(result[name])
+            if batch['uid']:
+                yield batch
+
+
+# ============================================================================
+# ÉCRITURE
+# ============================================================================
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Les formats Parquet et Arrow nécessitent pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def arrow_schema():
+    """Schéma pyarrow des colonnes exportées."""
+    pa = _require_pyarrow()
+    return pa.schema([(name, pa.type_for_alias(kind)) for name, kind in COLUMNS])
+
+
+def _write_csv(path: str, batches: Iterator[ColumnBatch]) -> int:
+    rows = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMN_NAMES)
+        for batch in batches:
+            writer.writerows(zip(*(batch[name] for name in COLUMN_NAMES)))
+            rows += len(batch['uid'])
+    return rows
+
+
+def _write_arrow(path: str, batches: Iterator[ColumnBatch], fmt: str) -> int:
+    pa = _require_pyarrow()
+    schema = arrow_schema()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        import pyarrow.ipc
+        writer = pa.ipc.new_file(path, schema)
+    rows = 0
+    try:
+        for batch in batches:
+            writer.write_batch(pa.RecordBatch.from_pydict(batch, schema=schema))
+            rows += len(batch['uid'])
+    finally:
+        writer.close()
+    return rows
+
+
+def detect_format(output: str) -> str:
+    extension = os.path.splitext(output)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    if extension in ('.arrow', '.feather', '.ipc'):
+        return 'arrow'
+    return 'csv'
+
+
+def export_collection(inputs: Sequence[str], output: str, fmt: Optional[str] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1,
+                      errors: Optional[List[dict]] = None) -> int:
+    """Exporte les stats des figurines de `inputs` ; retourne le nombre de lignes écrites."""
+    fmt = fmt or detect_format(output)
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu: {fmt}")
+    if fmt != 'csv':
+        _require_pyarrow()  # Échouer avant de décoder toute la collection
+    batches = iter_column_batches(inputs, chunk_size, workers, errors)
+    if fmt == 'csv':
+        return _write_csv(output, batches)
+    return _write_arrow(output, batches, fmt)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Export en colonnes des stats d'une collection .sky")
+    parser.add_argument('inputs', nargs='+', help="fichiers .sky, dossiers ou archives .skypack")
+    parser.add_argument('-o', '--output', required=True, help="fichier .csv, .parquet ou .arrow")
+    parser.add_argument('--format', choices=FORMATS, help="(déduit de --output)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="lignes par batch (borne la mémoire)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    errors: List[dict] = []
+    started = time.perf_counter()
+    try:
+        rows = export_collection(args.inputs, args.output, args.format, args.chunk_size,
+                                 args.workers, errors)
+    except ImportError as e:
+        print(f"✗ {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+    for error in errors:
+        print(f"✗ {error['source']}: {error['error']}")
+    rate = rows / elapsed if elapsed else 0.0
+    print(f"{rows} figurines exportées dans {args.output} en {elapsed:.1f}s ({rate:,.0f}/s)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
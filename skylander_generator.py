@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Skylanders Synthetic Generator
+==============================
+Génération de figurines .sky synthétiques mais valides (checksums corrects,
+chiffrement standard), pour les benchmarks, les tests de charge et le fuzzing.
+
+- déterministe : la figurine n°i ne dépend que de la graine et de i,
+  quel que soit le nombre de processus utilisés
+- tous les personnages de SKYLANDERS_DB (aléatoire ou en cycle)
+- distributions de stats au choix
+- corruption volontaire optionnelle (CRC faux, zones inversées, bits altérés)
+- sortie en fichiers, en tar ou en archive SKYPACK, sur plusieurs cœurs
+
+Usage:
+    python skylander_generator.py --count 100000 --seed 42 -o figurines.skypack
+    python skylander_generator.py --count 500 --characters cycle --corrupt 0.1 -o fuzz/
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import tarfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from skylander_core import (
+    Skylander, SKYLANDER_SIZE, SECTOR_TRAILERS, SKYLANDERS_DB,
+    AREA_HEADER_BLOCKS, MAX_MONEY, MAX_HERO_POINTS,
+    is_encrypted_block
+)
+from skylander_archive import ArchiveWriter
+
+
+# Trailers synthétiques : clé A du secteur 0 pour tous, access bits standard, clé B nulle
+SECTOR0_KEY_A = bytes([0x4B, 0x0B, 0x20, 0x10, 0x7C, 0xCB])
+ACCESS_BITS = bytes([0x0F, 0x0F, 0x0F, 0x69])
+
+CHARACTER_IDS = sorted(SKYLANDERS_DB)
+
+DISTRIBUTIONS = ('uniform', 'zero', 'max', 'fresh', 'endgame')
+CORRUPTIONS = ('bad_crc', 'swapped_areas', 'bit_flip')
+
+# Offsets (relatifs au header) des CRC stockés dans chaque zone
+_HEADER_CRC_OFFSETS = (0x0A, 0x0C, 0x0E)
+
+
+def _blank_plain(uid: bytes, character_id: int, variant_id: int = 0) -> Skylander:
+    data = bytearray(SKYLANDER_SIZE)
+    # Bloc 0 : UID, BCC, SAK, ATQA
+    data[0:4] = uid
+    data[4] = uid[0] ^ uid[1] ^ uid[2] ^ uid[3]
+    data[5] = 0x81
+    data[6:8] = b'\x01\x0F'
+    # Bloc 1 : identifiants du personnage
+    data[0x10:0x12] = character_id.to_bytes(2, 'little')
+    data[0x1C:0x1E] = variant_id.to_bytes(2, 'little')
+    for block in SECTOR_TRAILERS:
+        offset = block * 16
+        data[offset:offset + 6] = SECTOR0_KEY_A
+        data[offset + 6:offset + 10] = ACCESS_BITS
+    # Zone 1 légèrement en retard : la zone 0 est active
+    data[AREA_HEADER_BLOCKS[0] * 16 + 0x09] = 1
+    return Skylander.from_decrypted(bytes(data))
+
+
+def build_plain_figure(uid: bytes, character_id: int, variant_id: int = 0,
+                       xp: int = 0, money: int = 0, hero_points: int = 0) -> Skylander:
+    """Construit un Skylander déchiffré avec checksums à jour."""
+    skylander = _blank_plain(uid, character_id, variant_id)
+    skylander.set_xp(xp)
+    skylander.set_money(money)
+    skylander.set_hero_points(hero_points)
+    skylander.update_checksums()
+    return skylander
+
+
+def _draw(rng: random.Random, maximum: int, distribution: str) -> int:
+    if distribution == 'zero':
+        return 0
+    if distribution == 'max':
+        return maximum
+    if distribution == 'fresh':
+        return int(maximum * rng.random() ** 3)
+    if distribution == 'endgame':
+        return int(maximum * (1.0 - rng.random() ** 3))
+    return rng.randint(0, maximum)
+
+
+def _corrupt(skylander: Skylander, rng: random.Random, kind: str) -> None:
+    """Altère un Skylander déchiffré dont les checksums viennent d'être calculés."""
+    data = skylander.data
+    if kind == 'bad_crc':
+        area = rng.randrange(3)
+        if area == 2:
+            data[0x1E] ^= 1 + rng.randrange(255)
+        else:
+            offset = AREA_HEADER_BLOCKS[area] * 16 + rng.choice(_HEADER_CRC_OFFSETS)
+            data[offset] ^= 1 + rng.randrange(255)
+    elif kind == 'swapped_areas':
+        # La zone 1 porte une version plus ancienne des stats mais devient active
+        hb0, hb1 = (b * 16 for b in AREA_HEADER_BLOCKS)
+        stale_xp = rng.randint(0, skylander.get_xp())
+        data[hb1:hb1 + 3] = stale_xp.to_bytes(3, 'little')
+        data[hb0 + 0x09], data[hb1 + 0x09] = 0, 1
+        skylander.update_checksums()
+    elif kind == 'bit_flip':
+        block = rng.choice([b for b in range(SKYLANDER_SIZE // 16) if is_encrypted_block(b)])
+        data[block * 16 + rng.randrange(16)] ^= 1 << rng.randrange(8)
+
+
+def figure_rng(seed: int, index: int) -> random.Random:
+    """Générateur propre à la figurine n°`index` (indépendant du découpage en lots)."""
+    return random.Random(seed * 0x100000001 + index)
+
+
+def generate_figure(rng: random.Random, character_id: Optional[int] = None,
+                    distribution: str = 'uniform', corruption: Optional[str] = None) -> bytes:
+    """Génère une figurine chiffrée aléatoire, éventuellement corrompue."""
+    if character_id is None:
+        character_id = rng.choice(CHARACTER_IDS)
+    uid = bytes(rng.randrange(256) for _ in range(4))
+    skylander = _blank_plain(uid, character_id)
+    skylander.set_xp(_draw(rng, skylander.get_max_xp(), distribution))
+    skylander.set_money(_draw(rng, MAX_MONEY, distribution))
+    skylander.set_hero_points(_draw(rng, MAX_HERO_POINTS, distribution))
+    skylander.update_checksums()
+    if corruption:
+        _corrupt(skylander, rng, corruption)
+    return skylander.encrypt()
+
+
+def generate_indexed(seed: int, index: int, characters: str = 'random',
+                     distribution: str = 'uniform', corrupt_rate: float = 0.0,
+                     corruptions: Sequence[str] = CORRUPTIONS) -> Tuple[str, bytes]:
+    """Figurine n°`index` d'une génération : retourne (nom de fichier, contenu)."""
+    rng = figure_rng(seed, index)
+    character_id = CHARACTER_IDS[index % len(CHARACTER_IDS)] if characters == 'cycle' else None
+    corruption = None
+    if corrupt_rate and rng.random() < corrupt_rate:
+        corruption = rng.choice(list(corruptions))
+    data = generate_figure(rng, character_id, distribution, corruption)
+    suffix = f'_{corruption}' if corruption else ''
+    return f'{index:07d}_{data[:4].hex().upper()}{suffix}.sky', data
+
+
+def generate_figures(count: int, seed: int = 0) -> List[bytes]:
+    """Génère `count` figurines chiffrées de manière déterministe."""
+    return [generate_indexed(seed, i)[1] for i in range(count)]
+
+
+# ============================================================================
+# GÉNÉRATION EN MASSE
+# ============================================================================
+
+def _generate_chunk(args: tuple) -> List[Tuple[str, bytes]]:
+    start, stop, seed, options, directory = args
+    results = [generate_indexed(seed, i, **options) for i in range(start, stop)]
+    if directory is None:
+        return results
+    # Sortie en fichiers : chaque worker écrit directement sa part
+    for name, data in results:
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(data)
+    return [(name, b'') for name, _ in results]
+
+
+def iter_generated(count: int, seed: int = 0, workers: int = 1, chunk_size: int = 512,
+                   directory: Optional[str] = None, **options) -> Iterator[Tuple[str, bytes]]:
+    """Génère `count` figurines en parallèle, dans l'ordre des index."""
+    tasks = [(start, min(start + chunk_size, count), seed, options, directory)
+             for start in range(0, count, chunk_size)]
+    if workers <= 1:
+        for task in tasks:
+            yield from _generate_chunk(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pool.map(_generate_chunk, tasks):
+            yield from chunk
+
+
+def write_output(output: str, count: int, seed: int = 0, fmt: Optional[str] = None,
+                 workers: int = 1, **options) -> int:
+    """Génère et écrit les figurines dans un dossier, un tar ou une archive SKYPACK."""
+    if fmt is None:
+        if output.endswith(('.tar', '.tar.gz', '.tgz')):
+            fmt = 'tar'
+        elif output.endswith('.skypack'):
+            fmt = 'pack'
+        else:
+            fmt = 'dir'
+
+    if fmt == 'dir':
+        os.makedirs(output, exist_ok=True)
+        return sum(1 for _ in iter_generated(count, seed, workers, directory=output, **options))
+
+    generated = iter_generated(count, seed, workers, **options)
+    if fmt == 'pack':
+        with ArchiveWriter(output) as writer:
+            for name, data in generated:
+                writer.add(name, data)
+        return writer.count
+
+    mode = 'w:gz' if output.endswith(('.gz', '.tgz')) else 'w'
+    written = 0
+    with tarfile.open(output, mode) as tar:
+        for name, data in generated:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 0  # Archive reproductible
+            tar.addfile(info, io.BytesIO(data))
+            written += 1
+    return written
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Génère des figurines .sky synthétiques valides")
+    parser.add_argument('-n', '--count', type=int, required=True)
+    parser.add_argument('-o', '--output', required=True,
+                        help="dossier, fichier .tar/.tar.gz ou archive .skypack")
+    parser.add_argument('--format', choices=('dir', 'tar', 'pack'), help="(déduit de --output)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--characters', choices=('random', 'cycle'), default='random',
+                        help="personnages tirés au hasard ou parcourus en cycle")
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='uniform')
+    parser.add_argument('--corrupt', type=float, default=0.0,
+                        help="proportion de figurines corrompues (0-1)")
+    parser.add_argument('--corruptions', default=','.join(CORRUPTIONS),
+                        help="types de corruption autorisés")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    corruptions = [c for c in args.corruptions.split(',') if c]
+    unknown = set(corruptions) - set(CORRUPTIONS)
+    if unknown:
+        parser.error(f"corruption inconnue: {', '.join(sorted(unknown))}")
+
+    started = time.perf_counter()
+    written = write_output(args.output, args.count, args.seed, args.format, args.workers,
+                           characters=args.characters, distribution=args.distribution,
+                           corrupt_rate=args.corrupt, corruptions=corruptions)
+    elapsed = time.perf_counter() - started
+    rate = written / elapsed if elapsed else 0.0
+    print(f"{written} figurines écrites dans {args.output} en {elapsed:.1f}s ({rate:,.0f}/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Skylanders Load Generator
+=========================
+Générateur de charge local pour skylander_server.py.
+
+Plusieurs clients gardent chacun une connexion keep-alive ouverte et
+enchaînent les requêtes pendant une durée fixe ; le débit soutenu
+(requêtes/s, figurines/s) et les percentiles de latence sont affichés.
+
+Usage:
+    python skylander_loadgen.py --spawn --workers 4 --endpoint max --concurrency 8
+    python skylander_loadgen.py --port 8765 --endpoint batch/info --batch-size 256
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from skylander_bench import percentile
+from skylander_core import SKYLANDER_SIZE, list_sky_files, read_sky_file
+from skylander_generator import generate_figures
+
+
+def load_figures(directory: Optional[str]) -> List[bytes]:
+    if directory:
+        figures = []
+        for path in list_sky_files(directory):
+            data = read_sky_file(path)
+            if len(data) == SKYLANDER_SIZE:
+                figures.append(data)
+        if figures:
+            return figures
+    return generate_figures(16)
+
+
+def _build_body(endpoint: str, figures: List[bytes], batch_size: int, index: int) -> bytes:
+    encoded = [base64.b64encode(f).decode('ascii') for f in figures]
+    if endpoint.startswith('batch/'):
+        items = [{'data': encoded[(index + i) % len(encoded)]} for i in range(batch_size)]
+        return json.dumps({'figures': items}).encode('utf-8')
+    return json.dumps({'data': encoded[index % len(encoded)]}).encode('utf-8')
+
+
+def run_load(host: str, port: int, endpoint: str, figures: List[bytes],
+             concurrency: int = 4, duration: float = 5.0, batch_size: int = 64) -> dict:
+    """Lance la charge et retourne les mesures."""
+    per_request = batch_size if endpoint.startswith('batch/') else 1
+    bodies = [_build_body(endpoint, figures, batch_size, i) for i in range(min(len(figures), 16))]
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    deadline = time.perf_counter() + duration
+
+    def client(slot: int) -> None:
+        conn = http.client.HTTPConnection(host, port, timeout=60)
+        i = slot
+        try:
+            while time.perf_counter() < deadline:
+                body = bodies[i % len(bodies)]
+                i += 1
+                start = time.perf_counter()
+                conn.request('POST', '/' + endpoint, body=body,
+                             headers={'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                response.read()
+                latencies[slot].append(time.perf_counter() - start)
+                if response.status != 200:
+                    errors[slot] += 1
+        except (OSError, http.client.HTTPException):
+            errors[slot] += 1
+        finally:
+            conn.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    merged = sorted(x for slot in latencies for x in slot)
+    requests = len(merged)
+    return {
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'duration_s': elapsed,
+        'requests': requests,
+        'errors': sum(errors),
+        'requests_per_s': requests / elapsed if elapsed else 0.0,
+        'figures_per_s': requests * per_request / elapsed if elapsed else 0.0,
+        'latency_ms': {
+            'p50': percentile(merged, 50) * 1000,
+            'p95': percentile(merged, 95) * 1000,
+            'p99': percentile(merged, 99) * 1000,
+            'max': (merged[-1] * 1000) if merged else 0.0,
+        },
+    }
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Générateur de charge pour skylander_server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--endpoint', default='info',
+                        help="info, verify, edit, max, reset ou batch/<op>")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--figures', help="dossier de .sky à envoyer (défaut: figurines synthétiques)")
+    parser.add_argument('--spawn', action='store_true', help="démarrer un serveur local dédié")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--json', action='store_true', help="sortie JSON")
+    args = parser.parse_args()
+
+    server = None
+    port = args.port
+    if args.spawn:
+        from skylander_server import create_server
+        server = create_server(args.host, 0, workers=args.workers)
+        port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        result = run_load(args.host, port, args.endpoint.strip('/'), load_figures(args.figures),
+                          args.concurrency, args.duration, args.batch_size)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            server.service.shutdown()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        lat = result['latency_ms']
+        print(f"{result['endpoint']}: {result['requests']} requêtes en {result['duration_s']:.1f}s "
+              f"({result['errors']} erreurs)")
+        print(f"  {result['requests_per_s']:.0f} req/s, {result['figures_per_s']:.0f} figurines/s")
+        print(f"  latence p50 {lat['p50']:.2f} ms, p95 {lat['p95']:.2f} ms, "
+              f"p99 {lat['p99']:.2f} ms, max {lat['max']:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Skylanders Virtual Portal
+=========================
+Portail virtuel local : plusieurs figurines servies bloc par bloc sur une
+socket TCP, comme un portail réel lu par un émulateur.
+
+Chaque requête et chaque réponse est une trame fixe de 32 octets :
+
+    requête  : commande, emplacement, bloc, 16 octets de données, remplissage
+    réponse  : commande, statut, emplacement, bloc, 16 octets de données, remplissage
+
+Commandes : 'Q' lecture d'un bloc, 'W' écriture d'un bloc, 'S' état du
+portail (masque des emplacements occupés, 16 bits little-endian). Comme sur
+une vraie figurine, les blocs échangés sont chiffrés ; le serveur garde les
+figurines déchiffrées en mémoire et ne (dé)chiffre que le bloc demandé.
+
+Le client `replay` rejoue une trace enregistrée (ou synthétique) et mesure
+la latence de chaque requête.
+
+Usage:
+    python skylander_portal.py serve figurine1.sky figurine2.sky --record trace.txt
+    python skylander_portal.py replay trace.txt --port 8766
+    python skylander_portal.py replay --spawn --slots 4 --rounds 500
+"""
+
+import argparse
+import json
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, TextIO
+
+from skylander_core import (
+    Skylander, SharedSkylander, SKYLANDER_SIZE, AREA_HEADER_BLOCKS,
+    read_sky_file, write_sky_file
+)
+
+
+FRAME_SIZE = 32
+MAX_SLOTS = 16
+BLOCK_COUNT = SKYLANDER_SIZE // 16
+
+CMD_QUERY = ord('Q')
+CMD_WRITE = ord('W')
+CMD_STATUS = ord('S')
+
+STATUS_OK = 0x00
+STATUS_ERROR = 0x01
+
+
+def make_frame(command: int, slot: int = 0, block: int = 0, data: bytes = b'') -> bytes:
+    """Trame de requête (32 octets)."""
+    return bytes((command, slot, block)) + data.ljust(16, b'\x00') + bytes(FRAME_SIZE - 19)
+
+
+def _response(command: int, status: int, slot: int = 0, block: int = 0, data: bytes = b'') -> bytes:
+    return bytes((command, status, slot, block)) + data.ljust(16, b'\x00') + bytes(FRAME_SIZE - 20)
+
+
+# ============================================================================
+# PORTAIL
+# ============================================================================
+
+class VirtualPortal:
+    """Figurines posées sur le portail ; une SharedSkylander par emplacement."""
+
+    def __init__(self):
+        self.slots: Dict[int, SharedSkylander] = {}
+        self.paths: Dict[int, str] = {}
+        self._dirty: set = set()
+
+    def place(self, slot: int, skylander: Skylander, path: Optional[str] = None) -> None:
+        if not 0 <= slot < MAX_SLOTS:
+            raise ValueError(f"Emplacement invalide: {slot} (0-{MAX_SLOTS - 1})")
+        self.slots[slot] = SharedSkylander(skylander)
+        if path:
+            self.paths[slot] = path
+
+    def place_files(self, paths: Sequence[str]) -> None:
+        """Pose les fichiers sur les premiers emplacements, dans l'ordre."""
+        if len(paths) > MAX_SLOTS:
+            raise ValueError(f"Au plus {MAX_SLOTS} figurines")
+        for slot, path in enumerate(paths):
+            self.place(slot, Skylander(read_sky_file(path)), path)
+
+    def remove(self, slot: int) -> None:
+        self.slots.pop(slot, None)
+        self.paths.pop(slot, None)
+        self._dirty.discard(slot)
+
+    def status_mask(self) -> int:
+        mask = 0
+        for slot in self.slots:
+            mask |= 1 << slot
+        return mask
+
+    def handle(self, frame: bytes) -> bytes:
+        """Traite une trame de requête et retourne la trame de réponse."""
+        command, slot, block = frame[0], frame[1], frame[2]
+        if command == CMD_STATUS:
+            return _response(command, STATUS_OK, data=self.status_mask().to_bytes(2, 'little'))
+        figure = self.slots.get(slot)
+        if figure is None or block >= BLOCK_COUNT or command not in (CMD_QUERY, CMD_WRITE):
+            return _response(command, STATUS_ERROR, slot, block)
+        if command == CMD_QUERY:
+            # Lecture sans verrou sur le dernier état publié
+            return _response(command, STATUS_OK, slot, block, figure.snapshot().read_block(block, encrypted=True))
+        # Le jeu gère lui-même ses checksums : on écrit le bloc tel quel
+        with figure.edit(update_checksums=False) as skylander:
+            skylander.write_block(block, bytes(frame[3:19]), encrypted=True)
+        self._dirty.add(slot)
+        return _response(command, STATUS_OK, slot, block)
+
+    def save(self) -> List[str]:
+        """Réécrit les figurines modifiées par le jeu ; retourne les chemins écrits."""
+        written = []
+        for slot in sorted(self._dirty):
+            path = self.paths.get(slot)
+            if path and slot in self.slots:
+                write_sky_file(path, self.slots[slot].encrypt())
+                written.append(path)
+        self._dirty.clear()
+        return written
+
+
+# ============================================================================
+# SERVEUR
+# ============================================================================
+
+def _recv_exact(sock: socket.socket, buffer: bytearray) -> bool:
+    """Remplit `buffer` ; faux si la connexion est fermée avant."""
+    view = memoryview(buffer)
+    received = 0
+    while received < len(buffer):
+        n = sock.recv_into(view[received:])
+        if not n:
+            return False
+        received += n
+    return True
+
+
+class PortalRequestHandler(socketserver.BaseRequestHandler):
+    """Une connexion = un client (émulateur) ; requêtes traitées dans l'ordre."""
+
+    def handle(self) -> None:
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        portal: VirtualPortal = self.server.portal
+        frame = bytearray(FRAME_SIZE)
+        try:
+            while _recv_exact(sock, frame):
+                self.server.record(frame)
+                sock.sendall(portal.handle(frame))
+        except OSError:
+            pass
+
+
+class PortalServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, portal: VirtualPortal, trace: Optional[TextIO] = None):
+        super().__init__(address, PortalRequestHandler)
+        self.portal = portal
+        self.trace = trace  # Fichier texte recevant les requêtes (format_request), ou None
+        self._trace_lock = threading.Lock()
+
+    def record(self, frame: bytes) -> None:
+        if self.trace is not None:
+            line = format_request(frame)
+            with self._trace_lock:
+                self.trace.write(line + '\n')
+
+
+def create_portal_server(portal: VirtualPortal, host: str = '127.0.0.1', port: int = 8766,
+                         trace: Optional[TextIO] = None) -> PortalServer:
+    """Crée le serveur (port 0 = port libre choisi par le système)."""
+    return PortalServer((host, port), portal, trace)
+
+
+# ============================================================================
+# TRACES ET REJEU
+# ============================================================================
+
+def format_request(frame: bytes) -> str:
+    """Ligne de trace : 'S', 'Q <emplacement> <bloc>' ou 'W <emplacement> <bloc> <hex>'."""
+    command, slot, block = frame[0], frame[1], frame[2]
+    if command == CMD_WRITE:
+        return f"W {slot} {block} {bytes(frame[3:19]).hex()}"
+    if command == CMD_QUERY:
+        return f"Q {slot} {block}"
+    return chr(command)
+
+
+def parse_trace(lines) -> List[bytes]:
+    """Trames de requête d'une trace (lignes vides et commentaires '#' ignorés)."""
+    frames = []
+    for number, line in enumerate(lines, 1):
+        parts = line.split('#', 1)[0].split()
+        if not parts:
+            continue
+        try:
+            if parts[0] == 'S':
+                frames.append(make_frame(CMD_STATUS))
+            elif parts[0] == 'Q':
+                frames.append(make_frame(CMD_QUERY, int(parts[1]), int(parts[2])))
+            elif parts[0] == 'W':
+                frames.append(make_frame(CMD_WRITE, int(parts[1]), int(parts[2]), bytes.fromhex(parts[3])))
+            else:
+                raise ValueError(f"commande inconnue '{parts[0]}'")
+        except (IndexError, ValueError) as e:
+            raise ValueError(f"Trace ligne {number}: {e}")
+    return frames
+
+
+def synthetic_trace(figures: Sequence[bytes], rounds: int = 200) -> List[bytes]:
+    """Trafic type d'un jeu : lecture complète de chaque figurine, puis `rounds` cycles de
+    lecture/réécriture des en-têtes (réécrits à l'identique)."""
+    frames = [make_frame(CMD_STATUS)]
+    for slot in range(len(figures)):
+        frames.extend(make_frame(CMD_QUERY, slot, block) for block in range(BLOCK_COUNT))
+    for _ in range(rounds):
+        frames.append(make_frame(CMD_STATUS))
+        for slot, data in enumerate(figures):
+            for block in AREA_HEADER_BLOCKS:
+                frames.append(make_frame(CMD_QUERY, slot, block))
+            block = AREA_HEADER_BLOCKS[0]
+            frames.append(make_frame(CMD_WRITE, slot, block, data[block * 16:(block + 1) * 16]))
+    return frames
+
+
+def replay(host: str, port: int, frames: Sequence[bytes]) -> dict:
+    """Rejoue les trames une à une sur une connexion et mesure la latence de chacune."""
+    from skylander_bench import percentile
+    latencies: List[float] = []
+    errors = 0
+    response = bytearray(FRAME_SIZE)
+    clock = time.perf_counter
+    with socket.create_connection((host, port), timeout=10) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        started = clock()
+        for frame in frames:
+            t0 = clock()
+            sock.sendall(frame)
+            if not _recv_exact(sock, response):
+                raise ConnectionError("Connexion fermée par le portail")
+            latencies.append(clock() - t0)
+            if response[1] != STATUS_OK:
+                errors += 1
+        elapsed = clock() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_us': {
+            'p50': percentile(latencies, 50) * 1e6,
+            'p95': percentile(latencies, 95) * 1e6,
+            'p99': percentile(latencies, 99) * 1e6,
+            'max': (latencies[-1] * 1e6) if latencies else 0.0,
+        },
+    }
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Portail Skylanders virtuel (socket locale)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_p = sub.add_parser('serve', help="servir des figurines")
+    serve_p.add_argument('figures', nargs='+', help=f"fichiers .sky (au plus {MAX_SLOTS})")
+    serve_p.add_argument('--host', default='127.0.0.1')
+    serve_p.add_argument('--port', type=int, default=8766)
+    serve_p.add_argument('--record', help="enregistrer les requêtes reçues dans ce fichier trace")
+    serve_p.add_argument('--save', action='store_true',
+                         help="réécrire à l'arrêt les figurines modifiées par le jeu")
+
+    replay_p = sub.add_parser('replay', help="rejouer une trace et mesurer la latence")
+    replay_p.add_argument('trace', nargs='?', help="fichier trace (défaut: trafic synthétique)")
+    replay_p.add_argument('--host', default='127.0.0.1')
+    replay_p.add_argument('--port', type=int, default=8766)
+    replay_p.add_argument('--spawn', action='store_true', help="démarrer un portail local dédié")
+    replay_p.add_argument('--slots', type=int, default=4, help="figurines du portail démarré (--spawn)")
+    replay_p.add_argument('--rounds', type=int, default=200, help="cycles du trafic synthétique")
+    replay_p.add_argument('--json', action='store_true', help="sortie JSON")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        portal = VirtualPortal()
+        try:
+            portal.place_files(args.figures)
+        except (OSError, ValueError) as e:
+            print(f"✗ {e}")
+            return 1
+        try:
+            server = create_portal_server(portal, args.host, args.port)
+        except OSError as e:
+            print(f"✗ {e}")
+            return 1
+        trace = server.trace = open(args.record, 'w', encoding='utf-8') if args.record else None
+        print(f"Portail virtuel sur {args.host}:{server.server_address[1]} "
+              f"({len(portal.slots)} figurine(s))")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if trace is not None:
+                trace.close()
+            if args.save:
+                for path in portal.save():
+                    print(f"✓ {path}")
+        return 0
+
+    server = None
+    port = args.port
+    figures: List[bytes] = []
+    if args.spawn:
+        from skylander_generator import generate_figures
+        figures = generate_figures(min(args.slots, MAX_SLOTS), seed=44)
+        portal = VirtualPortal()
+        for slot, data in enumerate(figures):
+            portal.place(slot, Skylander(data))
+        server = create_portal_server(portal, args.host, 0)
+        port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        if args.trace:
+            with open(args.trace, 'r', encoding='utf-8') as f:
+                frames = parse_trace(f)
+        else:
+            if not figures:
+                parser.error("trace requise sans --spawn")
+            frames = synthetic_trace(figures, args.rounds)
+        result = replay(args.host, port, frames)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        lat = result['latency_us']
+        print(f"{result['requests']} requêtes ({result['errors']} erreurs), "
+              f"{result['requests_per_s']:,.0f} req/s")
+        print(f"  latence p50 {lat['p50']:.0f} µs, p95 {lat['p95']:.0f} µs, "
+              f"p99 {lat['p99']:.0f} µs, max {lat['max']:.0f} µs")
+    return 1 if result['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Skylanders Prefetcher
+=====================
+Préchargement en arrière-plan des fichiers .sky voisins du fichier courant.
+
+Quand on parcourt un dossier fichier par fichier, le fichier précédent et
+le suivant sont lus et déchiffrés à l'avance dans un petit cache borné :
+l'ouverture au clavier devient alors immédiate.
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from skylander_core import Skylander, load_skylander, list_sky_files
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """Signature (mtime_ns, taille) utilisée pour invalider le cache."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FigurePrefetcher:
+    """Cache LRU borné alimenté par un thread de préchargement des voisins."""
+
+    def __init__(self, capacity: int = 8, depth: int = 1):
+        if capacity < 1:
+            raise ValueError("La capacité du cache doit être >= 1")
+        self.capacity = capacity
+        self.depth = max(1, depth)
+
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, int], Skylander]]" = OrderedDict()
+        self._listings: Dict[str, Tuple[int, List[str]]] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.evictions = 0
+        self.errors = 0
+
+    # ------------------------------------------------------------------
+    # Navigation
+    # ------------------------------------------------------------------
+
+    def _directory_listing(self, directory: str) -> List[str]:
+        """Liste des .sky du dossier, mise en cache tant que le dossier ne change pas."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return []
+        with self._lock:
+            cached = self._listings.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        files = list_sky_files(directory)
+        with self._lock:
+            self._listings[directory] = (mtime, files)
+        return files
+
+    def neighbor(self, path: str, step: int) -> Optional[str]:
+        """Retourne le fichier situé à `step` positions de `path` dans son dossier."""
+        path = os.path.abspath(path)
+        files = self._directory_listing(os.path.dirname(path))
+        if path in files:
+            target = files.index(path) + step
+        else:
+            # Fichier absent de la liste (extension différente) : position d'insertion
+            name = os.path.basename(path).casefold()
+            insert_at = sum(1 for p in files if os.path.basename(p).casefold() < name)
+            target = insert_at + step - 1 if step > 0 else insert_at + step
+        if 0 <= target < len(files):
+            return files[target]
+        return None
+
+    def neighbors(self, path: str) -> List[str]:
+        """Fichiers prédits (suivants puis précédents) jusqu'à la profondeur configurée."""
+        result = []
+        for distance in range(1, self.depth + 1):
+            for step in (distance, -distance):
+                candidate = self.neighbor(path, step)
+                if candidate and candidate not in result:
+                    result.append(candidate)
+        return result
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _lookup(self, path: str) -> Optional[Skylander]:
+        signature = _file_signature(path)
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is None:
+                return None
+            if entry[0] != signature:
+                del self._cache[path]
+                return None
+            self._cache.move_to_end(path)
+            return entry[1]
+
+    def _store(self, path: str, signature: Tuple[int, int], skylander: Skylander) -> None:
+        with self._lock:
+            self._cache[path] = (signature, skylander)
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+    def _load(self, path: str) -> Skylander:
+        signature = _file_signature(path)
+        skylander = load_skylander(path)
+        if signature is not None:
+            self._store(path, signature, skylander)
+        return skylander
+
+    def get(self, path: str) -> Skylander:
+        """Retourne une copie déchiffrée du fichier, depuis le cache si possible."""
+        path = os.path.abspath(path)
+        cached = self._lookup(path)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached.copy()
+        with self._lock:
+            self.misses += 1
+        return self._load(path).copy()
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Oublie un fichier (ou tout le cache), par exemple après une sauvegarde."""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+                self._listings.clear()
+            else:
+                path = os.path.abspath(path)
+                self._cache.pop(path, None)
+                self._listings.pop(os.path.dirname(path), None)
+
+    # ------------------------------------------------------------------
+    # Thread de préchargement
+    # ------------------------------------------------------------------
+
+    def schedule(self, path: str) -> None:
+        """Demande le préchargement des voisins de `path` (non bloquant)."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="sky-prefetch", daemon=True)
+            self._worker.start()
+        self._queue.put(os.path.abspath(path))
+
+    def _run(self) -> None:
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+            # Seule la dernière demande compte : on saute les positions dépassées
+            while not self._queue.empty():
+                newer = self._queue.get_nowait()
+                if newer is None:
+                    return
+                path = newer
+            for candidate in self.neighbors(path):
+                if self._lookup(candidate) is not None:
+                    continue
+                try:
+                    self._load(candidate)
+                except (OSError, ValueError):
+                    with self._lock:
+                        self.errors += 1
+                    continue
+                with self._lock:
+                    self.prefetched += 1
+
+    def close(self) -> None:
+        """Arrête le thread de préchargement."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join(timeout=1.0)
+        self._worker = None
+
+    # ------------------------------------------------------------------
+    # Statistiques
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Statistiques de hit-rate et d'occupation du cache."""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / requests) if requests else 0.0,
+                'prefetched': self.prefetched,
+                'evictions': self.evictions,
+                'errors': self.errors,
+                'size': len(self._cache),
+                'capacity': self.capacity,
+            }
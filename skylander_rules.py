@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Skylanders Rules Engine
+=======================
+Modifications en masse décrites par des règles (YAML ou JSON) :
+
+    rules:
+      - name: ssa-max
+        when: {game: "Spyro's Adventure"}
+        set: {level: max}
+      - name: giants-cap
+        when: {game: Giants, level: {gt: 12}}
+        set: {level: 12}
+      - name: money-floor
+        set: {money: {min: 10000}}
+
+Conditions (`when`, toutes requises) : game, character_id, variant_id,
+level, xp, money, hero_points. Une valeur simple teste l'égalité, une liste
+l'appartenance, un objet des comparaisons (eq, ne, lt, le, gt, ge, in, not_in).
+
+Actions (`set`, dans l'ordre) : xp, level, money, hero_points avec une
+valeur, `max`, ou un objet {min: n} (au moins), {max: n} (au plus), {add: n}.
+
+Les règles s'appliquent dans l'ordre, chacune voyant l'effet des
+précédentes. Elles sont compilées une fois par processus et appliquées en
+parallèle (skylander_batch).
+
+Usage:
+    python skylander_rules.py regles.yaml figurines/ --dry-run
+    python skylander_rules.py regles.json figurines/ --workers 4
+"""
+
+import argparse
+import json
+import operator
+import os
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from skylander_core import Skylander, SkylandersGame, MAX_MONEY, MAX_HERO_POINTS, list_sky_files
+from skylander_batch import SharedMemoryBatch
+
+
+FACTS = ('game', 'character_id', 'variant_id', 'level', 'xp', 'money', 'hero_points')
+ACTION_FIELDS = ('xp', 'level', 'money', 'hero_points')
+
+_COMPARISONS = {
+    'eq': operator.eq, 'ne': operator.ne,
+    'lt': operator.lt, 'le': operator.le, 'gt': operator.gt, 'ge': operator.ge,
+    'in': lambda value, allowed: value in allowed,
+    'not_in': lambda value, allowed: value not in allowed,
+}
+
+CHUNK_SIZE = 4096
+
+
+class RuleError(ValueError):
+    """Règle invalide (champ, opérateur ou valeur inconnus)."""
+
+
+class CompiledRule(NamedTuple):
+    name: str
+    matches: Callable[[dict], bool]
+    actions: Tuple[Tuple[str, Callable[[Skylander, int], int]], ...]
+
+
+# ============================================================================
+# COMPILATION
+# ============================================================================
+
+def _resolve_game(value, rule: str) -> SkylandersGame:
+    key = str(value).casefold()
+    for game in SkylandersGame:
+        if key in (game.name.casefold(), game.display_name.casefold()):
+            return game
+    raise RuleError(f"Règle '{rule}': jeu inconnu '{value}'")
+
+
+_ORDERED_COMPARISONS = ('lt', 'le', 'gt', 'ge')
+
+
+def _compile_condition(fact: str, spec, rule: str) -> Callable[[dict], bool]:
+    def convert(value):
+        if fact == 'game':
+            return _resolve_game(value, rule)
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise RuleError(f"Règle '{rule}': valeur invalide pour {fact}")
+        return int(value)
+
+    if isinstance(spec, dict):
+        tests = []
+        for op_name, expected in spec.items():
+            if op_name not in _COMPARISONS:
+                raise RuleError(f"Règle '{rule}': opérateur inconnu '{op_name}' pour {fact}")
+            if op_name in _ORDERED_COMPARISONS and fact == 'game':
+                raise RuleError(f"Règle '{rule}': opérateur '{op_name}' impossible pour {fact} (non ordonné)")
+            if op_name in ('in', 'not_in'):
+                if not isinstance(expected, list):
+                    raise RuleError(f"Règle '{rule}': liste attendue pour '{op_name}' ({fact})")
+                expected = frozenset(convert(v) for v in expected)
+            else:
+                expected = convert(expected)
+            tests.append((_COMPARISONS[op_name], expected))
+    elif isinstance(spec, list):
+        tests = [(_COMPARISONS['in'], frozenset(convert(v) for v in spec))]
+    else:
+        tests = [(operator.eq, convert(spec))]
+    return lambda facts: all(test(facts[fact], expected) for test, expected in tests)
+
+
+def _maximum(field: str, skylander: Skylander) -> int:
+    if field == 'xp':
+        return skylander.get_max_xp()
+    if field == 'level':
+        return skylander.get_max_level()
+    return MAX_MONEY if field == 'money' else MAX_HERO_POINTS
+
+
+def _compile_action(field: str, spec, rule: str) -> Callable[[Skylander, int], int]:
+    """Retourne f(skylander, valeur actuelle) -> nouvelle valeur."""
+    if spec == 'max':
+        return lambda skylander, _current: _maximum(field, skylander)
+    if isinstance(spec, dict):
+        if len(spec) != 1:
+            raise RuleError(f"Règle '{rule}': une seule opération par champ ({field})")
+        (op_name, amount), = spec.items()
+        amount = int(amount)
+        if op_name == 'min':
+            return lambda _skylander, current: max(current, amount)
+        if op_name == 'max':
+            return lambda _skylander, current: min(current, amount)
+        if op_name == 'add':
+            return lambda _skylander, current: current + amount
+        raise RuleError(f"Règle '{rule}': opération inconnue '{op_name}' pour {field}")
+    if isinstance(spec, bool) or not isinstance(spec, (int, str)):
+        raise RuleError(f"Règle '{rule}': valeur invalide pour {field}")
+    value = int(spec)
+    return lambda _skylander, _current: value
+
+
+def compile_rules(spec) -> List[CompiledRule]:
+    """Valide et compile une définition de règles (dict avec 'rules', ou liste de règles)."""
+    rules = spec.get('rules') if isinstance(spec, dict) else spec
+    if not isinstance(rules, list):
+        raise RuleError("Liste 'rules' attendue")
+    compiled = []
+    for index, rule in enumerate(rules):
+        if not isinstance(rule, dict):
+            raise RuleError(f"Règle n°{index + 1}: objet attendu")
+        name = str(rule.get('name') or f'regle-{index + 1}')
+        unknown = set(rule) - {'name', 'when', 'set'}
+        if unknown:
+            raise RuleError(f"Règle '{name}': clés inconnues {sorted(unknown)}")
+        when = rule.get('when') or {}
+        actions = rule.get('set') or {}
+        if not actions:
+            raise RuleError(f"Règle '{name}': aucune action ('set')")
+        for fact in when:
+            if fact not in FACTS:
+                raise RuleError(f"Règle '{name}': condition inconnue '{fact}'")
+        for field in actions:
+            if field not in ACTION_FIELDS:
+                raise RuleError(f"Règle '{name}': champ inconnu '{field}'")
+        conditions = [_compile_condition(fact, value, name) for fact, value in when.items()]
+        compiled.append(CompiledRule(
+            name,
+            lambda facts, conditions=conditions: all(c(facts) for c in conditions),
+            tuple((field, _compile_action(field, value, name)) for field, value in actions.items()),
+        ))
+    return compiled
+
+
+def load_rules(path: str):
+    """Lit un fichier de règles .json, .yaml ou .yml."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise RuleError("Les règles YAML nécessitent PyYAML (pip install pyyaml)")
+            try:
+                return yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise RuleError(f"YAML invalide: {e}")
+        return json.load(f)
+
+
+# ============================================================================
+# APPLICATION
+# ============================================================================
+
+_GETTERS = {
+    'xp': Skylander.get_xp, 'level': Skylander.get_level,
+    'money': Skylander.get_money, 'hero_points': Skylander.get_hero_points,
+}
+_SETTERS = {
+    'xp': Skylander.set_xp, 'level': Skylander.set_level,
+    'money': Skylander.set_money, 'hero_points': Skylander.set_hero_points,
+}
+
+# Cache par processus : les règles ne sont compilées qu'une fois par worker
+_compiled_cache: Dict[str, List[CompiledRule]] = {}
+
+
+def _facts(skylander: Skylander) -> dict:
+    return {
+        'game': skylander.get_game(),
+        'character_id': skylander.get_character_id(),
+        'variant_id': skylander.get_variant_id(),
+        'level': skylander.get_level(),
+        'xp': skylander.get_xp(),
+        'money': skylander.get_money(),
+        'hero_points': skylander.get_hero_points(),
+    }
+
+
+def apply_compiled(skylander: Skylander, rules: Sequence[CompiledRule]) -> dict:
+    """Applique les règles à un Skylander déchiffré ; retourne les règles appliquées et les changements."""
+    before = _facts(skylander)
+    facts = dict(before)
+    applied = []
+    for rule in rules:
+        if not rule.matches(facts):
+            continue
+        changed = False
+        for field, action in rule.actions:
+            current = _GETTERS[field](skylander)
+            target = action(skylander, current)
+            if target != current:
+                _SETTERS[field](skylander, target)
+                changed = changed or _GETTERS[field](skylander) != current
+        if changed:
+            applied.append(rule.name)
+            facts = _facts(skylander)
+    changes = {field: [before[field], facts[field]] for field in ACTION_FIELDS
+               if before[field] != facts[field]}
+    return {'uid': skylander.get_uid(), 'rules': applied, 'changes': changes,
+            'modified': bool(changes)}
+
+
+def apply_rules(skylander: Skylander, params: dict) -> dict:
+    """FigureHandler pour skylander_batch : `params['rules']` est la définition (non compilée)."""
+    key = json.dumps(params['rules'], sort_keys=True)
+    rules = _compiled_cache.get(key)
+    if rules is None:
+        rules = _compiled_cache[key] = compile_rules(params['rules'])
+    return apply_compiled(skylander, rules)
+
+
+class RulesReport(NamedTuple):
+    figures: int
+    modified: int
+    rule_counts: Dict[str, int]
+    results: List[dict]
+    errors: List[dict]
+
+
+def run_rules(spec, inputs: Sequence[str], workers: int = 1, dry_run: bool = False,
+              chunk_size: int = CHUNK_SIZE) -> RulesReport:
+    """Applique les règles à des fichiers/dossiers ; en dry-run, rien n'est écrit."""
+    rules = compile_rules(spec)  # Valide avant de lancer les workers
+    paths = []
+    for item in inputs:
+        paths.extend(list_sky_files(item) if os.path.isdir(item) else [item])
+
+    counts = {rule.name: 0 for rule in rules}
+    results, errors = [], []
+    with SharedMemoryBatch(workers) as engine:
+        for start in range(0, len(paths), chunk_size):
+            chunk = paths[start:start + chunk_size]
+            for result in engine.run_files(chunk, apply_rules, {'rules': spec}, write=not dry_run):
+                if 'error' in result:
+                    errors.append(result)
+                    continue
+                for name in result['rules']:
+                    counts[name] += 1
+                if result['modified']:
+                    results.append(result)
+    return RulesReport(len(paths), len(results), counts, results, errors)
+
+
+def format_report(report: RulesReport, dry_run: bool = False) -> str:
+    lines = []
+    for result in report.results:
+        changes = ', '.join(f"{field} {old} → {new}" for field, (old, new) in result['changes'].items())
+        lines.append(f"{os.path.basename(result['path'])}: {changes}  [{', '.join(result['rules'])}]")
+    for error in report.errors:
+        lines.append(f"✗ {os.path.basename(error['path'])}: {error['error']}")
+    if lines:
+        lines.append('')
+    for name, count in report.rule_counts.items():
+        lines.append(f"  {name:<24} {count:>8} figurine(s)")
+    verb = "seraient modifiées" if dry_run else "modifiées"
+    lines.append(f"{report.modified}/{report.figures} figurines {verb}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Applique des règles de modification à une collection .sky")
+    parser.add_argument('rules', help="fichier de règles .yaml/.yml ou .json")
+    parser.add_argument('inputs', nargs='+', help="fichiers .sky ou dossiers")
+    parser.add_argument('--dry-run', action='store_true', help="afficher les changements sans écrire")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--json', action='store_true', help="rapport au format JSON")
+    args = parser.parse_args()
+
+    try:
+        spec = load_rules(args.rules)
+        started = time.perf_counter()
+        report = run_rules(spec, args.inputs, args.workers, args.dry_run)
+    except (RuleError, OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 2
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(report._asdict(), indent=2))
+    else:
+        print(format_report(report, args.dry_run))
+        print(f"({elapsed:.2f}s)")
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Skylanders HTTP Service
+=======================
+Petit serveur HTTP/JSON local exposant skylander_core à d'autres outils.
+
+Endpoints (POST, corps JSON) :
+- /info, /verify            : informations / vérification des checksums
+- /edit, /max, /reset       : modification des stats (retourne le .sky chiffré)
+- /batch/<op>               : même opération sur une liste de figurines
+- GET /metrics, /metrics.json : compteurs de profilage (avec --profile)
+
+Une figurine est passée soit par son contenu chiffré (`{"data": "<base64>"}`),
+soit par un chemin (`{"path": "..."}`) relatif au dossier `--root` (les
+chemins sont refusés si aucun dossier racine n'est configuré).
+
+Les connexions sont persistantes (HTTP/1.1 keep-alive) et le travail
+cryptographique est exécuté dans un pool de workers borné.
+
+Usage:
+    python skylander_server.py --port 8765 --workers 4 --root ./figures
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+from skylander_core import (
+    Skylander, SKYLANDER_SIZE, PROFILER,
+    enable_profiling, profiling_enabled, read_sky_file, write_sky_file
+)
+from skylander_batch import OPERATIONS, is_mutating, process_figure
+
+
+MAX_BODY_SIZE = 64 * 1024 * 1024
+BATCH_CHUNK_SIZE = 64
+
+
+class RequestError(Exception):
+    """Erreur client (retournée en JSON avec le code HTTP associé)."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================================================================
+# OPÉRATIONS (exécutées dans les workers)
+# ============================================================================
+
+def run_operation(op: str, source: Tuple[str, object], params: dict, write: bool) -> dict:
+    """Exécute une opération sur une figurine (`('data', bytes)` ou `('path', str)`)."""
+    kind, value = source
+    if kind == 'path':
+        data = read_sky_file(value)
+    else:
+        data = value
+
+    skylander = Skylander(data)
+    result = process_figure(skylander, op, params)
+    if not is_mutating(op):
+        return result
+
+    encrypted = bytes(skylander.data)
+    if write and kind == 'path':
+        write_sky_file(value, encrypted)
+        result['written'] = value
+    else:
+        result['data'] = base64.b64encode(encrypted).decode('ascii')
+    return result
+
+
+def run_chunk(op: str, sources: List[Tuple[str, object]], params: dict, write: bool) -> List[dict]:
+    """Traite un lot de figurines ; les erreurs sont reportées par figurine."""
+    results = []
+    for source in sources:
+        try:
+            results.append(run_operation(op, source, params, write))
+        except (OSError, ValueError, TypeError) as e:
+            results.append({'error': str(e)})
+    return results
+
+
+def run_profiled(fn, *args):
+    """Exécute `fn` dans un worker et renvoie aussi ses compteurs de profilage."""
+    result = fn(*args)
+    return result, (PROFILER.drain() if profiling_enabled() else None)
+
+
+# ============================================================================
+# SERVEUR
+# ============================================================================
+
+class SkylanderService:
+    """État partagé du serveur : pool de workers borné et dossier racine."""
+
+    def __init__(self, workers: int = 4, root: Optional[str] = None,
+                 use_threads: bool = False, queue_depth: Optional[int] = None,
+                 profile: bool = False):
+        self.workers = max(1, workers)
+        self.root = os.path.realpath(root) if root else None
+        if profile:
+            enable_profiling()
+        # Les workers processus ont leurs propres compteurs, rapatriés à chaque tâche
+        self._remote = not use_threads
+        if use_threads:
+            self.executor: Executor = ThreadPoolExecutor(max_workers=self.workers)
+        else:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=enable_profiling if profiling_enabled() else None)
+        # Nombre de tâches en vol borné : au-delà, les requêtes attendent
+        self._slots = threading.BoundedSemaphore(queue_depth or self.workers * 2)
+
+    def resolve_source(self, figure: dict) -> Tuple[str, object]:
+        if not isinstance(figure, dict):
+            raise RequestError("Figurine attendue sous forme d'objet JSON")
+        if 'data' in figure:
+            try:
+                data = base64.b64decode(figure['data'], validate=True)
+            except (ValueError, TypeError):
+                raise RequestError("Champ 'data' invalide (base64 attendu)")
+            if len(data) != SKYLANDER_SIZE:
+                raise RequestError(f"Taille invalide: {len(data)} octets (attendu: {SKYLANDER_SIZE})")
+            return ('data', data)
+        if 'path' in figure:
+            if self.root is None:
+                raise RequestError("Chemins désactivés (aucun --root configuré)", 403)
+            path = os.path.realpath(os.path.join(self.root, str(figure['path'])))
+            if os.path.commonpath([self.root, path]) != self.root:
+                raise RequestError("Chemin hors du dossier racine", 403)
+            if not os.path.isfile(path):
+                raise RequestError(f"Fichier introuvable: {figure['path']}", 404)
+            return ('path', path)
+        raise RequestError("Champ 'data' ou 'path' requis")
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(timeout=30):
+            raise RequestError("Serveur saturé, réessayez plus tard", 503)
+        try:
+            if self._remote:
+                future = self.executor.submit(run_profiled, fn, *args)
+            else:
+                future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def result(self, future):
+        if not self._remote:
+            return future.result()
+        result, profile = future.result()
+        if profile:
+            PROFILER.merge(profile)
+        return result
+
+    def handle(self, path: str, body: dict) -> dict:
+        parts = [p for p in path.split('/') if p]
+        params = body.get('params') or {}
+        if not isinstance(params, dict):
+            raise RequestError("Champ 'params' invalide")
+        for name, value in params.items():
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise RequestError(f"Paramètre '{name}' invalide (entier attendu)")
+        write = bool(body.get('write', False))
+
+        if len(parts) == 1 and parts[0] in OPERATIONS:
+            source = self.resolve_source(body)
+            return self.result(self.submit(run_operation, parts[0], source, params, write))
+
+        if len(parts) == 2 and parts[0] == 'batch' and parts[1] in OPERATIONS:
+            figures = body.get('figures')
+            if not isinstance(figures, list):
+                raise RequestError("Champ 'figures' (liste) requis")
+            sources = [self.resolve_source(f) for f in figures]
+            futures = [self.submit(run_chunk, parts[1], sources[i:i + BATCH_CHUNK_SIZE], params, write)
+                       for i in range(0, len(sources), BATCH_CHUNK_SIZE)]
+            results = []
+            for future in futures:
+                results.extend(self.result(future))
+            return {'count': len(results), 'results': results}
+
+        raise RequestError(f"Endpoint inconnu: {path}", 404)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+class SkylanderRequestHandler(BaseHTTPRequestHandler):
+    """Handler HTTP/1.1 (keep-alive) pour les requêtes JSON."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'SkylanderService/3.0'
+    verbose = False
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        self._send(status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+    def do_GET(self) -> None:
+        path = self.path.rstrip('/')
+        if path in ('', '/health'):
+            service = self.server.service
+            self._send_json(200, {'status': 'ok', 'workers': service.workers,
+                                  'operations': list(OPERATIONS),
+                                  'profiling': profiling_enabled()})
+        elif path == '/metrics':
+            self._send(200, PROFILER.to_prometheus().encode('utf-8'), 'text/plain; version=0.0.4')
+        elif path == '/metrics.json':
+            self._send(200, PROFILER.to_json().encode('utf-8'), 'application/json')
+        else:
+            self._send_json(404, {'error': f"Endpoint inconnu: {self.path}"})
+
+    def do_POST(self) -> None:
+        try:
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                raise RequestError("En-tête Content-Length invalide")
+            if length > MAX_BODY_SIZE:
+                self.close_connection = True
+                raise RequestError("Requête trop volumineuse", 413)
+            raw = self.rfile.read(length) if length else b'{}'
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                raise RequestError("JSON invalide")
+            if not isinstance(body, dict):
+                raise RequestError("Objet JSON attendu")
+            self._send_json(200, self.server.service.handle(self.path, body))
+        except RequestError as e:
+            self._send_json(e.status, {'error': str(e)})
+        except (ValueError, OSError) as e:
+            self._send_json(400, {'error': str(e)})
+
+    def log_message(self, format: str, *args) -> None:
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+class SkylanderHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: SkylanderService, handler=SkylanderRequestHandler):
+        super().__init__(address, handler)
+        self.service = service
+
+
+def create_server(host: str = '127.0.0.1', port: int = 8765, workers: int = 4,
+                  root: Optional[str] = None, use_threads: bool = False,
+                  profile: bool = False) -> SkylanderHTTPServer:
+    """Crée le serveur (port 0 = port libre choisi par le système)."""
+    service = SkylanderService(workers=workers, root=root, use_threads=use_threads, profile=profile)
+    return SkylanderHTTPServer((host, port), service)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Service HTTP/JSON local pour fichiers .sky")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help="taille du pool de workers crypto")
+    parser.add_argument('--threads', action='store_true',
+                        help="pool de threads au lieu de processus")
+    parser.add_argument('--root', help="dossier autorisé pour les figurines référencées par chemin")
+    parser.add_argument('--verbose', action='store_true', help="journaliser chaque requête")
+    parser.add_argument('--profile', action='store_true',
+                        help="instrumenter skylander_core (équivaut à SKYLANDER_PROFILE=1)")
+    args = parser.parse_args()
+
+    SkylanderRequestHandler.verbose = args.verbose
+    server = create_server(args.host, args.port, args.workers, args.root, args.threads, args.profile)
+    print(f"Skylander service sur http://{args.host}:{server.server_address[1]} "
+          f"({server.service.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Skylanders Sharded Jobs
+=======================
+Découpage d'une très grande bibliothèque en N lots indépendants, exécutables
+sur des machines différentes :
+
+- `plan`  : répartit les figurines en N shards déterministes (hash de l'UID,
+            toutes les copies d'une figurine tombent dans le même shard) et
+            écrit un manifeste JSON par shard (chemins relatifs à la racine) ;
+- `run`   : exécute un manifeste avec le moteur de masse (skylander_batch),
+            éventuellement avec une autre racine (bibliothèque montée ailleurs) ;
+- `merge` : combine les résultats des shards (stats, rapport de vérification,
+            exports CSV/Parquet/Arrow) ;
+- `local` : plan + un processus par shard + merge, sur cette machine.
+
+Opérations : verify, info (stats agrégées), export, et les modifications de
+skylander_batch (edit, max, reset) avec --write.
+
+Usage:
+    python skylander_shard.py plan bibliotheque/ -n 16 --op verify -o jobs/
+    python skylander_shard.py run jobs/shard-003-of-016.json --root /mnt/bibliotheque
+    python skylander_shard.py merge jobs/ -o rapport.json
+    python skylander_shard.py local bibliotheque/ -n 4 --op export --format parquet -o stats.parquet
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+from skylander_core import DURABILITY_LEVELS
+from skylander_batch import MUTATING_OPERATIONS, SharedMemoryBatch
+from skylander_dedup import iter_sky_paths
+
+
+SHARD_OPERATIONS = ('verify', 'info', 'export') + MUTATING_OPERATIONS
+MANIFEST_VERSION = 1
+RESULT_SUFFIX = '.result.json'
+CHUNK_SIZE = 4096
+
+
+def shard_of(uid: bytes, shards: int) -> int:
+    """Shard d'une figurine (stable d'une machine et d'une version de Python à l'autre)."""
+    return int.from_bytes(hashlib.blake2b(uid, digest_size=8).digest(), 'little') % shards
+
+
+def _manifest_name(shard: int, shards: int) -> str:
+    return f'shard-{shard:03d}-of-{shards:03d}.json'
+
+
+def _read_json(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path: str, content: dict) -> None:
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(content, f, indent=2)
+    os.replace(tmp, path)
+
+
+# ============================================================================
+# PLAN
+# ============================================================================
+
+def plan_shards(root: str, shards: int, op: str, directory: str, params: Optional[dict] = None,
+                write: bool = False, export_format: str = 'csv') -> List[str]:
+    """Répartit les .sky de `root` en `shards` manifestes écrits dans `directory` ; retourne leurs chemins."""
+    if op not in SHARD_OPERATIONS:
+        raise ValueError(f"Opération inconnue: {op}")
+    if shards < 1:
+        raise ValueError("Au moins un shard")
+    root = os.path.abspath(root)
+    files: List[List[str]] = [[] for _ in range(shards)]
+    for path in iter_sky_paths([root], follow_symlinks=True):
+        relative = os.path.relpath(path, root).replace(os.sep, '/')
+        try:
+            with open(path, 'rb') as f:
+                uid = f.read(4)
+        except OSError:
+            uid = b''
+        # Fichier illisible : réparti par chemin, l'erreur sera rapportée par son shard
+        key = uid if len(uid) == 4 else relative.encode('utf-8')
+        files[shard_of(key, shards)].append(relative)
+
+    for shard_files in files:
+        shard_files.sort()
+    plan_id = hashlib.blake2b(json.dumps([op, params, files]).encode('utf-8'), digest_size=8).hexdigest()
+    os.makedirs(directory, exist_ok=True)
+    manifests = []
+    for shard in range(shards):
+        name = _manifest_name(shard, shards)
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'plan_id': plan_id,
+            'shard': shard,
+            'shards': shards,
+            'op': op,
+            'params': params or {},
+            'write': write,
+            'export_format': export_format,
+            'root': root,
+            'files': files[shard],
+        }
+        path = os.path.join(directory, name)
+        _write_json(path, manifest)
+        manifests.append(path)
+    return manifests
+
+
+# ============================================================================
+# EXÉCUTION D'UN SHARD
+# ============================================================================
+
+def _empty_stats() -> dict:
+    return {'figures': 0, 'by_game': {}, 'max_level': 0, 'checksums_invalid': 0,
+            'xp_total': 0, 'money_total': 0}
+
+
+def _add_stats(stats: dict, result: dict) -> None:
+    stats['figures'] += 1
+    stats['by_game'][result['game']] = stats['by_game'].get(result['game'], 0) + 1
+    stats['max_level'] += result['level'] >= result['max_level']
+    stats['checksums_invalid'] += not result['checksums_valid']
+    stats['xp_total'] += result['xp']
+    stats['money_total'] += result['money']
+
+
+def _export_extension(fmt: str) -> str:
+    return {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}[fmt]
+
+
+def run_manifest(manifest_path: str, root: Optional[str] = None, workers: int = 1,
+                 durability: str = 'batch') -> dict:
+    """Exécute un shard ; le résultat est écrit à côté du manifeste (et retourné)."""
+    manifest = _read_json(manifest_path)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"{manifest_path}: version de manifeste non supportée")
+    root = root or manifest['root']
+    op = manifest['op']
+    paths = [os.path.join(root, *relative.split('/')) for relative in manifest['files']]
+    base = os.path.splitext(manifest_path)[0]
+    started = time.perf_counter()
+
+    result = {
+        'plan_id': manifest['plan_id'], 'shard': manifest['shard'], 'shards': manifest['shards'],
+        'op': op, 'host': platform.node(), 'figures': len(paths), 'errors': [],
+    }
+    if op == 'export':
+        from skylander_export import export_collection
+        output = base + _export_extension(manifest['export_format'])
+        errors: List[dict] = []
+        result['rows'] = export_collection(paths, output, manifest['export_format'],
+                                           CHUNK_SIZE, workers, errors)
+        result['export'] = os.path.basename(output)
+        result['errors'] = [{'path': os.path.relpath(e['source'], root).replace(os.sep, '/'), 'error': e['error']}
+                            for e in errors]
+    else:
+        stats = _empty_stats()
+        invalid, modified = [], 0
+        with SharedMemoryBatch(workers) as engine:
+            for start in range(0, len(paths), CHUNK_SIZE):
+                chunk = paths[start:start + CHUNK_SIZE]
+                for item in engine.run_files(chunk, op, manifest['params'],
+                                             write=manifest['write'], durability=durability):
+                    relative = os.path.relpath(item['path'], root).replace(os.sep, '/')
+                    if 'error' in item:
+                        result['errors'].append({'path': relative, 'error': item['error']})
+                    elif op == 'verify':
+                        if not item['valid']:
+                            invalid.append({'path': relative, 'uid': item['uid'], 'checks': item['checks']})
+                    elif op == 'info':
+                        _add_stats(stats, item)
+                    else:
+                        modified += 1
+        if op == 'verify':
+            result['valid'] = len(paths) - len(invalid) - len(result['errors'])
+            result['invalid'] = invalid
+        elif op == 'info':
+            result['stats'] = stats
+        else:
+            result['modified'] = modified if manifest['write'] else 0
+
+    result['elapsed_s'] = time.perf_counter() - started
+    _write_json(base + RESULT_SUFFIX, result)
+    return result
+
+
+# ============================================================================
+# FUSION
+# ============================================================================
+
+def _result_files(inputs: Sequence[str]) -> List[str]:
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(os.path.join(item, name) for name in sorted(os.listdir(item))
+                         if name.endswith(RESULT_SUFFIX))
+        else:
+            paths.append(item)
+    return paths
+
+
+def _merge_exports(parts: List[str], output: str, fmt: str) -> int:
+    """Concatène les exports des shards (en flux, sans tout charger)."""
+    rows = 0
+    if fmt == 'csv':
+        with open(output, 'w', encoding='utf-8', newline='') as out:
+            for index, part in enumerate(parts):
+                with open(part, 'r', encoding='utf-8', newline='') as f:
+                    header = f.readline()
+                    if index == 0:
+                        out.write(header)
+                    for line in f:
+                        out.write(line)
+                        rows += 1
+        return rows
+
+    from skylander_export import arrow_schema, _require_pyarrow
+    pa = _require_pyarrow()
+    schema = arrow_schema()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(output, schema)
+        readers = (pq.ParquetFile(part).iter_batches() for part in parts)
+    else:
+        import pyarrow.ipc
+        writer = pa.ipc.new_file(output, schema)
+        readers = ((r.get_batch(i) for i in range(r.num_record_batches))
+                   for r in (pa.ipc.open_file(part) for part in parts))
+    try:
+        for batches in readers:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+def merge_results(inputs: Sequence[str], output: Optional[str] = None) -> dict:
+    """Combine les résultats de shards d'un même plan ; `output` reçoit l'export fusionné (op export)."""
+    results = [_read_json(path) for path in _result_files(inputs)]
+    if not results:
+        raise ValueError("Aucun résultat de shard trouvé")
+    plan_ids = {r['plan_id'] for r in results}
+    if len(plan_ids) > 1:
+        raise ValueError(f"Résultats de plans différents: {', '.join(sorted(plan_ids))}")
+    first = results[0]
+    results.sort(key=lambda r: r['shard'])
+    present = {r['shard'] for r in results}
+
+    merged = {
+        'plan_id': first['plan_id'], 'op': first['op'], 'shards': first['shards'],
+        'missing_shards': [s for s in range(first['shards']) if s not in present],
+        'figures': sum(r['figures'] for r in results),
+        'errors': [e for r in results for e in r['errors']],
+        'hosts': sorted({r['host'] for r in results}),
+        'elapsed_s': {'total': sum(r['elapsed_s'] for r in results),
+                      'slowest_shard': max(r['elapsed_s'] for r in results)},
+    }
+    op = first['op']
+    if op == 'verify':
+        merged['valid'] = sum(r['valid'] for r in results)
+        merged['invalid'] = [i for r in results for i in r['invalid']]
+    elif op == 'info':
+        stats = _empty_stats()
+        for r in results:
+            for key, value in r['stats'].items():
+                if key == 'by_game':
+                    for game, count in value.items():
+                        stats['by_game'][game] = stats['by_game'].get(game, 0) + count
+                else:
+                    stats[key] += value
+        merged['stats'] = stats
+    elif op == 'export':
+        directory = os.path.dirname(_result_files(inputs)[0])
+        parts = [os.path.join(directory, r['export']) for r in results]
+        fmt = {'.csv': 'csv', '.parquet': 'parquet', '.arrow': 'arrow'}[os.path.splitext(parts[0])[1]]
+        merged['rows'] = sum(r['rows'] for r in results)
+        if output:
+            if _merge_exports(parts, output, fmt) != merged['rows']:
+                raise ValueError("Nombre de lignes fusionnées différent des shards")
+            merged['export'] = output
+    else:
+        merged['modified'] = sum(r['modified'] for r in results)
+    return merged
+
+
+def format_merged(merged: dict) -> str:
+    lines = [f"{merged['op']}: {merged['figures']} figurines, {merged['shards']} shards "
+             f"(hôtes: {', '.join(merged['hosts'])})"]
+    if merged['missing_shards']:
+        lines.append(f"✗ shards manquants: {', '.join(map(str, merged['missing_shards']))}")
+    if merged['op'] == 'verify':
+        for item in merged['invalid']:
+            lines.append(f"  ✗ {item['path']}: checksums invalides")
+        lines.append(f"{merged['valid']} valides, {len(merged['invalid'])} invalides")
+    elif merged['op'] == 'info':
+        stats = merged['stats']
+        for game, count in sorted(stats['by_game'].items(), key=lambda g: -g[1]):
+            lines.append(f"  {game:<20} {count:>8}")
+        lines.append(f"{stats['max_level']} au niveau max, {stats['checksums_invalid']} checksums invalides")
+    elif merged['op'] == 'export':
+        lines.append(f"{merged['rows']} lignes" + (f" → {merged['export']}" if 'export' in merged else ''))
+    else:
+        lines.append(f"{merged['modified']} figurines modifiées")
+    for error in merged['errors']:
+        lines.append(f"  ✗ {error['path']}: {error['error']}")
+    lines.append(f"{merged['elapsed_s']['slowest_shard']:.2f}s (shard le plus lent), "
+                 f"{merged['elapsed_s']['total']:.2f}s cumulées")
+    return '\n'.join(lines)
+
+
+# ============================================================================
+# EXÉCUTION LOCALE
+# ============================================================================
+
+def run_local(root: str, shards: int, op: str, directory: str, params: Optional[dict] = None,
+              write: bool = False, export_format: str = 'csv', workers: int = 1,
+              output: Optional[str] = None) -> dict:
+    """Plan, puis un processus indépendant par shard (comme sur N machines), puis fusion."""
+    manifests = plan_shards(root, shards, op, directory, params, write, export_format)
+    script = os.path.abspath(__file__)
+    processes = [subprocess.Popen([sys.executable, script, 'run', path, '--workers', str(workers), '--quiet'])
+                 for path in manifests]
+    failed = [path for path, proc in zip(manifests, processes) if proc.wait() != 0]
+    if failed:
+        raise RuntimeError(f"Shard(s) en échec: {', '.join(os.path.basename(p) for p in failed)}")
+    return merge_results([directory], output)
+
+
+def _params(args) -> Dict[str, int]:
+    return {k: v for k, v in (('level', args.level), ('xp', args.xp), ('money', args.money),
+                              ('hero_points', args.hero_points)) if v is not None}
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Traitement d'une bibliothèque .sky en shards indépendants")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def add_plan_arguments(p):
+        p.add_argument('root', help="dossier de la bibliothèque (parcouru récursivement)")
+        p.add_argument('-n', '--shards', type=int, required=True)
+        p.add_argument('--op', choices=SHARD_OPERATIONS, default='verify')
+        p.add_argument('--format', choices=('csv', 'parquet', 'arrow'), default='csv',
+                       help="format des exports (op export)")
+        p.add_argument('--write', action='store_true', help="réécrire les fichiers modifiés (edit/max/reset)")
+        p.add_argument('--level', type=int)
+        p.add_argument('--xp', type=int)
+        p.add_argument('--money', type=int)
+        p.add_argument('--hero-points', type=int)
+
+    plan_p = sub.add_parser('plan', help="écrire un manifeste par shard")
+    add_plan_arguments(plan_p)
+    plan_p.add_argument('-o', '--output', required=True, help="dossier des manifestes")
+
+    run_p = sub.add_parser('run', help="exécuter un manifeste")
+    run_p.add_argument('manifest')
+    run_p.add_argument('--root', help="racine de la bibliothèque sur cette machine")
+    run_p.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    run_p.add_argument('--durability', choices=DURABILITY_LEVELS, default='batch')
+    run_p.add_argument('--quiet', action='store_true')
+
+    merge_p = sub.add_parser('merge', help="combiner les résultats des shards")
+    merge_p.add_argument('results', nargs='+', help="dossier des manifestes ou fichiers *.result.json")
+    merge_p.add_argument('-o', '--output', help="rapport JSON fusionné, ou export fusionné (op export)")
+
+    local_p = sub.add_parser('local', help="plan + shards en processus séparés + merge")
+    add_plan_arguments(local_p)
+    local_p.add_argument('--jobs-dir', help="dossier des manifestes (défaut: dossier temporaire)")
+    local_p.add_argument('--workers', type=int, default=1, help="workers par shard")
+    local_p.add_argument('-o', '--output', help="export fusionné (op export)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'plan':
+            manifests = plan_shards(args.root, args.shards, args.op, args.output, _params(args),
+                                    args.write, args.format)
+            for path in manifests:
+                print(f"{path}: {len(_read_json(path)['files'])} figurines")
+            return 0
+
+        if args.command == 'run':
+            result = run_manifest(args.manifest, args.root, args.workers, args.durability)
+            if not args.quiet:
+                print(f"shard {result['shard']}/{result['shards']}: {result['figures']} figurines "
+                      f"en {result['elapsed_s']:.2f}s, {len(result['errors'])} erreur(s)")
+            return 0
+
+        if args.command == 'merge':
+            export_output = args.output if args.output and not args.output.endswith('.json') else None
+            merged = merge_results(args.results, export_output)
+            if args.output and export_output is None:
+                _write_json(args.output, merged)
+            print(format_merged(merged))
+            return 1 if merged['missing_shards'] or merged['errors'] else 0
+
+        import tempfile
+        jobs_dir = args.jobs_dir or tempfile.mkdtemp(prefix='skylander_shards_')
+        started = time.perf_counter()
+        merged = run_local(args.root, args.shards, args.op, jobs_dir, _params(args), args.write,
+                           args.format, args.workers, args.output)
+        print(format_merged(merged))
+        print(f"Total: {time.perf_counter() - started:.2f}s (manifestes et résultats: {jobs_dir})")
+        return 1 if merged['errors'] else 0
+    except (OSError, ValueError, RuntimeError, ImportError) as e:
+        print(f"✗ {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Skylanders Library Sync
+=======================
+Synchronisation de bibliothèques de figurines (dossiers ou archives .skypack)
+par empreintes de figurine et de bloc, à la manière de rsync :
+
+1. la cible publie une signature : pour chaque figurine, une empreinte du
+   contenu, son compteur de séquence et une empreinte de chacun des 64 blocs ;
+2. la source en déduit un patch qui ne contient que les blocs modifiés
+   (la figurine entière si elle est absente de la cible) ;
+3. la cible applique le patch, en vérifiant l'empreinte avant et après.
+
+Quand une figurine diffère des deux côtés, la plus récente l'emporte : celle
+dont le compteur de séquence de la zone active (celui de get_active_area) est
+le plus élevé. À égalité, la source gagne en miroir ; en bidirectionnel, la
+figurine est laissée telle quelle et signalée comme conflit.
+
+Usage:
+    python skylander_sync.py sync emulateur/ sauvegarde/                 # miroir local
+    python skylander_sync.py sync emulateur/ sauvegarde.skypack --two-way --dry-run
+
+    # Entre deux machines :
+    python skylander_sync.py signature sauvegarde/ -o sauvegarde.sig     # hôte de sauvegarde
+    python skylander_sync.py delta emulateur/ sauvegarde.sig -o maj.skypatch
+    python skylander_sync.py apply maj.skypatch sauvegarde/              # hôte de sauvegarde
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from skylander_archive import ArchiveWriter, iter_archive
+from skylander_core import (
+    Skylander, SKYLANDER_SIZE, AREA_HEADER_BLOCKS, DURABILITY_LEVELS, AtomicWriter, read_sky_file
+)
+from skylander_dedup import iter_sky_paths
+
+
+BLOCK_SIZE = 16
+BLOCK_COUNT = SKYLANDER_SIZE // BLOCK_SIZE
+DIGEST_SIZE = 16
+
+SIGNATURE_MAGIC = b'SKYSIG'
+PATCH_MAGIC = b'SKYPATCH'
+FORMAT_VERSION = 1
+
+_NAME_LEN = struct.Struct('<H')
+_BLOCK_HASHES = struct.Struct(f'<{BLOCK_COUNT}I')
+
+# Enregistrements d'un patch
+_OP_FULL = 1    # figurine entière : empreinte + 1024 octets
+_OP_BLOCKS = 2  # empreinte attendue + empreinte finale + nombre de blocs + (index, bloc)...
+
+
+# ============================================================================
+# BIBLIOTHÈQUES
+# ============================================================================
+
+def is_archive(path: str) -> bool:
+    return path.endswith('.skypack') or os.path.isfile(path)
+
+
+def _target_path(root: str, name: str) -> str:
+    """Chemin d'une figurine dans un dossier ; refuse les noms qui en sortiraient."""
+    parts = name.split('/')
+    if os.path.isabs(name) or any(part in ('', '.', '..') for part in parts):
+        raise ValueError(f"Nom de figurine invalide: {name}")
+    return os.path.join(root, *parts)
+
+
+def _read_figure(path: str) -> Optional[bytes]:
+    try:
+        data = read_sky_file(path)
+    except OSError:
+        return None
+    return data if len(data) == SKYLANDER_SIZE else None
+
+
+def read_library(path: str) -> Dict[str, bytes]:
+    """Figurines d'une bibliothèque, par nom : chemin relatif (séparateur '/') dans un
+    dossier parcouru récursivement, ou nom d'entrée d'une archive.
+
+    Une bibliothèque absente est vide ; les fichiers illisibles ou de taille invalide sont ignorés.
+    """
+    if is_archive(path):
+        return dict(iter_archive(path)) if os.path.exists(path) else {}
+    figures = {}
+    if os.path.isdir(path):
+        for file_path in iter_sky_paths([path], follow_symlinks=True):
+            data = _read_figure(file_path)
+            if data is not None:
+                figures[os.path.relpath(file_path, path).replace(os.sep, '/')] = data
+    return figures
+
+
+def write_library(path: str, updates: Dict[str, bytes], durability: str = 'batch',
+                  existing: Optional[Dict[str, bytes]] = None) -> None:
+    """Écrit des figurines (nom -> contenu) de façon atomique : fichiers remplacés via
+    AtomicWriter, ou archive réécrite dans un temporaire puis renommée.
+
+    `existing` : contenu actuel de l'archive, s'il a déjà été lu.
+    """
+    if not updates:
+        return
+    if not is_archive(path):
+        with AtomicWriter(durability, window=len(updates)) as writer:
+            for name, data in updates.items():
+                target = _target_path(path, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                writer.write(target, data)
+        return
+
+    figures = dict(read_library(path) if existing is None else existing)
+    figures.update(updates)
+    tmp = path + '.tmp'
+    try:
+        with ArchiveWriter(tmp) as writer:
+            for name, data in figures.items():
+                writer.add(name, data)
+        if durability != 'none':
+            fd = os.open(tmp, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# ============================================================================
+# SIGNATURES
+# ============================================================================
+
+class FigureSignature(NamedTuple):
+    digest: bytes    # BLAKE2b-128 du contenu chiffré
+    sequence: int    # Compteur de séquence de la zone active
+    blocks: bytes    # CRC32 de chacun des 64 blocs (little-endian)
+
+
+def figure_digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+def block_hashes(data) -> bytes:
+    """Empreintes des 64 blocs. Un CRC32 suffit à repérer les blocs modifiés : le
+    résultat d'un patch est de toute façon contrôlé par l'empreinte de la figurine."""
+    view = memoryview(data)
+    return _BLOCK_HASHES.pack(*[zlib.crc32(view[i:i + BLOCK_SIZE])
+                                for i in range(0, SKYLANDER_SIZE, BLOCK_SIZE)])
+
+
+def figure_sequence(data: bytes) -> int:
+    """Compteur de séquence de la zone active ; seuls les deux blocs d'en-tête sont déchiffrés.
+
+    Comme get_active_area, les compteurs sont comparés sans tenir compte d'un rebouclage.
+    """
+    skylander = Skylander(data)
+    return max(skylander.read_block(block)[0x09] for block in AREA_HEADER_BLOCKS)
+
+
+def signature_of(data: bytes) -> FigureSignature:
+    return FigureSignature(figure_digest(data), figure_sequence(data), block_hashes(data))
+
+
+def library_signature(figures: Dict[str, bytes]) -> Dict[str, FigureSignature]:
+    return {name: signature_of(data) for name, data in figures.items()}
+
+
+def _pack_name(name: str) -> bytes:
+    encoded = name.encode('utf-8')
+    return _NAME_LEN.pack(len(encoded)) + encoded
+
+
+def _unpack_name(raw: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = _NAME_LEN.unpack_from(raw, offset)
+    offset += _NAME_LEN.size
+    return raw[offset:offset + length].decode('utf-8'), offset + length
+
+
+def _check_header(raw: bytes, magic: bytes, what: str) -> int:
+    if raw[:len(magic)] != magic:
+        raise ValueError(f"{what.capitalize()} invalide")
+    if len(raw) <= len(magic) or raw[len(magic)] != FORMAT_VERSION:
+        raise ValueError(f"Version de {what} non supportée")
+    return len(magic) + 1
+
+
+def encode_signature(signature: Dict[str, FigureSignature]) -> bytes:
+    parts = [SIGNATURE_MAGIC, bytes([FORMAT_VERSION])]
+    for name, sig in signature.items():
+        parts.append(_pack_name(name) + sig.digest + bytes([sig.sequence]) + sig.blocks)
+    return b''.join(parts)
+
+
+def decode_signature(raw: bytes) -> Dict[str, FigureSignature]:
+    offset = _check_header(raw, SIGNATURE_MAGIC, "signature")
+    record = DIGEST_SIZE + 1 + _BLOCK_HASHES.size
+    signature = {}
+    try:
+        while offset < len(raw):
+            name, offset = _unpack_name(raw, offset)
+            if offset + record > len(raw):
+                raise ValueError
+            digest = raw[offset:offset + DIGEST_SIZE]
+            sequence = raw[offset + DIGEST_SIZE]
+            blocks = raw[offset + DIGEST_SIZE + 1:offset + record]
+            signature[name] = FigureSignature(digest, sequence, blocks)
+            offset += record
+    except (ValueError, struct.error):
+        raise ValueError("Signature tronquée") from None
+    return signature
+
+
+# ============================================================================
+# PATCHS
+# ============================================================================
+
+class PatchEntry(NamedTuple):
+    name: str
+    base: Optional[bytes]            # Empreinte attendue dans la cible (None : figurine nouvelle)
+    digest: bytes                    # Empreinte après application
+    blocks: List[Tuple[int, bytes]]  # Blocs à écrire : (index, 16 octets)
+
+
+class SyncReport(NamedTuple):
+    direction: str
+    figures: int
+    unchanged: int
+    added: List[str]
+    patched: List[str]
+    kept_newer: List[str]   # Plus récente côté cible : non écrasée
+    conflicts: List[str]    # Compteurs égaux, contenus différents
+    blocks_sent: int
+    patch_bytes: int
+    signature_bytes: int
+    full_copy_bytes: int    # Copie intégrale de la source
+    errors: List[dict]      # Rempli à l'application
+
+    @property
+    def changed_files_bytes(self) -> int:
+        """Copie des seuls fichiers modifiés (ce que transfère un outil fondé sur les fichiers)."""
+        return (len(self.added) + len(self.patched)) * SKYLANDER_SIZE
+
+    @property
+    def bytes_saved(self) -> int:
+        """Octets économisés par rapport à une copie intégrale, signature comprise."""
+        return self.full_copy_bytes - self.patch_bytes - self.signature_bytes
+
+    def to_dict(self) -> dict:
+        result = self._asdict()
+        result['changed_files_bytes'] = self.changed_files_bytes
+        result['bytes_saved'] = self.bytes_saved
+        return result
+
+
+def encode_patch(entries: List[PatchEntry]) -> bytes:
+    parts = [PATCH_MAGIC, bytes([FORMAT_VERSION])]
+    for entry in entries:
+        parts.append(_pack_name(entry.name))
+        if entry.base is None:
+            parts.append(bytes([_OP_FULL]) + entry.digest)
+            parts.extend(block for _index, block in entry.blocks)
+        else:
+            parts.append(bytes([_OP_BLOCKS]) + entry.base + entry.digest + bytes([len(entry.blocks)]))
+            parts.extend(bytes([index]) + block for index, block in entry.blocks)
+    return b''.join(parts)
+
+
+def decode_patch(raw: bytes) -> List[PatchEntry]:
+    offset = _check_header(raw, PATCH_MAGIC, "patch")
+    entries = []
+    try:
+        while offset < len(raw):
+            name, offset = _unpack_name(raw, offset)
+            op = raw[offset]
+            offset += 1
+            if op == _OP_FULL:
+                digest = raw[offset:offset + DIGEST_SIZE]
+                offset += DIGEST_SIZE
+                blocks = [(i, raw[offset + i * BLOCK_SIZE:offset + (i + 1) * BLOCK_SIZE])
+                          for i in range(BLOCK_COUNT)]
+                offset += SKYLANDER_SIZE
+                entries.append(PatchEntry(name, None, digest, blocks))
+            elif op == _OP_BLOCKS:
+                base = raw[offset:offset + DIGEST_SIZE]
+                digest = raw[offset + DIGEST_SIZE:offset + 2 * DIGEST_SIZE]
+                count = raw[offset + 2 * DIGEST_SIZE]
+                offset += 2 * DIGEST_SIZE + 1
+                blocks = []
+                for _ in range(count):
+                    blocks.append((raw[offset], raw[offset + 1:offset + 1 + BLOCK_SIZE]))
+                    offset += 1 + BLOCK_SIZE
+                entries.append(PatchEntry(name, base, digest, blocks))
+            else:
+                raise ValueError(f"Enregistrement de patch inconnu: {op}")
+            if offset > len(raw):
+                raise IndexError
+    except (IndexError, struct.error):
+        raise ValueError("Patch tronqué") from None
+    return entries
+
+
+def _all_blocks(data: bytes) -> List[Tuple[int, bytes]]:
+    return [(i, data[i * BLOCK_SIZE:(i + 1) * BLOCK_SIZE]) for i in range(BLOCK_COUNT)]
+
+
+def compute_delta(source: Dict[str, bytes], target: Dict[str, FigureSignature],
+                  direction: str = '', ties: str = 'source') -> Tuple[List[PatchEntry], SyncReport]:
+    """Patch amenant la cible (décrite par sa signature) à l'état de la source.
+
+    Une figurine plus récente côté cible n'est pas écrasée ; à compteurs égaux,
+    `ties` décide : 'source' (miroir) ou 'skip'.
+    """
+    entries: List[PatchEntry] = []
+    added, patched, kept_newer, conflicts = [], [], [], []
+    unchanged = blocks_sent = 0
+    for name, data in source.items():
+        remote = target.get(name)
+        digest = figure_digest(data)
+        if remote is None:
+            entries.append(PatchEntry(name, None, digest, _all_blocks(data)))
+            added.append(name)
+            blocks_sent += BLOCK_COUNT
+            continue
+        if remote.digest == digest:
+            unchanged += 1
+            continue
+        sequence = figure_sequence(data)
+        if sequence < remote.sequence:
+            kept_newer.append(name)
+            continue
+        if sequence == remote.sequence:
+            conflicts.append(name)
+            if ties != 'source':
+                continue
+        local = block_hashes(data)
+        blocks = [(i, data[i * BLOCK_SIZE:(i + 1) * BLOCK_SIZE]) for i in range(BLOCK_COUNT)
+                  if local[4 * i:4 * i + 4] != remote.blocks[4 * i:4 * i + 4]]
+        entries.append(PatchEntry(name, remote.digest, digest, blocks or _all_blocks(data)))
+        patched.append(name)
+        blocks_sent += len(entries[-1].blocks)
+
+    signature_bytes = len(SIGNATURE_MAGIC) + 1 + sum(
+        _NAME_LEN.size + len(name.encode('utf-8')) + DIGEST_SIZE + 1 + _BLOCK_HASHES.size for name in target)
+    report = SyncReport(direction, len(source), unchanged, added, patched, kept_newer, conflicts,
+                        blocks_sent, len(encode_patch(entries)), signature_bytes,
+                        len(source) * SKYLANDER_SIZE, [])
+    return entries, report
+
+
+def apply_patch(entries: List[PatchEntry], library: str,
+                durability: str = 'batch') -> Tuple[int, List[dict]]:
+    """Applique un patch à une bibliothèque ; retourne le nombre de figurines écrites et les
+    erreurs (figurines laissées intactes). Les figurines déjà à jour sont ignorées."""
+    archive = is_archive(library)
+    existing = read_library(library) if archive else None
+    updates: Dict[str, bytes] = {}
+    errors = []
+    for entry in entries:
+        try:
+            old = existing.get(entry.name) if archive else _read_figure(_target_path(library, entry.name))
+        except ValueError as e:
+            errors.append({'name': entry.name, 'error': str(e)})
+            continue
+        current = None if old is None else figure_digest(old)
+        if current == entry.digest:
+            continue  # Patch déjà appliqué
+        if entry.base is None:
+            if old is not None:
+                errors.append({'name': entry.name, 'error': "figurine apparue dans la cible depuis la signature"})
+                continue
+            data = bytearray(SKYLANDER_SIZE)
+        elif current != entry.base:
+            errors.append({'name': entry.name, 'error': "cible modifiée depuis la signature"})
+            continue
+        else:
+            data = bytearray(old)
+        for index, block in entry.blocks:
+            data[index * BLOCK_SIZE:(index + 1) * BLOCK_SIZE] = block
+        if figure_digest(data) != entry.digest:
+            errors.append({'name': entry.name, 'error': "empreinte invalide après application"})
+            continue
+        updates[entry.name] = bytes(data)
+    write_library(library, updates, durability, existing)
+    return len(updates), errors
+
+
+def sync(source: str, target: str, two_way: bool = False, dry_run: bool = False,
+         durability: str = 'batch') -> List[SyncReport]:
+    """Synchronise deux bibliothèques locales (source vers cible, et retour si `two_way`).
+
+    Les deux patchs sont calculés sur l'état initial avant toute écriture.
+    """
+    left, right = read_library(source), read_library(target)
+    passes = [(f'{source} → {target}', left, right, target)]
+    if two_way:
+        passes.append((f'{target} → {source}', right, left, source))
+    plans = []
+    for direction, src, dst, path in passes:
+        entries, report = compute_delta(src, library_signature(dst), direction,
+                                        ties='skip' if two_way else 'source')
+        plans.append((entries, report, path))
+    for entries, report, path in plans:
+        if not dry_run:
+            report.errors.extend(apply_patch(entries, path, durability)[1])
+    return [report for _entries, report, _path in plans]
+
+
+# ============================================================================
+# AFFICHAGE
+# ============================================================================
+
+MAX_LISTED = 20
+
+
+def _size(nbytes: int) -> str:
+    for unit in ('o', 'Ko', 'Mo'):
+        if abs(nbytes) < 1024:
+            return f"{nbytes:.0f} {unit}" if unit == 'o' else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+    return f"{nbytes:.1f} Go"
+
+
+def format_report(report: SyncReport, dry_run: bool = False) -> str:
+    lines = [f"{report.direction}{' (simulation)' if dry_run else ''}",
+             f"  {report.figures} figurines : {report.unchanged} inchangées, {len(report.added)} ajoutées, "
+             f"{len(report.patched)} patchées ({report.blocks_sent} blocs)",
+             f"  transfert : {_size(report.patch_bytes)} de patch + {_size(report.signature_bytes)} de signature, "
+             f"au lieu de {_size(report.full_copy_bytes)} (copie complète) ou "
+             f"{_size(report.changed_files_bytes)} (fichiers modifiés) → {_size(report.bytes_saved)} économisés"]
+    details = ([f"  = {name} : plus récente dans la cible, conservée" for name in sorted(report.kept_newer)]
+               + [f"  ! {name} : même compteur de séquence, contenus différents" for name in sorted(report.conflicts)]
+               + [f"  ✗ {error['name']} : {error['error']}" for error in report.errors])
+    lines.extend(details[:MAX_LISTED])
+    if len(details) > MAX_LISTED:
+        lines.append(f"  ... {len(details) - MAX_LISTED} autres (détail complet avec --json)")
+    return '\n'.join(lines)
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Synchronise des bibliothèques de figurines par blocs")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sync_p = sub.add_parser('sync', help="synchroniser deux bibliothèques locales")
+    sync_p.add_argument('source', help="dossier ou archive .skypack")
+    sync_p.add_argument('target', help="dossier ou archive .skypack (créé si absent)")
+    sync_p.add_argument('--two-way', action='store_true', help="propager aussi les changements de la cible")
+    sync_p.add_argument('--dry-run', action='store_true', help="n'écrire aucune figurine")
+    sync_p.add_argument('--durability', choices=DURABILITY_LEVELS, default='batch')
+    sync_p.add_argument('--json', action='store_true')
+
+    sig_p = sub.add_parser('signature', help="écrire la signature d'une bibliothèque")
+    sig_p.add_argument('library')
+    sig_p.add_argument('-o', '--output', required=True)
+
+    delta_p = sub.add_parser('delta', help="écrire le patch amenant une signature à l'état de la source")
+    delta_p.add_argument('source')
+    delta_p.add_argument('signature')
+    delta_p.add_argument('-o', '--output', required=True)
+    delta_p.add_argument('--json', action='store_true')
+
+    apply_p = sub.add_parser('apply', help="appliquer un patch à une bibliothèque")
+    apply_p.add_argument('patch')
+    apply_p.add_argument('library')
+    apply_p.add_argument('--durability', choices=DURABILITY_LEVELS, default='batch')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        if args.command == 'sync':
+            reports = sync(args.source, args.target, args.two_way, args.dry_run, args.durability)
+        elif args.command == 'signature':
+            signature = library_signature(read_library(args.library))
+            raw = encode_signature(signature)
+            with open(args.output, 'wb') as f:
+                f.write(raw)
+            print(f"{len(signature)} figurines, signature de {_size(len(raw))} écrite dans {args.output}")
+            return 0
+        elif args.command == 'delta':
+            with open(args.signature, 'rb') as f:
+                target = decode_signature(f.read())
+            entries, report = compute_delta(read_library(args.source), target,
+                                            f'{args.source} → {args.signature}')
+            with open(args.output, 'wb') as f:
+                f.write(encode_patch(entries))
+            reports = [report]
+        else:
+            with open(args.patch, 'rb') as f:
+                entries = decode_patch(f.read())
+            written, errors = apply_patch(entries, args.library, args.durability)
+            for error in errors:
+                print(f"✗ {error['name']} : {error['error']}")
+            print(f"{written} figurines écrites dans {args.library}, "
+                  f"{len(entries) - written - len(errors)} déjà à jour, {len(errors)} erreur(s)")
+            return 1 if errors else 0
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps([report.to_dict() for report in reports], indent=2))
+    else:
+        for report in reports:
+            print(format_report(report, getattr(args, 'dry_run', False)))
+        print(f"Terminé en {elapsed:.2f}s")
+    return 1 if any(report.errors for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Skylanders UI Responsiveness Monitor
+====================================
+Réactivité de la boucle d'événements de l'éditeur.
+
+Un battement périodique (`root.after`) mesure son retard sur l'heure prévue :
+tant que la boucle tourne, ce retard reste de l'ordre de la milliseconde.
+Les gestionnaires instrumentés sont chronométrés ; un retard au-delà du seuil
+est consigné comme blocage et attribué aux gestionnaires actifs pendant la
+fenêtre bloquée (ceux en cours ou terminés depuis le battement précédent).
+
+Indépendant de Tk : l'ordonnanceur est injecté, comme pour le view model.
+"""
+
+import functools
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional
+
+
+HEARTBEAT_MS = 50
+STALL_THRESHOLD_MS = 100  # Au-delà, le gel est perceptible
+
+MAX_SAMPLES = 2000
+MAX_STALLS = 200
+
+
+class Stall(NamedTuple):
+    at: float               # time.time() de la détection
+    lag_ms: float           # Retard du battement
+    handlers: tuple         # Gestionnaires actifs pendant le blocage (vide : hors gestionnaire)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentile (plus proche rang), comme skylander_bench.percentile."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class ResponsivenessMonitor:
+    """Battement de mesure de la latence et chronométrage des gestionnaires.
+
+    `after(ms, callback)` programme un appel différé (ex: `root.after`) ;
+    `on_stall(stall)` est appelé à chaque blocage détecté.
+    """
+
+    def __init__(self, after: Callable[[int, Callable[[], None]], Any],
+                 interval_ms: int = HEARTBEAT_MS, threshold_ms: float = STALL_THRESHOLD_MS,
+                 on_stall: Optional[Callable[[Stall], None]] = None,
+                 clock: Callable[[], float] = time.perf_counter):
+        self._after = after
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self._on_stall = on_stall
+        self._clock = clock
+        self._lags: Deque[float] = deque(maxlen=MAX_SAMPLES)
+        self.stalls: Deque[Stall] = deque(maxlen=MAX_STALLS)
+        self.stall_count = 0
+        self._handlers: Dict[str, dict] = {}
+        self._stack: List[str] = []   # Gestionnaires en cours (imbriqués)
+        self._window: List[str] = []  # Gestionnaires actifs depuis le dernier battement
+        self._expected = 0.0
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # Battement
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if not self._running:
+            self._running = True
+            self._schedule()
+
+    def stop(self) -> None:
+        self._running = False
+
+    def _schedule(self) -> None:
+        self._expected = self._clock() + self.interval_ms / 1000.0
+        self._after(self.interval_ms, self._beat)
+
+    def _beat(self) -> None:
+        if not self._running:
+            return
+        lag_ms = max(0.0, (self._clock() - self._expected) * 1000.0)
+        self._lags.append(lag_ms)
+        if lag_ms >= self.threshold_ms:
+            self._record_stall(lag_ms)
+        self._window = list(self._stack)
+        self._schedule()
+
+    def _record_stall(self, lag_ms: float) -> None:
+        handlers = tuple(dict.fromkeys(self._window))  # Ordre d'entrée, sans doublons
+        stall = Stall(time.time(), lag_ms, handlers)
+        self.stalls.append(stall)
+        self.stall_count += 1
+        for name in handlers:
+            self._handlers[name]['stalls'] += 1
+        if self._on_stall is not None:
+            self._on_stall(stall)
+
+    # ------------------------------------------------------------------
+    # Gestionnaires
+    # ------------------------------------------------------------------
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        """Enveloppe `fn` : durée de chaque appel, et attribution des blocages pendant l'appel.
+
+        La durée inclut les dialogues modaux ouverts par le gestionnaire ; la boucle
+        tourne pendant ces dialogues, ils ne sont donc pas comptés comme blocages.
+        """
+        stats = self._handlers.setdefault(name, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'stalls': 0})
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            self._stack.append(name)
+            self._window.append(name)
+            started = self._clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed_ms = (self._clock() - started) * 1000.0
+                self._stack.pop()
+                stats['calls'] += 1
+                stats['total_ms'] += elapsed_ms
+                stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+        return wrapper
+
+    def scheduler(self, schedule: Callable[[Callable[[], None]], Any],
+                  name: str) -> Callable[[Callable[[], None]], Any]:
+        """Ordonnanceur (ex: `root.after_idle`) dont les callbacks sont chronométrés sous `name`."""
+        return lambda callback: schedule(self.timed(name, callback))
+
+    # ------------------------------------------------------------------
+    # Rapport
+    # ------------------------------------------------------------------
+
+    def reset(self) -> None:
+        self._lags.clear()
+        self.stalls.clear()
+        self.stall_count = 0
+        for stats in self._handlers.values():
+            stats.update(calls=0, total_ms=0.0, max_ms=0.0, stalls=0)
+
+    def stats(self) -> dict:
+        lags = sorted(self._lags)
+        return {
+            'heartbeats': len(lags),
+            'interval_ms': self.interval_ms,
+            'threshold_ms': self.threshold_ms,
+            'lag_ms': {'p50': _percentile(lags, 50), 'p95': _percentile(lags, 95),
+                       'p99': _percentile(lags, 99), 'max': lags[-1] if lags else 0.0},
+            'stalls': self.stall_count,
+            'handlers': {name: dict(stats) for name, stats in self._handlers.items()},
+        }
+
+    def format_report(self, recent: int = 20) -> str:
+        stats = self.stats()
+        lag = stats['lag_ms']
+        lines = [
+            f"Battement toutes les {self.interval_ms} ms, seuil de blocage {self.threshold_ms:.0f} ms",
+            f"Retard ({stats['heartbeats']} battements) : p50 {lag['p50']:.1f} ms  p95 {lag['p95']:.1f} ms  "
+            f"p99 {lag['p99']:.1f} ms  max {lag['max']:.1f} ms",
+            f"Blocages : {stats['stalls']}",
+            "",
+            f"{'Gestionnaire':<20} {'appels':>7} {'moyenne':>10} {'max':>10} {'blocages':>9}",
+        ]
+        for name, s in sorted(stats['handlers'].items(), key=lambda item: -item[1]['max_ms']):
+            mean = s['total_ms'] / s['calls'] if s['calls'] else 0.0
+            lines.append(f"{name:<20} {s['calls']:>7} {mean:>7.1f} ms {s['max_ms']:>7.1f} ms {s['stalls']:>9}")
+        if self.stalls:
+            lines += ["", "Derniers blocages :"]
+            for stall in list(self.stalls)[-recent:][::-1]:
+                lines.append(f"  {format_stall(stall)}")
+        return '\n'.join(lines)
+
+
+def format_stall(stall: Stall) -> str:
+    at = time.strftime('%H:%M:%S', time.localtime(stall.at))
+    return f"{at}  {stall.lag_ms:>7.0f} ms  {', '.join(stall.handlers) or '(hors gestionnaire)'}"
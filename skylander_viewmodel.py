@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Skylanders View Model
+=====================
+Couche intermédiaire entre `Skylander` et l'interface graphique.
+
+Le view model calcule les valeurs affichées (nom, jeu, stats, vue hex...),
+les compare à celles déjà publiées et ne notifie que les champs modifiés.
+Les demandes de rafraîchissement successives sont regroupées en une seule
+mise à jour, exécutée par l'ordonnanceur fourni (ex: `root.after_idle`).
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from skylander_core import Skylander
+
+
+HEX_VIEW_SIZE = 256
+
+# Champs publiés par le view model
+FIELDS = (
+    'loaded', 'name', 'game', 'variant', 'max_level', 'max_xp',
+    'xp', 'level', 'money', 'hero', 'hex',
+)
+
+_MISSING = object()
+
+
+class SkylanderViewModel:
+    """Publie des notifications de changement champ par champ."""
+
+    def __init__(self, scheduler: Optional[Callable[[Callable[[], None]], Any]] = None):
+        # Sans ordonnanceur, la mise à jour est immédiate (utile hors Tk)
+        self._scheduler = scheduler
+        self._skylander: Optional[Skylander] = None
+        self._subscribers: Dict[str, List[Callable[[Any], None]]] = {f: [] for f in FIELDS}
+        self._published: Dict[str, Any] = {}
+        self._forced: set = set()
+        self._pending = False
+        self.flush_count = 0
+
+    @property
+    def skylander(self) -> Optional[Skylander]:
+        return self._skylander
+
+    def subscribe(self, field: str, callback: Callable[[Any], None]) -> None:
+        """Abonne `callback(valeur)` aux changements d'un champ."""
+        if field not in self._subscribers:
+            raise KeyError(f"Champ inconnu: {field}")
+        self._subscribers[field].append(callback)
+
+    def set_skylander(self, skylander: Optional[Skylander]) -> None:
+        """Change le Skylander observé ; les champs de stats sont republiés."""
+        self._skylander = skylander
+        self.invalidate('xp', 'level', 'money', 'hero')
+
+    def invalidate(self, *fields: str) -> None:
+        """Signale un changement du modèle et planifie une mise à jour.
+
+        Les champs nommés sont republiés même si leur valeur n'a pas changé
+        (pour écraser une saisie non appliquée par exemple).
+        """
+        self._forced.update(fields)
+        if self._pending:
+            return
+        self._pending = True
+        if self._scheduler is None:
+            self.flush()
+        else:
+            self._scheduler(self.flush)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        sky = self._skylander
+        if sky is None:
+            return {'loaded': False}
+        name, game = sky.get_character_info()
+        return {
+            'loaded': True,
+            'name': name,
+            'game': game.display_name,
+            'variant': sky.get_variant_id(),
+            'max_level': sky.get_max_level(),
+            'max_xp': sky.get_max_xp(),
+            'xp': sky.get_xp(),
+            'level': sky.get_level(),
+            'money': sky.get_money(),
+            'hero': sky.get_hero_points(),
+            'hex': bytes(sky.data[:HEX_VIEW_SIZE]),
+        }
+
+    def _changed_fields(self, snapshot: Dict[str, Any]) -> Iterable[str]:
+        for field in FIELDS:
+            if field not in snapshot:
+                continue
+            if field in self._forced or self._published.get(field, _MISSING) != snapshot[field]:
+                yield field
+
+    def flush(self) -> None:
+        """Calcule les valeurs courantes et notifie les seuls champs modifiés."""
+        self._pending = False
+        snapshot = self._snapshot()
+        changed = list(self._changed_fields(snapshot))
+        self._forced.clear()
+        self.flush_count += 1
+        for field in changed:
+            value = snapshot[field]
+            self._published[field] = value
+            for callback in self._subscribers[field]:
+                callback(value)
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Skylanders Watcher
+==================
+Surveillance des dossiers de figurines réécrites par les émulateurs
+(RPCS3, Dolphin) pendant une partie.
+
+- inotify sous Linux (via ctypes, sans dépendance), sondage périodique sinon
+- anti-rebond : un fichier n'est relu qu'une fois les écritures terminées
+- décodage incrémental : seuls les blocs chiffrés modifiés sont déchiffrés
+- événements structurés (XP gagnée, argent modifié, ...)
+
+Au repos, le thread inotify est bloqué dans select() sans timeout : aucun
+coût CPU, quel que soit le nombre de fichiers surveillés.
+
+Usage:
+    python skylander_watcher.py ~/RPCS3/dev_hdd0/skylanders [--poll]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from skylander_core import (
+    Skylander, SKYLANDER_SIZE, SKY_EXTENSION,
+    changed_blocks, decrypt_block, is_encrypted_block, list_sky_files, read_sky_file
+)
+
+
+# Champs comparés entre deux versions d'une figurine
+WATCHED_FIELDS = ('character_id', 'variant_id', 'level', 'xp', 'money', 'hero_points')
+
+# Constantes inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class FigureChange(NamedTuple):
+    """Événement émis quand une figurine surveillée change."""
+    kind: str                       # 'added', 'modified' ou 'removed'
+    path: str
+    uid: str
+    name: str
+    changes: Dict[str, Tuple[int, int]]
+    blocks_decrypted: int
+
+    @property
+    def xp_gained(self) -> int:
+        old, new = self.changes.get('xp', (0, 0))
+        return new - old
+
+    @property
+    def money_changed(self) -> int:
+        old, new = self.changes.get('money', (0, 0))
+        return new - old
+
+    def describe(self) -> str:
+        base = os.path.basename(self.path)
+        if self.kind != 'modified':
+            return f"[{self.kind}] {base} ({self.name})"
+        parts = []
+        for field, (old, new) in self.changes.items():
+            parts.append(f"{field} {old} → {new} ({new - old:+d})")
+        return f"[modifié] {base} ({self.name}): " + ', '.join(parts)
+
+
+class _TrackedFigure:
+    __slots__ = ('encrypted', 'skylander', 'stats')
+
+    def __init__(self, encrypted: bytes, skylander: Skylander):
+        self.encrypted = encrypted
+        self.skylander = skylander
+        summary = skylander.get_summary()
+        self.stats = {field: summary[field] for field in WATCHED_FIELDS}
+
+
+def decode_incremental(previous: Optional[_TrackedFigure], encrypted: bytes) -> Tuple[Skylander, int]:
+    """Déchiffre `encrypted` en réutilisant la version précédente bloc par bloc.
+
+    Retourne le Skylander déchiffré et le nombre de blocs réellement déchiffrés.
+    """
+    blocks = changed_blocks(previous.encrypted, encrypted) if previous else None
+    # Les blocs 0-1 portent le matériel de clé : tout redéchiffrer s'ils changent
+    if blocks is None or any(b < 2 for b in blocks):
+        skylander = Skylander(encrypted)
+        skylander.decrypt()
+        return skylander, sum(1 for b in range(SKYLANDER_SIZE // 16) if is_encrypted_block(b))
+
+    skylander = previous.skylander.copy()
+    sector0 = encrypted[:0x20]
+    decrypted = 0
+    for block in blocks:
+        offset = block * 16
+        chunk = encrypted[offset:offset + 16]
+        if is_encrypted_block(block):
+            chunk = decrypt_block(chunk, sector0, block)
+            decrypted += 1
+        skylander.data[offset:offset + 16] = chunk
+    return skylander, decrypted
+
+
+class _Inotify:
+    """Accès minimal à inotify via ctypes."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError("inotify indisponible sur cette plateforme")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 a échoué")
+        self._dirs: Dict[int, str] = {}
+
+    def add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch a échoué: {directory}")
+        self._dirs[wd] = directory
+
+    def read_paths(self) -> Tuple[List[str], bool]:
+        """Chemins touchés depuis la dernière lecture, et indicateur de débordement."""
+        paths, overflow = [], False
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(buf):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, pos)
+                name = buf[pos + _EVENT_HEADER.size:pos + _EVENT_HEADER.size + length].rstrip(b'\0')
+                pos += _EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif wd in self._dirs and name:
+                    paths.append(os.path.join(self._dirs[wd], os.fsdecode(name)))
+        return paths, overflow
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FigureWatcher:
+    """Surveille des dossiers de .sky et émet des `FigureChange`."""
+
+    def __init__(self, directories: Iterable[str], callback: Callable[[FigureChange], None],
+                 debounce: float = 0.3, poll_interval: float = 1.0, backend: str = 'auto'):
+        self.directories = [os.path.abspath(d) for d in directories]
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend = backend
+
+        self._figures: Dict[str, _TrackedFigure] = {}
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        self._pending: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._thread: Optional[threading.Thread] = None
+        self.active_backend: Optional[str] = None
+
+        self.files_decoded = 0
+        self.blocks_decrypted = 0
+
+    # ------------------------------------------------------------------
+    # Décodage
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _is_sky(path: str) -> bool:
+        return path.lower().endswith(SKY_EXTENSION)
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _emit(self, kind: str, path: str, figure: _TrackedFigure,
+              changes: Dict[str, Tuple[int, int]], blocks: int) -> None:
+        name, _ = figure.skylander.get_character_info()
+        self.callback(FigureChange(kind, path, figure.skylander.get_uid(), name, changes, blocks))
+
+    def _process(self, path: str, emit: bool = True) -> None:
+        previous = self._figures.get(path)
+        signature = self._signature(path)
+        if signature is None:
+            if previous is not None:
+                del self._figures[path]
+                self._signatures.pop(path, None)
+                if emit:
+                    self._emit('removed', path, previous, {}, 0)
+            return
+        if signature[1] != SKYLANDER_SIZE:
+            return  # Écriture partielle : le prochain événement relancera la lecture
+        try:
+            encrypted = read_sky_file(path)
+        except OSError:
+            return
+        if len(encrypted) != SKYLANDER_SIZE or self._signature(path) != signature:
+            self._pending[path] = time.monotonic() + self.debounce
+            return
+        self._signatures[path] = signature
+        if previous is not None and previous.encrypted == encrypted:
+            return
+
+        skylander, blocks = decode_incremental(previous, encrypted)
+        figure = _TrackedFigure(encrypted, skylander)
+        self._figures[path] = figure
+        self.files_decoded += 1
+        self.blocks_decrypted += blocks
+        if not emit:
+            return
+        if previous is None:
+            self._emit('added', path, figure, {}, blocks)
+            return
+        changes = {field: (previous.stats[field], figure.stats[field])
+                   for field in WATCHED_FIELDS if previous.stats[field] != figure.stats[field]}
+        if changes:
+            self._emit('modified', path, figure, changes, blocks)
+
+    def scan(self, emit: bool = False) -> None:
+        """Parcourt les dossiers et (re)charge l'état de référence."""
+        seen = set()
+        for directory in self.directories:
+            for path in list_sky_files(directory):
+                seen.add(path)
+                if self._signature(path) != self._signatures.get(path):
+                    self._process(path, emit)
+        for path in list(self._figures):
+            if path not in seen:
+                self._process(path, emit)
+
+    def _touch(self, paths: Iterable[str]) -> None:
+        deadline = time.monotonic() + self.debounce
+        for path in paths:
+            if self._is_sky(path):
+                self._pending[path] = deadline
+
+    def _process_due(self) -> Optional[float]:
+        """Traite les fichiers dont l'anti-rebond a expiré ; retourne le prochain délai."""
+        now = time.monotonic()
+        for path in [p for p, due in self._pending.items() if due <= now]:
+            del self._pending[path]
+            self._process(path)
+        if not self._pending:
+            return None
+        return max(0.0, min(self._pending.values()) - time.monotonic())
+
+    # ------------------------------------------------------------------
+    # Boucles
+    # ------------------------------------------------------------------
+
+    def _run_inotify(self, inotify: _Inotify) -> None:
+        while not self._stop.is_set():
+            timeout = self._process_due()
+            ready, _, _ = select.select([inotify.fd, self._wake_r], [], [], timeout)
+            if self._wake_r in ready:
+                self._drain_wake()
+            if inotify.fd in ready:
+                paths, overflow = inotify.read_paths()
+                if overflow:
+                    self.scan(emit=True)
+                self._touch(paths)
+
+    def _drain_wake(self) -> None:
+        """Vide le tube de réveil : sinon select() le verrait prêt à chaque tour."""
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _run_polling(self) -> None:
+        # Dernière signature observée : l'anti-rebond n'est relancé que si elle bouge encore
+        polled = dict(self._signatures)
+        while not self._stop.is_set():
+            current = {}
+            for directory in self.directories:
+                for path in list_sky_files(directory):
+                    current[path] = self._signature(path)
+            touched = [p for p, sig in current.items() if polled.get(p) != sig]
+            touched += [p for p in self._figures if p not in current and p in polled]
+            polled = current
+            self._touch(touched)
+            timeout = self._process_due()
+            wait = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+            self._stop.wait(wait)
+
+    def run(self) -> None:
+        """Boucle de surveillance bloquante (jusqu'à `stop()`)."""
+        self.scan(emit=False)
+        inotify = None
+        if self.backend in ('auto', 'inotify'):
+            try:
+                inotify = _Inotify()
+                for directory in self.directories:
+                    inotify.add_watch(directory)
+            except OSError:
+                if inotify is not None:
+                    inotify.close()
+                if self.backend == 'inotify':
+                    raise
+                inotify = None
+        self.active_backend = 'inotify' if inotify else 'polling'
+        try:
+            if inotify:
+                self._run_inotify(inotify)
+            else:
+                self._run_polling()
+        finally:
+            if inotify:
+                inotify.close()
+
+    def start(self) -> None:
+        """Démarre la surveillance dans un thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="sky-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        try:
+            os.write(self._wake_w, b'\0')
+        except BlockingIOError:
+            pass  # Tube plein : un réveil est déjà en attente
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def close(self) -> None:
+        """Arrête la surveillance et libère le tube de réveil."""
+        if self._wake_w is None:
+            return
+        self.stop()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        self._wake_r = self._wake_w = None
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Surveille des dossiers de fichiers .sky")
+    parser.add_argument('directories', nargs='+')
+    parser.add_argument('--poll', action='store_true', help="forcer le mode sondage")
+    parser.add_argument('--interval', type=float, default=1.0, help="intervalle de sondage (s)")
+    parser.add_argument('--debounce', type=float, default=0.3, help="anti-rebond (s)")
+    args = parser.parse_args()
+
+    watcher = FigureWatcher(args.directories, lambda event: print(event.describe(), flush=True),
+                            debounce=args.debounce, poll_interval=args.interval,
+                            backend='polling' if args.poll else 'auto')
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())